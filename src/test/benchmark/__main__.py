@@ -0,0 +1,123 @@
+# Copyright (c) 2022 José Manuel Barroso Galindo <theypsilon@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# You can download the latest version of this tool from:
+# https://github.com/theypsilon-test/ua2
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from test.benchmark.benchmarks import all_benchmarks, Benchmark
+
+BASELINE_PATH = Path(__file__).parent / 'baseline.json'
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog='python3 -m test.benchmark', description='Times update_all hot paths relative to a calibration loop and compares them against a stored baseline.')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown ratio over the baseline before flagging a regression, on top of the measured noise (default: 0.25)')
+    parser.add_argument('--rounds', type=int, default=15, help='timed rounds per benchmark, the median one is kept (default: 15)')
+    parser.add_argument('--min-time', type=float, default=0.05, help='minimum seconds per round, used to calibrate the iterations (default: 0.05)')
+    parser.add_argument('--filter', default='', help='only run benchmarks whose name contains this text')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_PATH, help='baseline JSON file')
+    parser.add_argument('--update-baseline', action='store_true', help='store the current costs as the new baseline')
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.is_file() else {}
+    results = {}
+    regressions = []
+
+    calibration = Benchmark('calibration', lambda: None, calibration_loop)
+    calibration_iterations = iterations_for(calibration, args.min_time)
+    for benchmark in all_benchmarks():
+        if args.filter not in benchmark.name:
+            continue
+
+        seconds, cost, noise = measure(benchmark, calibration, calibration_iterations, args.rounds, args.min_time)
+        results[benchmark.name] = round(cost, 4)
+
+        reference = baseline.get(benchmark.name)
+        if reference is None:
+            comparison = 'no baseline'
+        else:
+            ratio = cost / reference
+            comparison = f'{ratio:6.2f}x baseline'
+            if ratio > 1 + args.threshold + 3 * noise:
+                comparison += '  REGRESSION'
+                regressions.append(benchmark.name)
+
+        print(f'{benchmark.name:<55} {seconds * 1_000_000:12.1f} us {cost:12.3f} units ±{noise:4.0%}  {comparison}', flush=True)
+
+    if args.update_baseline:
+        args.baseline.write_text(json.dumps({**baseline, **results}, indent=4, sort_keys=True) + '\n')
+        print(f'\nBaseline updated at {args.baseline}')
+        return 0
+
+    if len(regressions) > 0:
+        print(f'\n{len(regressions)} benchmark(s) regressed more than {args.threshold:.0%} plus noise: {", ".join(regressions)}')
+        return 1
+
+    return 0
+
+
+def measure(benchmark: Benchmark, calibration: Benchmark, calibration_iterations: int, rounds: int, min_time: float) -> Tuple[float, float, float]:
+    """Returns the median seconds per run, the median cost in calibration loops per run, and the relative spread of that cost.
+
+    Every round times the calibration loop right before the benchmark, so the cost stays comparable across machines and
+    across the frequency changes of a single machine. Only costs are stored in the baseline, never absolute timings.
+    """
+    iterations = iterations_for(benchmark, min_time)
+    seconds = []
+    costs = []
+    for _ in range(rounds):
+        reference = time_runs(calibration, calibration_iterations)
+        elapsed = time_runs(benchmark, iterations)
+        seconds.append(elapsed)
+        costs.append(elapsed / reference)
+
+    cost = statistics.median(costs)
+    noise = statistics.median(abs(c - cost) for c in costs) / cost
+    return statistics.median(seconds), cost, noise
+
+
+def time_runs(benchmark: Benchmark, iterations: int) -> float:
+    state = benchmark.setup()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        benchmark.run(state)
+    return (time.perf_counter() - start) / iterations
+
+
+def iterations_for(benchmark: Benchmark, min_time: float) -> int:
+    iterations = 1
+    while time_runs(benchmark, iterations) * iterations < min_time and iterations < 1_000_000:
+        iterations *= 2
+    return iterations
+
+
+def calibration_loop(_state: Any) -> Any:
+    # Plain dict, string and list work, like most of what the benchmarks do.
+    counts: Dict[str, int] = {}
+    for i in range(1000):
+        key = f'key_{i % 50}'
+        counts[key] = counts.get(key, 0) + len(key)
+    return sorted(counts.items())
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,170 @@
+# Copyright (c) 2022 José Manuel Barroso Galindo <theypsilon@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# You can download the latest version of this tool from:
+# https://github.com/theypsilon-test/ua2
+from dataclasses import dataclass
+from typing import Callable, Any, List, Dict, Optional
+from unittest.mock import MagicMock
+
+from test.fake_filesystem import FileSystemFactory
+from test.file_system_tester_state import FileSystemState
+from test.testing_objects import downloader_ini, default_downloader_ini_content
+from test.update_all_service_tester import IniRepositoryTester, SettingsScreenTester, UiStub, default_databases, local_store
+from update_all.config import Config
+from update_all.databases import DB_ID_NAMES_TXT, AllDBs, all_dbs_list
+from update_all.ini_repository import candidate_databases, active_databases
+from update_all.local_store import LocalStore
+from update_all.other import GenericProvider
+from update_all.settings_screen_model import settings_screen_model
+from update_all.ui_engine import _Interpolator, _UiRuntime, UiSectionFactory, _compile_template, Effect
+from update_all.ui_model_utilities import gather_variable_declarations
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Callable[[], Any]
+    run: Callable[[Any], Any]
+
+
+def all_benchmarks() -> List[Benchmark]:
+    return [
+        *[build_new_downloader_ini_contents(sections) for sections in [10, 100, 500, 2000]],
+        *[gather_variable_declarations_for_group(group) for group in [None, *model_variable_groups()]],
+        interpolate_every_text_in_model(),
+        make_section_state_for_every_section(),
+        Benchmark('candidate_databases', lambda: Config(databases=all_db_ids()), candidate_databases),
+        Benchmark('active_databases', lambda: Config(databases=all_db_ids()), active_databases),
+    ]
+
+
+def build_new_downloader_ini_contents(sections: int) -> Benchmark:
+    def setup():
+        config = Config(databases=default_databases(add=[DB_ID_NAMES_TXT, AllDBs.ARCADE_ROMS.db_id]))
+        file_system = FileSystemFactory(state=FileSystemState(files={downloader_ini: {'content': downloader_ini_with_sections(sections)}})).create_for_system_scope()
+        return file_system, config
+
+    # A new repository on every run, so that neither the parsed file nor the generated contents are cached.
+    return Benchmark(f'build_new_downloader_ini_contents[{sections}]', setup, lambda state: IniRepositoryTester(file_system=state[0])._build_new_downloader_ini_contents(state[1]))
+
+
+def downloader_ini_with_sections(sections: int) -> str:
+    contents = default_downloader_ini_content()
+    for i in range(sections - contents.count('[')):
+        contents += f'\n[custom_db_{i}]\ndb_url = https://example.com/custom_db_{i}.json.zip ; comment {i}\nfilter = arcade !cheats\n'
+    return contents
+
+
+def gather_variable_declarations_for_group(group: Optional[str]) -> Benchmark:
+    # The read-only model memoizes its variable index, a mutable copy is searched for the group on every run.
+    return Benchmark(f'gather_variable_declarations[{group or "all"}]', lambda: mutable_copy(settings_screen_model()), lambda model: gather_variable_declarations(model, group))
+
+
+def interpolate_every_text_in_model() -> Benchmark:
+    def setup():
+        ui = settings_screen_ui()
+        model = settings_screen_model()
+        formatters = {**model.get('formatters', {}), **ui.formatters}
+        interpolator = _Interpolator(formatters, ui)
+        return formatters, ui, [text for text in model_texts(model) if interpolates(interpolator, text)]
+
+    # Compiled templates and rendered texts are cached, so each run starts with empty caches.
+    def run(state):
+        formatters, ui, texts = state
+        _compile_template.cache_clear()
+        interpolator = _Interpolator(formatters, ui)
+        for text in texts:
+            interpolator.interpolate(text)
+
+    return Benchmark('interpolate[every text in model]', setup, run)
+
+
+def make_section_state_for_every_section() -> Benchmark:
+    def setup():
+        model = settings_screen_model()
+        return model, list(model['items'].values())
+
+    # A new runtime on every run, so that compiled sections are not reused.
+    def run(state):
+        model, sections = state
+        runtime = _UiRuntime(model, 'main_menu', UiSystemStub(), UiSectionFactoryStub())
+        for section in sections:
+            runtime._make_section_state(section)
+
+    return Benchmark('make_section_state[every section]', setup, run)
+
+
+def model_variable_groups() -> List[str]:
+    groups = set()
+    for description in gather_variable_declarations(settings_screen_model()).values():
+        group = description.get('group', [])
+        groups.update(group if isinstance(group, list) else [group])
+    return sorted(groups)
+
+
+def model_texts(item: Any) -> List[str]:
+    if isinstance(item, str):
+        return [item] if '{' in item else []
+    elif isinstance(item, dict):
+        return [text for value in item.values() for text in model_texts(value)]
+    elif isinstance(item, list):
+        return [text for value in item for text in model_texts(value)]
+    return []
+
+
+def mutable_copy(item: Any) -> Any:
+    if isinstance(item, dict):
+        return {key: mutable_copy(value) for key, value in item.items()}
+    elif isinstance(item, list):
+        return [mutable_copy(value) for value in item]
+    return item
+
+
+def interpolates(interpolator: _Interpolator, text: str) -> bool:
+    try:
+        interpolator.interpolate(text)
+        return True
+    except Exception:
+        return False
+
+
+def settings_screen_ui() -> UiStub:
+    config_provider = GenericProvider[Config]()
+    config_provider.initialize(Config())
+    store_provider = GenericProvider[LocalStore]()
+    store_provider.initialize(local_store())
+    ui = UiStub()
+    SettingsScreenTester(config_provider=config_provider, store_provider=store_provider).initialize_ui(ui, screen=MagicMock())
+    for variable, description in gather_variable_declarations(settings_screen_model()).items():
+        ui.variables.setdefault(variable, description['default'])
+    return ui
+
+
+def all_db_ids():
+    return {db.db_id for db in all_dbs_list()}
+
+
+class UiSystemStub(UiStub):
+    def custom_formatters(self) -> Dict[str, Callable[[str], str]]:
+        return self.formatters
+
+    def custom_effects(self) -> Dict[str, Callable[[Effect], None]]:
+        return self.effects
+
+
+class UiSectionFactoryStub(UiSectionFactory):
+    def create_ui_section(self, ui_type, data, interpolator):
+        return object()
@@ -0,0 +1,107 @@
+# Copyright (c) 2022 José Manuel Barroso Galindo <theypsilon@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# You can download the latest version of this tool from:
+# https://github.com/theypsilon-test/ua2
+"""Cold-start benchmark of the non-interactive path, every run uses a fresh interpreter.
+
+Run it from the src folder with: python3 -m test.benchmark.startup
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Dict, Tuple
+
+SRC_PATH = Path(__file__).resolve().parents[2]
+LAZY_MODULES = ['curses', 'multiprocessing', 'update_all.settings_screen', 'update_all.settings_screen_model', 'update_all.ui_engine']
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(prog='python3 -m test.benchmark.startup', description='Measures the cold start of update_all: import times and wall-clock time until the first printed line.')
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters per measurement, the median is reported (default: 5)')
+    parser.add_argument('--top', type=int, default=10, help='slowest modules to list by self import time (default: 10)')
+    args = parser.parse_args(argv)
+
+    cumulative, self_times = import_times(args.runs)
+    print(f'{"import update_all.main":<55} {cumulative * 1000:10.1f} ms')
+    print(f'{"first printed line":<55} {time_to_first_line(args.runs) * 1000:10.1f} ms')
+
+    print('\nSlowest modules by self import time:')
+    for module, seconds in sorted(self_times.items(), key=lambda item: item[1], reverse=True)[0:args.top]:
+        print(f'  {module:<53} {seconds * 1000:10.1f} ms')
+
+    eager = eagerly_imported(LAZY_MODULES)
+    if len(eager) > 0:
+        print(f'\nModules that should only be imported on demand: {", ".join(eager)}')
+        return 1
+
+    return 0
+
+
+def import_times(runs: int) -> Tuple[float, Dict[str, float]]:
+    cumulatives = []
+    self_times: Dict[str, List[float]] = {}
+    for _ in range(runs):
+        result = run_python(['-X', 'importtime', '-c', 'import update_all.main'])
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'self [us]' in line:
+                continue
+
+            self_us, cumulative_us, name = [part.strip() for part in line[len('import time:'):].split('|')]
+            self_times.setdefault(name, []).append(int(self_us) / 1_000_000)
+            if name == 'update_all.main':
+                cumulatives.append(int(cumulative_us) / 1_000_000)
+
+    return statistics.median(cumulatives), {name: statistics.median(times) for name, times in self_times.items()}
+
+
+def time_to_first_line(runs: int) -> float:
+    durations = []
+    for _ in range(runs):
+        # A fresh location makes every run take the same path: the first line is printed while
+        # creating the default downloader.ini, before anything touches the network.
+        with tempfile.TemporaryDirectory() as location:
+            env = {**os.environ, 'LOCATION_STR': location, 'CURL_SSL': '', 'DEBUG': 'false', 'PYTHONPATH': str(SRC_PATH)}
+            start = time.perf_counter()
+            process = subprocess.Popen([sys.executable, '-u', str(SRC_PATH / '__main__.py')], cwd=location, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            stdout = process.stdout
+            assert stdout is not None
+            try:
+                stdout.readline()
+                durations.append(time.perf_counter() - start)
+            finally:
+                process.kill()
+                process.wait()
+                stdout.close()
+
+    return statistics.median(durations)
+
+
+def eagerly_imported(modules: List[str]) -> List[str]:
+    code = f'import sys, update_all.main; print(" ".join(m for m in {modules!r} if m in sys.modules))'
+    return run_python(['-c', code]).stdout.split()
+
+
+def run_python(args: List[str]) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args], cwd=SRC_PATH, capture_output=True, text=True, check=True)
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
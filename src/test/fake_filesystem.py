@@ -16,14 +16,14 @@
 # You can download the latest version of this tool from:
 # https://github.com/theypsilon-test/ua2
 import json
-import re
+import os
 from pathlib import Path
 
 from test.file_system_tester_state import FileSystemState
 from update_all.config import Config
 from update_all.constants import K_BASE_PATH, K_ALLOW_DELETE, FOLDER_scripts_config_lc
 from update_all.file_system import FileSystemFactory as ProductionFileSystemFactory, FileSystem as ProductionFileSystem, \
-    absolute_parent_folder
+    absolute_parent_folder, previous_files_by_folder, previous_files_regex
 from update_all.other import ClosableValue, UnreachableException
 from test.logger_tester import NoLogger
 
@@ -48,12 +48,13 @@ class FileSystemFactory:
         self._state = state if state is not None else FileSystemState(config=Config() if config_provider is None else config_provider.get())
         self._fake_failures = {}
         self._write_records = write_records if write_records is not None else []
+        self._modifications = {}
 
     def create_for_config(self, config):
-        return _FileSystem(self._state, config, self._fake_failures, self._write_records)
+        return _FileSystem(self._state, config, self._fake_failures, self._write_records, self._modifications)
 
     def create_for_system_scope(self):
-        return _FileSystem(self._state, self._state.config, self._fake_failures, self._write_records)
+        return _FileSystem(self._state, self._state.config, self._fake_failures, self._write_records, self._modifications)
 
     @property
     def data(self):
@@ -79,11 +80,12 @@ class _TempFileWithId:
 class _FileSystem(ProductionFileSystem):
     unique_temp_filename_index = 0
 
-    def __init__(self, state, config, fake_failures, write_records):
+    def __init__(self, state, config, fake_failures, write_records, modifications):
         self._state = state
         self._config = config
         self._fake_failures = fake_failures
         self._write_records = write_records
+        self._modifications = modifications
         self._current_temp_file_index = 0
 
     @property
@@ -134,6 +136,16 @@ class _FileSystem(ProductionFileSystem):
     def is_file(self, path):
         return self._path(path) in self._state.files
 
+    def fingerprint(self, path):
+        file = self._path(path)
+        if file not in self._state.files:
+            return None
+        description = self._state.files[file]
+        return description.get('size', 0), self._modifications.get(file, 0), id(description)
+
+    def _modified(self, file):
+        self._modifications[file] = self._modifications.get(file, 0) + 1
+
     def is_folder(self, path):
         path = self._path(path)
         if path in self._state.folders:
@@ -154,6 +166,7 @@ class _FileSystem(ProductionFileSystem):
             self.touch(path)
         file = self._path(path)
         self._write_records.append(_Record('write_file_contents', (file, content)))
+        self._modified(file)
         self._state.files[file]['content'] = content
 
     def write_file_bytes(self, path, content_bytes):
@@ -161,11 +174,13 @@ class _FileSystem(ProductionFileSystem):
             self.touch(path)
         file = self._path(path)
         self._write_records.append(_Record('write_file_bytes', (file, content_bytes)))
+        self._modified(file)
         self._state.files[file]['content_bytes'] = content_bytes
 
     def touch(self, path):
         file = self._path(path)
         self._write_records.append(_Record('touch', file))
+        self._modified(file)
         self._state.files[file] = {'hash': path, 'size': 1}
 
     def set_copy_buggy(self):
@@ -177,6 +192,7 @@ class _FileSystem(ProductionFileSystem):
         self._state.files[target_file] = self._state.files[source_file]
         self._state.files.pop(source_file)
         self._write_records.append(_Record('move', (source_file, target_file)))
+        self._modified(target_file)
 
     def copy(self, source, target):
         source_file = self._path(source)
@@ -187,10 +203,25 @@ class _FileSystem(ProductionFileSystem):
 
         self._state.files[target_file] = source_description
         self._write_records.append(_Record('copy', (source_file, target_file)))
+        self._modified(target_file)
 
     def copy_fast(self, source, target):
         self.copy(source, target)
 
+    def compress_file(self, source, target, plain_target=None):
+        source_file = self._path(source)
+        target_file = self._path(target)
+        source_description = self._state.files[source_file]
+        size = source_description.get('size', 0)
+        self._state.files[target_file] = {**source_description, 'size': size // 2, 'compressed': True}
+        self._write_records.append(_Record('compress_file', (source_file, target_file)))
+        self._modified(target_file)
+        if plain_target is not None:
+            plain_file = self._path(plain_target)
+            self._state.files[plain_file] = {**source_description}
+            self._modified(plain_file)
+        return size, size // 2
+
     def make_dirs(self, path):
         folder = self._path(path)
         self._state.folders[folder] = {}
@@ -219,6 +250,10 @@ class _FileSystem(ProductionFileSystem):
 
         return False
 
+    def list_files(self, path):
+        path = self._path(path)
+        return [Path(file).name for file in self._state.files if absolute_parent_folder(file) == path]
+
     def folders(self):
         return list(self._state.folders)
 
@@ -250,30 +285,29 @@ class _FileSystem(ProductionFileSystem):
         else:
             return False
 
-    def delete_previous(self, file):
-        if self._config[K_ALLOW_DELETE] != AllowDelete.ALL:
-            return True
+    def delete_previous_many(self, files):
+        by_folder = {folder: (previous_files, previous_files_regex(previous_files.values()))
+                     for folder, previous_files in previous_files_by_folder({file: self._path(file) for file in files}).items()
+                     if self.is_folder(folder)}
 
-        if not self.is_folder(self._parent_folder(file)):
-            return
-
-        regex = re.compile("^(.+_)[0-9]{8}([.][a-zA-Z0-9]+)$", )
-        m = regex.match(Path(file).name)
-        if m is None:
-            return
+        deleted = {}
+        for file in list(self._state.files):
+            folder, name = os.path.split(file)
+            if folder not in by_folder:
+                continue
 
-        g = m.groups()
-        if g is None:
-            return
+            previous_files, regex = by_folder[folder]
+            name = name.lower()
+            if regex.fullmatch(name) is None:
+                continue
 
-        start = g[0].lower()
-        ext = g[1].lower()
+            self._state.files.pop(file)
+            self._write_records.append(_Record('delete_previous', file))
+            for previous_file, (start, ext) in previous_files.items():
+                if name.startswith(start) and name.endswith(ext):
+                    deleted.setdefault(previous_file, []).append(file)
 
-        for file in list(self._state.files):
-            name = Path(file).name
-            if name.startswith(start) and name.endswith(ext) and regex.match(name):
-                self._state.files.pop(file)
-                self._write_records.append(_Record('delete_previous', file))
+        return deleted
 
     def load_dict_from_file(self, path, suffix=None):
         file_description = self._state.files[self._path(path)]
@@ -290,6 +324,7 @@ class _FileSystem(ProductionFileSystem):
         file = self._path(path)
         self._state.files[file]['unzipped_json'] = db
         self._write_records.append(_Record('save_json_on_zip', file))
+        self._modified(file)
 
     def save_json(self, db, path):
         if self._path(path) not in self._state.files:
@@ -297,6 +332,7 @@ class _FileSystem(ProductionFileSystem):
         file = self._path(path)
         self._state.files[file]['json'] = db
         self._write_records.append(_Record('save_json', file))
+        self._modified(file)
 
     def unzip_contents(self, file_path, zip_target_path, contained_files):
         contents = self._state.files[self._path(file_path)]['zipped_files']
@@ -18,9 +18,10 @@
 import unittest
 from pathlib import Path
 from typing import Tuple
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from test.file_system_tester_state import FileSystemState
+from test.spy_os_utils import SpyOsUtils
 from test.testing_objects import downloader_ini, update_arcade_organizer_ini, default_downloader_ini_content, \
     store_json_zip
 from test.ui_model_test_utils import gather_used_effects
@@ -87,6 +88,34 @@ class TestSettingsScreen(unittest.TestCase):
         self.assertEqual('  - downloader.ini\n  - update_arcade-organizer.ini', ui.get_value('needs_save_file_list'))
         self.assertEqual('true', ui.get_value('needs_save'))
 
+    def test_calculate_needs_save___twice_without_changes___does_not_read_downloader_ini_again(self) -> None:
+        sut, ui, _ = tester(files={downloader_ini: {'content': default_downloader_ini_content()}})
+        sut.calculate_needs_save(ui)
+        with patch('update_all.ini_repository.IniRepository.does_downloader_ini_need_save') as does_downloader_ini_need_save:
+            sut.calculate_needs_save(ui)
+            does_downloader_ini_need_save.assert_not_called()
+
+    def test_calculate_needs_save___after_downloader_ini_changes_on_disk___calculates_again(self) -> None:
+        sut, ui, fs = tester()
+        sut.calculate_needs_save(ui)
+        fs.files[downloader_ini] = {'content': default_downloader_ini_content()}
+        sut.calculate_needs_save(ui)
+        self.assertEqual('false', ui.get_value('needs_save'))
+
+    def test_calculate_needs_save___after_a_variable_changes___calculates_again(self) -> None:
+        sut, ui, _ = tester(files={downloader_ini: {'content': default_downloader_ini_content()}})
+        sut.calculate_needs_save(ui)
+        ui.set_value('arcade_organizer', str(not Config().arcade_organizer).lower())
+        sut.calculate_needs_save(ui)
+        self.assertEqual('  - update_arcade-organizer.ini', ui.get_value('needs_save_file_list'))
+
+    def test_calculate_needs_save___after_save___calculates_again(self) -> None:
+        sut, ui, _ = tester()
+        sut.calculate_needs_save(ui)
+        sut.save(ui)
+        sut.calculate_needs_save(ui)
+        self.assertEqual('false', ui.get_value('needs_save'))
+
     def test_initialize_ui___fills_variables_that_are_declared_in_the_model(self):
         _, ui, _ = tester()
 
@@ -180,15 +209,24 @@ class TestSettingsScreen(unittest.TestCase):
         self.assertEqual(69, fs.files[store_json_zip.lower()]['unzipped_json']['wait_time_for_reading'])
         self.assertEqual('Cyan Night', fs.files[store_json_zip.lower()]['unzipped_json']['theme'])
 
+    def test_calculate_arcade_organizer_folders___does_not_run_the_launcher_that_update_all_prefetches(self):
+        os_utils = SpyOsUtils()
+        sut, ui, _ = tester(os_utils=os_utils)
+
+        sut.calculate_arcade_organizer_folders(ui)
+
+        cmd, _env = os_utils.calls_to_execute_process[0]
+        self.assertNotEqual('/tmp/arcade_organizer.sh', cmd[1])
+
 
-def tester(files=None, config=None, store=None) -> Tuple[SettingsScreen, UiStub, FileSystemState]:
+def tester(files=None, config=None, store=None, os_utils=None) -> Tuple[SettingsScreen, UiStub, FileSystemState]:
     ui = UiStub()
     state = FileSystemState(files=files)
     config_provider = GenericProvider[Config]()
     config_provider.initialize(config or Config())
     store_provider = GenericProvider[LocalStore]()
     store_provider.initialize(store or local_store())
-    settings_screen = SettingsScreenTester(config_provider=config_provider, store_provider=store_provider, file_system=FileSystemFactory(state=state).create_for_system_scope())
+    settings_screen = SettingsScreenTester(config_provider=config_provider, store_provider=store_provider, os_utils=os_utils, file_system=FileSystemFactory(state=state).create_for_system_scope())
     settings_screen.initialize_ui(ui, screen=MagicMock())
 
     return settings_screen, ui, state
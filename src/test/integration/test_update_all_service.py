@@ -16,8 +16,11 @@
 # You can download the latest version of this tool from:
 # https://github.com/theypsilon-test/ua2
 from pathlib import Path
+from typing import Optional
 
+from test.spy_os_utils import SpyOsUtils
 from test.testing_objects import downloader_ini
+from update_all.constants import DOWNLOADER_URL, ARCADE_ORGANIZER_URL
 from update_all.config import Config
 from update_all.databases import AllDBs, DB_ID_DISTRIBUTION_MISTER, DB_ID_NAMES_TXT
 from update_all.update_all_service import UpdateAllService
@@ -28,10 +31,10 @@ from test.update_all_service_tester import UpdateAllServiceFactoryTester, Update
 import unittest
 
 
-def tester(files=None, folders=None, config: Config = None):
+def tester(files=None, folders=None, config: Optional[Config] = None, os_utils: Optional[SpyOsUtils] = None):
     state = FileSystemState(files=files, folders=folders)
     config_reader_tester = ConfigReaderTester(config=config or Config())
-    return UpdateAllServiceTester(config_reader=config_reader_tester, file_system=FileSystemFactory(state=state).create_for_system_scope()), state
+    return UpdateAllServiceTester(config_reader=config_reader_tester, file_system=FileSystemFactory(state=state).create_for_system_scope(), os_utils=os_utils or SpyOsUtils()), state
 
 
 class TestUpdateAllService(unittest.TestCase):
@@ -42,6 +45,28 @@ class TestUpdateAllService(unittest.TestCase):
         sut, _ = tester()
         self.assertEqual(0, sut.full_run())
 
+    def test_full_run___on_empty_environment___downloads_each_launcher_once(self):
+        os_utils = SpyOsUtils()
+        sut, _ = tester(os_utils=os_utils)
+        sut.full_run()
+        self.assertEqual(sorted([DOWNLOADER_URL, ARCADE_ORGANIZER_URL]), sorted(os_utils.calls_to_download))
+
+    def test_full_run___without_arcade_organizer___only_downloads_downloader(self):
+        os_utils = SpyOsUtils()
+        sut, _ = tester(config=Config(arcade_organizer=False), os_utils=os_utils)
+        sut.full_run()
+        self.assertEqual([DOWNLOADER_URL], os_utils.calls_to_download)
+
+    def test_full_run___with_linux_update_and_arcade_organizer___starts_linux_update_after_arcade_organizer_finishes(self):
+        os_utils = StageEventsOsUtils()
+        sut, _ = tester(config=Config(update_linux=True, arcade_organizer=True), os_utils=os_utils)
+        sut.full_run()
+        self.assertEqual([
+            ('start', 'downloader'), ('end', 'downloader'),
+            ('start', 'arcade_organizer'), ('end', 'arcade_organizer'),
+            ('start', 'linux_update'), ('end', 'linux_update'),
+        ], os_utils.events)
+
     def test_full_run___on_empty_environment___writes_default_downloader_ini(self):
         sut, fs = tester()
         sut.full_run()
@@ -153,3 +178,15 @@ class TestUpdateAllService(unittest.TestCase):
         sut.ini_repository.write_downloader_ini(config)
         sut.full_run()
         self.assertEqual(Path('test/fixtures/downloader_ini/heavily_filtered_downloader.ini').read_text(), fs.files[downloader_ini]['content'])
+
+
+class StageEventsOsUtils(SpyOsUtils):
+    def __init__(self):
+        super().__init__()
+        self.events = []
+
+    def execute_process(self, launcher, env):
+        stage = 'arcade_organizer' if 'INI_FILE' in env else 'linux_update' if env.get('UPDATE_LINUX') == 'only' else 'downloader'
+        self.events.append(('start', stage))
+        self.events.append(('end', stage))
+        return 0
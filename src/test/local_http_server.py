@@ -0,0 +1,105 @@
+# Copyright (c) 2022 José Manuel Barroso Galindo <theypsilon@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# You can download the latest version of this tool from:
+# https://github.com/theypsilon-test/ua2
+import gzip
+import hashlib
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, List, Optional, Tuple
+
+
+class LocalHttpServer:
+    def __init__(self, files: Dict[str, bytes], drops: Optional[Dict[str, List[int]]] = None, statuses: Optional[Dict[str, List[int]]] = None, compress: bool = False, keep_alive: bool = True):
+        self.files = files
+        self.compress = compress
+        self.keep_alive = keep_alive
+        self.drops = drops or {}
+        self.statuses = statuses or {}
+        self.requests: List[Tuple[str, Dict[str, str]]] = []
+        self.bodies_sent = 0
+        server = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                server.requests.append((self.path, dict(self.headers)))
+                self.close_connection = not server.keep_alive
+                if self.path not in server.files:
+                    self.send_error(404)
+                    return
+
+                if len(server.statuses.get(self.path, [])) > 0:
+                    self.send_error(server.statuses[self.path].pop(0))
+                    return
+
+                body = server.files[self.path]
+                etag = f'"{hashlib.md5(body).hexdigest()}"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                if server.compress and 'gzip' in self.headers.get('Accept-Encoding', ''):
+                    server.bodies_sent += 1
+                    compressed = gzip.compress(body)
+                    self.send_response(200)
+                    self.send_header('ETag', etag)
+                    self.send_header('Content-Encoding', 'gzip')
+                    self.send_header('Content-Length', str(len(compressed)))
+                    self.end_headers()
+                    self.wfile.write(compressed)
+                    return
+
+                start = 0
+                byte_range = self.headers.get('Range')
+                if byte_range is not None and self.headers.get('If-Range', etag) == etag:
+                    start = int(byte_range.split('=')[1].split('-')[0])
+
+                server.bodies_sent += 1
+                self.send_response(206 if start > 0 else 200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Length', str(len(body) - start))
+                if start > 0:
+                    self.send_header('Content-Range', f'bytes {start}-{len(body) - 1}/{len(body)}')
+                self.end_headers()
+
+                if len(server.drops.get(self.path, [])) > 0:
+                    self.wfile.write(body[start:start + server.drops[self.path].pop(0)])
+                    self.close_connection = True
+                    return
+
+                self.wfile.write(body[start:])
+
+            def log_message(self, *args):
+                pass
+
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def url(self, path: str) -> str:
+        return f'http://127.0.0.1:{self._httpd.server_address[1]}{path}'
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self._httpd.shutdown()
+        self._httpd.server_close()
@@ -36,3 +36,13 @@ class NoLogger(Logger):
     def finalize(self):
         pass
 
+class LoggerSpy(NoLogger):
+    def __init__(self):
+        self.printed = []
+        self.benched = []
+
+    def print(self, *args, sep='', end='\n', file=sys.stdout, flush=False):
+        self.printed.append(sep.join(str(a) for a in args) + end)
+
+    def bench(self, label):
+        self.benched.append(label)
@@ -45,6 +45,6 @@ class SpyOsUtils(OsUtils):
         self.calls_to_execute_process.append((cmd, env))
         return 0, ''
 
-    def download(self, url) -> bytes:
+    def download_to_file(self, url, path, use_cache=False) -> str:
         self.calls_to_download.append(url)
-        return bytes()
+        return ''
@@ -0,0 +1,65 @@
+# Copyright (c) 2022 José Manuel Barroso Galindo <theypsilon@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# You can download the latest version of this tool from:
+# https://github.com/theypsilon-test/ua2
+import io
+import os
+import pty
+import time
+import unittest
+from contextlib import redirect_stdout
+
+from update_all.countdown import CountdownImpl, CountdownOutcome, _OsSpecificsLinux
+
+
+class TestCountdown(unittest.TestCase):
+    def setUp(self) -> None:
+        self.master, self.slave = pty.openpty()
+
+    def tearDown(self) -> None:
+        os.close(self.master)
+        os.close(self.slave)
+
+    def test_execute_count___when_pressing_up___returns_settings_screen_right_away(self):
+        os.write(self.master, b'\x1b[A')
+        outcome, elapsed = self.count(10)
+        self.assertEqual(CountdownOutcome.SETTINGS_SCREEN, outcome)
+        self.assertLess(elapsed, 0.5)
+
+    def test_execute_count___when_pressing_down___continues_right_away(self):
+        os.write(self.master, b'\x1b[B')
+        outcome, elapsed = self.count(10)
+        self.assertEqual(CountdownOutcome.CONTINUE, outcome)
+        self.assertLess(elapsed, 0.5)
+
+    def test_execute_count___without_keys___continues_when_time_runs_out(self):
+        outcome, elapsed = self.count(1)
+        self.assertEqual(CountdownOutcome.CONTINUE, outcome)
+        self.assertGreaterEqual(elapsed, 1)
+        self.assertLess(elapsed, 1.5)
+
+    def test_execute_count___restores_terminal_settings(self):
+        import termios
+        before = termios.tcgetattr(self.slave)
+        os.write(self.master, b'\x1b[B')
+        self.count(10)
+        self.assertEqual(before, termios.tcgetattr(self.slave))
+
+    def count(self, seconds):
+        start = time.monotonic()
+        with redirect_stdout(io.StringIO()):
+            outcome = CountdownImpl()._execute_count(_OsSpecificsLinux(self.slave), seconds)
+        return outcome, time.monotonic() - start
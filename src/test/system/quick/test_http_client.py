@@ -0,0 +1,131 @@
+# Copyright (c) 2022 José Manuel Barroso Galindo <theypsilon@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# You can download the latest version of this tool from:
+# https://github.com/theypsilon-test/ua2
+import http.client
+import socket
+import unittest
+from unittest.mock import patch
+from urllib.error import HTTPError
+
+from test.local_http_server import LocalHttpServer
+from test.logger_tester import NoLogger
+from update_all.http_client import HttpClient
+
+
+class TestHttpClient(unittest.TestCase):
+    def setUp(self) -> None:
+        self.sut = HttpClient(NoLogger(), proxies={})
+
+    def tearDown(self) -> None:
+        self.sut.close()
+
+    def test_open___several_requests_to_same_host___reuse_one_connection(self):
+        with LocalHttpServer({'/a': b'aaa', '/b': b'bbb'}) as server:
+            bodies = [self._get(server.url(path)) for path in ['/a', '/b', '/a']]
+
+        self.assertEqual([b'aaa', b'bbb', b'aaa'], bodies)
+        self.assertEqual(1, self.sut.connections_opened)
+        self.assertEqual(3, self.sut.requests_sent)
+
+    def test_open___on_gzip_encoded_response___returns_decoded_body(self):
+        body = b'echo hello\n' * 1000
+        with LocalHttpServer({'/a': body}, compress=True) as server:
+            result = self._get(server.url('/a'))
+
+        self.assertEqual(body, result)
+        self.assertEqual('gzip', server.requests[0][1]['Accept-Encoding'])
+
+    def test_open___with_range_header___does_not_ask_for_gzip(self):
+        with LocalHttpServer({'/a': b'0123456789'}, compress=True) as server:
+            result = self._get(server.url('/a'), {'Range': 'bytes=4-'})
+
+        self.assertEqual(b'456789', result)
+        self.assertEqual('identity', server.requests[0][1]['Accept-Encoding'])
+
+    def test_open___after_server_silently_closes_pooled_connection___reconnects(self):
+        with LocalHttpServer({'/a': b'aaa'}, keep_alive=False) as server:
+            bodies = [self._get(server.url('/a')) for _ in range(2)]
+
+        self.assertEqual([b'aaa', b'aaa'], bodies)
+        self.assertEqual(2, self.sut.connections_opened)
+
+    def test_open___on_truncated_body___raises_incomplete_read(self):
+        with LocalHttpServer({'/a': b'0123456789'}, drops={'/a': [3]}) as server:
+            with self.assertRaises(http.client.IncompleteRead):
+                self._get(server.url('/a'))
+
+    def test_open___on_file_url___raises_value_error(self):
+        with self.assertRaises(ValueError):
+            self._get('file:///etc/hostname')
+
+    def test_open___on_missing_file___raises_http_error(self):
+        with LocalHttpServer({}) as server:
+            with self.assertRaises(HTTPError) as context:
+                self._get(server.url('/a'))
+
+        self.assertEqual(404, context.exception.code)
+
+    def test_open___when_first_resolved_address_refuses___connects_to_the_next_one(self):
+        with LocalHttpServer({'/a': b'aaa'}) as server:
+            port = int(server.url('').rsplit(':', 1)[1])
+            getaddrinfo = socket.getaddrinfo
+            resolutions = []
+
+            def fake_getaddrinfo(host, *args, **kwargs):
+                if host != 'example.invalid':
+                    return getaddrinfo(host, *args, **kwargs)
+                resolutions.append(host)
+                return [(socket.AF_INET, socket.SOCK_STREAM, 6, '', (address, port)) for address in ['127.0.0.2', '127.0.0.1']]
+
+            with patch('socket.getaddrinfo', side_effect=fake_getaddrinfo):
+                bodies = [self._get(f'http://example.invalid:{port}/a', {'Connection': 'close'}) for _ in range(2)]
+
+        self.assertEqual([b'aaa', b'aaa'], bodies)
+        self.assertEqual(['example.invalid'], resolutions)
+
+    def test_open___with_http_proxy___sends_full_url_to_the_proxy(self):
+        with LocalHttpServer({'http://example.invalid/a': b'aaa'}) as server:
+            sut = HttpClient(NoLogger(), proxies={'http': server.url('')})
+            with sut.open('http://example.invalid/a', timeout=5) as response:
+                body = response.read()
+            sut.close()
+
+        self.assertEqual(b'aaa', body)
+        self.assertEqual(['http://example.invalid/a'], [path for path, _ in server.requests])
+
+    def test_open___with_proxy_credentials___sends_proxy_authorization(self):
+        with LocalHttpServer({'http://example.invalid/a': b'aaa'}) as server:
+            sut = HttpClient(NoLogger(), proxies={'http': server.url('').replace('http://', 'http://user:pass@')})
+            with sut.open('http://example.invalid/a', timeout=5) as response:
+                response.read()
+            sut.close()
+
+        self.assertEqual('Basic dXNlcjpwYXNz', server.requests[0][1]['Proxy-Authorization'])
+
+    def test_open___on_host_listed_in_no_proxy___connects_directly(self):
+        with LocalHttpServer({'/a': b'aaa'}) as server:
+            sut = HttpClient(NoLogger(), proxies={'http': 'http://proxy.invalid:3128', 'no': '127.0.0.1'})
+            with sut.open(server.url('/a'), timeout=5) as response:
+                body = response.read()
+            sut.close()
+
+        self.assertEqual(b'aaa', body)
+        self.assertEqual(['/a'], [path for path, _ in server.requests])
+
+    def _get(self, url, headers=None):
+        with self.sut.open(url, headers=headers, timeout=5) as response:
+            return response.read()
@@ -0,0 +1,181 @@
+# Copyright (c) 2022 José Manuel Barroso Galindo <theypsilon@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# You can download the latest version of this tool from:
+# https://github.com/theypsilon-test/ua2
+import errno
+import hashlib
+import socket
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from test.local_http_server import LocalHttpServer
+from test.logger_tester import NoLogger, LoggerSpy
+from update_all.config import Config
+from update_all.os_utils import LinuxOsUtils
+from update_all.other import GenericProvider
+
+
+class TestOsUtilsDownload(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        config_provider = GenericProvider[Config]()
+        config_provider.initialize(Config(base_path=self.temp_dir.name, base_system_path=self.temp_dir.name))
+        self.logger = LoggerSpy()
+        self.sut = LinuxOsUtils(config_provider=config_provider, logger=self.logger)
+        self.target = Path(self.temp_dir.name) / 'downloads' / 'launcher.sh'
+        self.target.parent.mkdir()
+
+    def tearDown(self) -> None:
+        self.sut.close()
+        self.temp_dir.cleanup()
+
+    def test_download_to_file___on_big_file___writes_it_and_returns_its_md5(self):
+        body = bytes(range(256)) * 4096
+        with LocalHttpServer({'/launcher.sh': body}) as server:
+            md5 = self.sut.download_to_file(server.url('/launcher.sh'), str(self.target))
+
+        self.assertEqual(body, self.target.read_bytes())
+        self.assertEqual(hashlib.md5(body).hexdigest(), md5)
+        self.assertEqual(['launcher.sh'], [p.name for p in self.target.parent.iterdir()])
+        self.assertIn('MB/s', self.logger.benched[-1])
+
+    def test_download_to_file___twice_on_unchanged_file___transfers_body_only_once(self):
+        with LocalHttpServer({'/launcher.sh': b'echo hello'}) as server:
+            self.sut.download_to_file(server.url('/launcher.sh'), str(self.target), use_cache=True)
+            self.target.unlink()
+            self.sut.download_to_file(server.url('/launcher.sh'), str(self.target), use_cache=True)
+
+        self.assertEqual(b'echo hello', self.target.read_bytes())
+        self.assertEqual(1, server.bodies_sent)
+        self.assertIn('If-None-Match', server.requests[1][1])
+
+    def test_download_to_file___after_file_changes___writes_new_content(self):
+        with LocalHttpServer({'/launcher.sh': b'echo hello'}) as server:
+            self.sut.download_to_file(server.url('/launcher.sh'), str(self.target), use_cache=True)
+            server.files['/launcher.sh'] = b'echo bye'
+            self.sut.download_to_file(server.url('/launcher.sh'), str(self.target), use_cache=True)
+
+        self.assertEqual(b'echo bye', self.target.read_bytes())
+        self.assertEqual(2, server.bodies_sent)
+
+    def test_download_to_file___with_corrupted_cached_body___fetches_it_again(self):
+        with LocalHttpServer({'/launcher.sh': b'echo hello'}) as server:
+            self.sut.download_to_file(server.url('/launcher.sh'), str(self.target), use_cache=True)
+            for body in Path(self.temp_dir.name).rglob('*.body'):
+                body.write_bytes(b'garbage')
+            self.sut.download_to_file(server.url('/launcher.sh'), str(self.target), use_cache=True)
+
+        self.assertEqual(b'echo hello', self.target.read_bytes())
+        self.assertEqual(2, server.bodies_sent)
+
+    def test_download_to_file___without_use_cache___keeps_no_cached_copy(self):
+        with LocalHttpServer({'/launcher.sh': b'echo hello'}) as server:
+            self.sut.download_to_file(server.url('/launcher.sh'), str(self.target))
+            self.sut.download_to_file(server.url('/launcher.sh'), str(self.target))
+
+        self.assertEqual(2, server.bodies_sent)
+        self.assertNotIn('If-None-Match', server.requests[1][1])
+        self.assertEqual([], list(Path(self.temp_dir.name).rglob('*.body')))
+
+    def test_download_to_file___on_missing_url___raises_and_keeps_previous_file(self):
+        self.target.write_bytes(b'previous')
+        with LocalHttpServer({}) as server:
+            with self.assertRaises(Exception):
+                self.sut.download_to_file(server.url('/launcher.sh'), str(self.target))
+
+        self.assertEqual(b'previous', self.target.read_bytes())
+
+
+class TestOsUtilsDownloadRetries(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        config_provider = GenericProvider[Config]()
+        config_provider.initialize(Config(base_path=self.temp_dir.name, base_system_path=self.temp_dir.name, downloader_retries=3))
+        self.sut = SleeplessOsUtils(config_provider=config_provider, logger=NoLogger())
+        self.target = Path(self.temp_dir.name) / 'MiSTer'
+        self.body = bytes(range(256)) * 1024
+
+    def tearDown(self) -> None:
+        self.sut.close()
+        self.temp_dir.cleanup()
+
+    def test_download_to_file___when_connection_drops_mid_body___resumes_with_range_requests(self):
+        with LocalHttpServer({'/MiSTer': self.body}, drops={'/MiSTer': [1000, 50000]}) as server:
+            md5 = self.sut.download_to_file(server.url('/MiSTer'), str(self.target))
+
+        self.assertEqual(self.body, self.target.read_bytes())
+        self.assertEqual(hashlib.md5(self.body).hexdigest(), md5)
+        self.assertEqual([None, 'bytes=1000-', 'bytes=51000-'], [headers.get('Range') for _, headers in server.requests])
+        self.assertEqual(2, len(self.sut.slept))
+
+    def test_download_to_file___on_server_errors___retries_with_growing_backoff(self):
+        with LocalHttpServer({'/MiSTer': self.body}, statuses={'/MiSTer': [503, 503, 503]}) as server:
+            self.sut.download_to_file(server.url('/MiSTer'), str(self.target))
+
+        self.assertEqual(self.body, self.target.read_bytes())
+        self.assertEqual(3, len(self.sut.slept))
+        self.assertTrue(self.sut.slept[0] <= 1.0 < self.sut.slept[2])
+
+    def test_download_to_file___when_retries_are_exhausted___raises_and_leaves_no_partial_file(self):
+        with LocalHttpServer({'/MiSTer': self.body}, drops={'/MiSTer': [10, 10, 10, 10]}) as server:
+            with self.assertRaises(Exception):
+                self.sut.download_to_file(server.url('/MiSTer'), str(self.target))
+
+        self.assertEqual([], list(Path(self.temp_dir.name).glob('MiSTer*')))
+
+    def test_download_to_file___on_unreachable_network___retries(self):
+        create_connection = socket.create_connection
+        failures = [OSError(errno.ENETUNREACH, 'Network is unreachable')]
+
+        def flaky_create_connection(*args, **kwargs):
+            if len(failures) > 0:
+                raise failures.pop()
+            return create_connection(*args, **kwargs)
+
+        with LocalHttpServer({'/MiSTer': self.body}) as server:
+            with patch('socket.create_connection', side_effect=flaky_create_connection):
+                self.sut.download_to_file(server.url('/MiSTer'), str(self.target))
+
+        self.assertEqual(self.body, self.target.read_bytes())
+        self.assertEqual(1, len(self.sut.slept))
+
+    def test_download_to_file___on_local_file_system_error___does_not_retry(self):
+        with LocalHttpServer({'/MiSTer': self.body}) as server:
+            with patch('update_all.os_utils.write_stream_to_file', side_effect=OSError(errno.ENOSPC, 'No space left on device')):
+                with self.assertRaises(OSError):
+                    self.sut.download_to_file(server.url('/MiSTer'), str(self.target))
+
+        self.assertEqual(1, len(server.requests))
+        self.assertEqual([], self.sut.slept)
+
+    def test_download_to_file___on_not_found___does_not_retry(self):
+        with LocalHttpServer({}) as server:
+            with self.assertRaises(Exception):
+                self.sut.download_to_file(server.url('/MiSTer'), str(self.target))
+
+        self.assertEqual(1, len(server.requests))
+        self.assertEqual([], self.sut.slept)
+
+
+class SleeplessOsUtils(LinuxOsUtils):
+    def __init__(self, config_provider, logger):
+        super().__init__(config_provider=config_provider, logger=logger)
+        self.slept = []
+
+    def sleep(self, seconds) -> None:
+        self.slept.append(seconds)
@@ -0,0 +1,56 @@
+# Copyright (c) 2022 José Manuel Barroso Galindo <theypsilon@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# You can download the latest version of this tool from:
+# https://github.com/theypsilon-test/ua2
+import tempfile
+import unittest
+from pathlib import Path
+
+from test.logger_tester import LoggerSpy
+from update_all.config import Config
+from update_all.os_utils import LinuxOsUtils
+from update_all.other import GenericProvider
+
+
+class TestOsUtilsExecuteProcess(unittest.TestCase):
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.logger = LoggerSpy()
+        self.sut = LinuxOsUtils(config_provider=GenericProvider[Config](), logger=self.logger)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def test_execute_process___with_script_printing_lines___forwards_complete_lines_and_returns_exit_code(self):
+        script = self.script('import sys\nfor i in range(3000): print(f"line {i}")\nsys.stdout.write("no newline")\nsys.exit(3)\n')
+
+        return_code = self.sut.execute_process(script, {})
+
+        self.assertEqual(3, return_code)
+        self.assertEqual([f'line {i}\n' for i in range(3000)] + ['no newline'], self.logger.printed)
+
+    def test_execute_process___reports_bytes_and_wakeups_on_bench(self):
+        script = self.script('print("hello")\n')
+
+        self.sut.execute_process(script, {})
+
+        self.assertEqual(1, len(self.logger.benched))
+        self.assertIn('6 bytes', self.logger.benched[0])
+
+    def script(self, content: str) -> str:
+        path = Path(self.temp_dir.name) / 'script.py'
+        path.write_text(content)
+        return str(path)
@@ -0,0 +1,103 @@
+# Copyright (c) 2022 José Manuel Barroso Galindo <theypsilon@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# You can download the latest version of this tool from:
+# https://github.com/theypsilon-test/ua2
+import unittest
+from unittest.mock import patch
+
+from test.fake_filesystem import FileSystemFactory
+from update_all.file_system import CachingFileSystemDecorator
+
+file_a = 'Scripts/a.txt'
+file_b = 'Scripts/b.txt'
+folder = 'Scripts/folder'
+
+
+class TestCachingFileSystemDecorator(unittest.TestCase):
+    def setUp(self) -> None:
+        self.decorated = FileSystemFactory().create_for_system_scope()
+        self.sut = CachingFileSystemDecorator(self.decorated)
+
+    def test_is_file___twice___looks_up_once(self):
+        with patch.object(self.decorated, 'is_file', wraps=self.decorated.is_file) as is_file:
+            self.assertFalse(self.sut.is_file(file_a))
+            self.assertFalse(self.sut.is_file(file_a))
+            self.assertEqual(1, is_file.call_count)
+        self.assertEqual((1, 1), (self.sut.hits, self.sut.misses))
+
+    def test_download_target_path___twice___resolves_once(self):
+        with patch.object(self.decorated, 'download_target_path', wraps=self.decorated.download_target_path) as download_target_path:
+            self.assertEqual(self.sut.download_target_path(file_a), self.sut.download_target_path(file_a))
+            self.assertEqual(1, download_target_path.call_count)
+
+    def test_is_file___after_each_kind_of_write___sees_the_change(self):
+        for write in [
+            lambda: self.sut.touch(file_a),
+            lambda: self.sut.write_file_contents(file_a, 'a'),
+            lambda: self.sut.write_file_bytes(file_a, b'a'),
+            lambda: self.sut.save_json({}, file_a),
+            lambda: self.sut.save_json_on_zip({}, file_a),
+        ]:
+            with self.subTest():
+                self.sut.unlink(file_a)
+                self.assertFalse(self.sut.is_file(file_a))
+                write()
+                self.assertTrue(self.sut.is_file(file_a))
+
+    def test_is_file___after_unlink___is_false(self):
+        self.sut.touch(file_a)
+        self.assertTrue(self.sut.is_file(file_a))
+        self.sut.unlink(file_a)
+        self.assertFalse(self.sut.is_file(file_a))
+
+    def test_is_file___after_cleaning_temp_files_with_ids___is_false(self):
+        temp_file = self.sut.temp_file_by_id('launcher')
+        self.assertTrue(self.sut.is_file(temp_file.name))
+        self.sut.clean_temp_files_with_ids()
+        self.assertFalse(self.sut.is_file(temp_file.name))
+
+    def test_is_file___after_move___sees_source_gone_and_target_present(self):
+        self.sut.touch(file_a)
+        self.assertEqual((True, False), (self.sut.is_file(file_a), self.sut.is_file(file_b)))
+        self.sut.move(file_a, file_b)
+        self.assertEqual((False, True), (self.sut.is_file(file_a), self.sut.is_file(file_b)))
+
+    def test_is_file___after_copy___sees_target(self):
+        self.sut.touch(file_a)
+        self.assertFalse(self.sut.is_file(file_b))
+        self.sut.copy(file_a, file_b)
+        self.assertTrue(self.sut.is_file(file_b))
+
+    def test_is_folder___after_make_dirs_and_remove_folder___sees_each_change(self):
+        self.assertFalse(self.sut.is_folder(folder))
+        self.sut.make_dirs(folder)
+        self.assertTrue(self.sut.is_folder(folder))
+        self.sut.remove_folder(folder)
+        self.assertFalse(self.sut.is_folder(folder))
+
+    def test_is_file___after_remove_non_empty_folder___is_false(self):
+        self.sut.make_dirs(folder)
+        self.sut.touch(f'{folder}/a.txt')
+        self.assertTrue(self.sut.is_file(f'{folder}/a.txt'))
+        self.sut.remove_non_empty_folder(folder)
+        self.assertFalse(self.sut.is_file(f'{folder}/a.txt'))
+
+    def test_is_file___after_change_behind_its_back_and_invalidate_caches___sees_the_change(self):
+        self.assertFalse(self.sut.is_file(file_a))
+        self.decorated.touch(file_a)
+        self.assertFalse(self.sut.is_file(file_a))
+        self.sut.invalidate_caches()
+        self.assertTrue(self.sut.is_file(file_a))
@@ -0,0 +1,145 @@
+# Copyright (c) 2022 José Manuel Barroso Galindo <theypsilon@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# You can download the latest version of this tool from:
+# https://github.com/theypsilon-test/ua2
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from test.logger_tester import NoLogger
+from update_all.config import Config
+from update_all.constants import FILE_update_all_file_hashes
+from update_all.file_system import FileSystemFactory, hash_file, _HASH_BUFFER_SIZE
+from update_all.other import GenericProvider
+
+
+class TestFileSystemHash(unittest.TestCase):
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        self.config_provider = GenericProvider[Config]()
+        self.config_provider.initialize(Config(base_path=self.folder.name, base_system_path=self.folder.name))
+        self.file_system = self.create_file_system()
+        self.write('MiSTer', b'firmware')
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    def test_hash___returns_md5_of_the_file(self):
+        self.assertEqual(hashlib.md5(b'firmware').hexdigest(), self.file_system.hash('MiSTer'))
+
+    def test_hash___twice___hashes_once(self):
+        with patch('update_all.file_system.hash_file', wraps=hash_file) as hash_file_spy:
+            self.file_system.hash('MiSTer')
+            self.file_system.hash('MiSTer')
+            self.assertEqual(1, hash_file_spy.call_count)
+
+    def test_hash___from_a_new_file_system___reuses_persisted_hash(self):
+        self.file_system.hash('MiSTer')
+        self.assertTrue(os.path.isfile(os.path.join(self.folder.name, FILE_update_all_file_hashes)))
+
+        with patch('update_all.file_system.hash_file', wraps=hash_file) as hash_file_spy:
+            self.assertEqual(hashlib.md5(b'firmware').hexdigest(), self.create_file_system().hash('MiSTer'))
+            self.assertEqual(0, hash_file_spy.call_count)
+
+    def test_hash___after_file_changes___hashes_it_again(self):
+        self.file_system.hash('MiSTer')
+        self.write('MiSTer', b'new firmware')
+        self.assertEqual(hashlib.md5(b'new firmware').hexdigest(), self.file_system.hash('MiSTer'))
+
+    def test_hash___with_corrupt_persisted_hashes___hashes_the_file(self):
+        self.write(FILE_update_all_file_hashes, b'[not json')
+        self.assertEqual(hashlib.md5(b'firmware').hexdigest(), self.create_file_system().hash('MiSTer'))
+
+    def test_hash___from_a_new_file_system_after_inode_changes___reuses_persisted_hash(self):
+        self.file_system.hash('MiSTer')
+        file_system = self.create_file_system()
+        size, mtime_ns, inode = file_system.fingerprint('MiSTer')
+        with patch.object(file_system, 'fingerprint', return_value=(size, mtime_ns, inode + 1)), \
+                patch('update_all.file_system.hash_file', wraps=hash_file) as hash_file_spy:
+            self.assertEqual(hashlib.md5(b'firmware').hexdigest(), file_system.hash('MiSTer'))
+            self.assertEqual(0, hash_file_spy.call_count)
+
+    def test_hash___from_a_new_file_system___only_persists_hashes_of_files_hashed_in_this_run(self):
+        self.write('a.bin', b'a')
+        self.file_system.hash('MiSTer')
+        self.create_file_system().hash('a.bin')
+        with open(os.path.join(self.folder.name, FILE_update_all_file_hashes)) as f:
+            self.assertEqual([os.path.join(self.folder.name, 'a.bin')], list(json.load(f)))
+
+    def test_hash___with_missing_file___raises_file_not_found(self):
+        with self.assertRaises(FileNotFoundError):
+            self.file_system.hash('missing.bin')
+
+    def test_hash_file___with_file_bigger_than_buffer___returns_md5_of_whole_file(self):
+        content = os.urandom(_HASH_BUFFER_SIZE * 2 + 123)
+        self.write('big.bin', content)
+        self.assertEqual(hashlib.md5(content).hexdigest(), hash_file(os.path.join(self.folder.name, 'big.bin')))
+
+    def create_file_system(self):
+        return FileSystemFactory(self.config_provider, {}, NoLogger()).create_for_system_scope()
+
+    def write(self, path, content):
+        path = os.path.join(self.folder.name, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(content)
+
+
+class TestFileSystemDeletePrevious(unittest.TestCase):
+    def setUp(self) -> None:
+        self.folder = tempfile.TemporaryDirectory()
+        self.config_provider = GenericProvider[Config]()
+        self.config_provider.initialize(Config(base_path=self.folder.name, base_system_path=self.folder.name))
+        self.file_system = FileSystemFactory(self.config_provider, {}, NoLogger()).create_for_system_scope()
+        for name in ['_Console/NES_20230101.rbf', '_Console/NES_20230505.rbf', '_Console/NES_beta_20230202.rbf',
+                     '_Console/SNES_20230101.rbf', '_Console/NES.txt', '_Computer/AO486_20230101.rbf']:
+            self.write(name)
+
+    def tearDown(self) -> None:
+        self.folder.cleanup()
+
+    def test_delete_previous_many___deletes_every_version_of_the_given_files(self):
+        self.file_system.delete_previous_many(['_Console/NES_20240101.rbf', '_Computer/AO486_20240101.rbf'])
+        self.assertEqual(['NES.txt', 'SNES_20230101.rbf'], self.files('_Console'))
+        self.assertEqual([], self.files('_Computer'))
+
+    def test_delete_previous_many___returns_deleted_files_by_given_file(self):
+        deleted = self.file_system.delete_previous_many(['_Console/NES_20240101.rbf', '_Console/SNES_20240101.rbf', '_Arcade/Missing_20240101.rbf'])
+        self.assertEqual({
+            '_Console/NES_20240101.rbf': ['NES_20230101.rbf', 'NES_20230505.rbf', 'NES_beta_20230202.rbf'],
+            '_Console/SNES_20240101.rbf': ['SNES_20230101.rbf'],
+        }, {file: sorted(os.path.basename(path) for path in paths) for file, paths in deleted.items()})
+
+    def test_delete_previous_many___scans_each_folder_once(self):
+        with patch('update_all.file_system.os.scandir', wraps=os.scandir) as scandir_spy:
+            self.file_system.delete_previous_many(['_Console/NES_20240101.rbf', '_Console/SNES_20240101.rbf', '_Computer/AO486_20240101.rbf'])
+            self.assertEqual(2, scandir_spy.call_count)
+
+    def test_delete_previous_many___with_undated_file___deletes_nothing(self):
+        self.assertEqual({}, self.file_system.delete_previous_many(['_Console/NES.rbf']))
+        self.assertEqual(5, len(self.files('_Console')))
+
+    def files(self, folder):
+        return sorted(os.listdir(os.path.join(self.folder.name, folder)))
+
+    def write(self, path):
+        path = os.path.join(self.folder.name, path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(b'core')
@@ -0,0 +1,76 @@
+# Copyright (c) 2022 José Manuel Barroso Galindo <theypsilon@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# You can download the latest version of this tool from:
+# https://github.com/theypsilon-test/ua2
+import configparser
+import unittest
+from pathlib import Path
+
+from update_all.ini_document import read_ini_document
+
+dirty_ini = '''# I  don't know
+
+[mister]
+verbose = true ; inline comment
+filter = aaa
+  !bbb
+
+[DEFAULT]
+shared = 1
+
+[jtcores]
+; full line comment
+db_url = https://example.com/jtcores.json.zip
+'''
+
+
+class TestIniDocument(unittest.TestCase):
+    def test_read_ini_document___with_every_fixture___round_trips_text_and_matches_configparser_values(self):
+        for fixture in [*Path('test/fixtures/downloader_ini').iterdir(), dirty_ini]:
+            contents = fixture if isinstance(fixture, str) else fixture.read_text()
+            with self.subTest(fixture=str(fixture)):
+                document = read_ini_document(contents)
+                self.assertEqual(contents, document.text())
+                self.assertEqual(configparser_values(contents), document.values())
+
+    def test_read_ini_document___keeps_preamble_and_raw_section_text(self):
+        document = read_ini_document(dirty_ini)
+        self.assertEqual("# I  don't know\n\n", document.preamble)
+        self.assertEqual(['mister', 'DEFAULT', 'jtcores'], [section.header for section in document.sections])
+        self.assertEqual('[jtcores]\n; full line comment\ndb_url = https://example.com/jtcores.json.zip\n', document.sections[2].text)
+
+    def test_read_ini_document___with_duplicated_section___is_not_valid(self):
+        document = read_ini_document('[a]\nx = 1\n[a]\ny = 2\n')
+        self.assertFalse(document.valid)
+        self.assertEqual({}, document.values())
+
+    def test_read_ini_document___with_duplicated_option___is_not_valid(self):
+        self.assertFalse(read_ini_document('[a]\nx = 1\nX = 2\n').valid)
+
+    def test_read_ini_document___with_option_before_any_section___is_not_valid(self):
+        self.assertFalse(read_ini_document('x = 1\n[a]\n').valid)
+
+    def test_read_ini_document___with_line_without_delimiter___is_not_valid(self):
+        self.assertFalse(read_ini_document('[a]\ngarbage\n').valid)
+
+    def test_read_ini_document___with_sections_differing_in_case___keeps_last_values_in_first_position(self):
+        self.assertEqual({'a': {'y': '2'}, 'b': {}}, read_ini_document('[a]\nx = 1\n[b]\n[A]\ny = 2\n').values())
+
+
+def configparser_values(contents):
+    parser = configparser.ConfigParser(inline_comment_prefixes=(';', '#'))
+    parser.read_string(contents)
+    return {header.lower(): {k.lower(): v for k, v in section.items()} for header, section in parser.items() if header.lower() != 'default'}
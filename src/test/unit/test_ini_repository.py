@@ -0,0 +1,68 @@
+# Copyright (c) 2022 José Manuel Barroso Galindo <theypsilon@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# You can download the latest version of this tool from:
+# https://github.com/theypsilon-test/ua2
+import unittest
+from unittest.mock import patch
+
+from test.fake_filesystem import FileSystemFactory
+from test.file_system_tester_state import FileSystemState
+from test.testing_objects import downloader_ini, default_downloader_ini_content, update_arcade_organizer_ini
+from test.update_all_service_tester import IniRepositoryTester
+from update_all.config import Config
+from update_all.databases import DB_ID_NAMES_TXT
+
+
+class TestIniRepositoryCaches(unittest.TestCase):
+    def setUp(self) -> None:
+        self.file_system = FileSystemFactory(state=FileSystemState(files={
+            downloader_ini: {'content': default_downloader_ini_content()},
+            update_arcade_organizer_ini: {'content': 'ARCADE_ORGANIZER=false\n'},
+        })).create_for_system_scope()
+        self.sut = IniRepositoryTester(file_system=self.file_system)
+
+    def test_does_downloader_ini_need_save___twice_with_same_config___reads_the_file_once(self):
+        with patch.object(self.file_system, 'read_file_contents', wraps=self.file_system.read_file_contents) as read_file_contents:
+            self.assertFalse(self.sut.does_downloader_ini_need_save(Config()))
+            self.assertFalse(self.sut.does_downloader_ini_need_save(Config()))
+            self.assertEqual(1, read_file_contents.call_count)
+
+    def test_does_downloader_ini_need_save___after_changing_config___renders_again_without_reading_the_file(self):
+        self.sut.does_downloader_ini_need_save(Config())
+        with patch.object(self.file_system, 'read_file_contents', wraps=self.file_system.read_file_contents) as read_file_contents:
+            self.assertTrue(self.sut.does_downloader_ini_need_save(Config(databases={DB_ID_NAMES_TXT})))
+            self.assertEqual(0, read_file_contents.call_count)
+
+    def test_does_downloader_ini_need_save___after_file_is_modified___reads_it_again(self):
+        self.sut.does_downloader_ini_need_save(Config())
+        self.file_system.write_file_contents(downloader_ini, '[distribution_mister]\ndb_url = https://example.com/db.json.zip\n')
+        self.assertTrue(self.sut.does_downloader_ini_need_save(Config()))
+
+    def test_write_downloader_ini___then_get_downloader_ini___returns_written_values(self):
+        self.sut.get_downloader_ini()
+        self.sut.write_downloader_ini(Config(databases={DB_ID_NAMES_TXT}))
+        self.assertEqual([DB_ID_NAMES_TXT], list(self.sut.get_downloader_ini()))
+
+    def test_get_arcade_organizer_ini___twice___reads_the_file_once(self):
+        with patch.object(self.file_system, 'read_file_contents', wraps=self.file_system.read_file_contents) as read_file_contents:
+            self.assertFalse(self.sut.get_arcade_organizer_ini().get_bool('arcade_organizer', True))
+            self.assertFalse(self.sut.get_arcade_organizer_ini().get_bool('arcade_organizer', True))
+            self.assertEqual(1, read_file_contents.call_count)
+
+    def test_get_arcade_organizer_ini___after_writing_it___returns_new_values(self):
+        self.sut.get_arcade_organizer_ini()
+        self.sut.write_arcade_organizer({'arcade_organizer': 'true'})
+        self.assertTrue(self.sut.get_arcade_organizer_ini().get_bool('arcade_organizer', False))
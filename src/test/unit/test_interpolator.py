@@ -0,0 +1,68 @@
+# Copyright (c) 2022 José Manuel Barroso Galindo <theypsilon@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# You can download the latest version of this tool from:
+# https://github.com/theypsilon-test/ua2
+import unittest
+from typing import List
+
+from test.update_all_service_tester import UiStub
+from update_all.ui_engine import _Interpolator, _compile_template
+
+
+class TestInterpolator(unittest.TestCase):
+    def setUp(self) -> None:
+        self.ui = UiStub()
+        self.ui.store.update({'region': 'US', 'enabled': 'true', 'count': '3'})
+        self.calls: List[str] = []
+        self.interpolator = _Interpolator({
+            'yesno': {'true': 'Yes', 'false': 'No'},
+            'region': self.formatter,
+            'wrap': {'true': '<{0}-{1}>'},
+        }, self.ui)
+
+    def formatter(self, value):
+        self.calls.append(value)
+        return value.lower()
+
+    def test_interpolate___with_plain_text___returns_same_text(self):
+        self.assertEqual('Hello } world', self.interpolator.interpolate('Hello } world'))
+
+    def test_interpolate___with_variables_and_formatters___replaces_every_placeholder(self):
+        self.assertEqual('3 items, enabled: Yes, region: us, us', self.interpolator.interpolate('{count} items, enabled: {enabled:yesno}, region: {region}, {region}'))
+
+    def test_interpolate___with_formatter_arguments___formats_them_into_the_result(self):
+        self.assertEqual('[<a-b>]', self.interpolator.interpolate('[{enabled:wrap=a,b}]'))
+
+    def test_interpolate___with_unclosed_placeholder___keeps_it_as_text(self):
+        self.assertEqual('3 {count', self.interpolator.interpolate('{count} {count'))
+
+    def test_interpolate___with_unknown_formatter___raises_value_error(self):
+        with self.assertRaises(ValueError):
+            self.interpolator.interpolate('{count:missing}')
+
+    def test_interpolate___twice_with_same_values___reuses_previous_result(self):
+        self.interpolator.interpolate('Region: {region}')
+        self.interpolator.interpolate('Region: {region}')
+        self.assertEqual(['US'], self.calls)
+
+    def test_interpolate___after_a_value_changes___renders_again(self):
+        self.interpolator.interpolate('Region: {region}')
+        self.ui.set_value('region', 'EU')
+        self.assertEqual('Region: eu', self.interpolator.interpolate('Region: {region}'))
+
+    def test_compile_template___lists_each_variable_once(self):
+        self.assertEqual(('a', 'b'), _compile_template('{a} {b:f} {a:g=1}').variables)
+
@@ -0,0 +1,137 @@
+# Copyright (c) 2022 José Manuel Barroso Galindo <theypsilon@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# You can download the latest version of this tool from:
+# https://github.com/theypsilon-test/ua2
+import gzip
+import os
+import tempfile
+import unittest
+
+from test.fake_filesystem import FileSystemFactory
+from test.logger_tester import NoLogger
+from test.update_all_service_tester import LocalRepositoryTester
+from update_all.config import Config
+from update_all.constants import FOLDER_update_all_logs, FILE_update_all_logs_index, FILE_update_all_log, DEFAULT_LOG_HISTORY_SIZE
+from update_all.file_system import FileSystemFactory as ProductionFileSystemFactory
+from update_all.other import GenericProvider
+
+tmp_log = '/tmp/update_all_tmp_log'
+
+
+class TestLocalRepositoryLogHistory(unittest.TestCase):
+    def setUp(self) -> None:
+        self.file_system = FileSystemFactory().create_for_system_scope()
+        self.repository = LocalRepositoryTester(file_system=self.file_system)
+
+    def test_save_log_from_tmp___stores_compressed_log_and_index_entry(self):
+        self.save_log(exit_code=1, size=100)
+
+        self.assertTrue(self.file_system.is_file(self.repository.log_path()))
+        self.assertFalse(self.file_system.is_file(tmp_log))
+        [entry] = self.logs_index()
+        self.assertEqual((1, 100, 50), (entry['exit_code'], entry['size'], entry['compressed_size']))
+        self.assertEqual(f'{FOLDER_update_all_logs}/{entry["file"]}'.lower(), self.repository.log_path().lower())
+
+    def test_save_log_from_tmp___with_full_history___removes_oldest_log(self):
+        oldest = self.save_log_in_new_run()
+        for _ in range(DEFAULT_LOG_HISTORY_SIZE):
+            self.save_log_in_new_run()
+
+        self.assertFalse(self.file_system.is_file(oldest))
+        self.assertEqual(DEFAULT_LOG_HISTORY_SIZE, len(self.logs_index()))
+
+    def test_save_log_from_tmp___in_same_second_than_previous_run___does_not_overwrite_it(self):
+        paths = {self.save_log_in_new_run() for _ in range(3)}
+        self.assertEqual(3, len(paths))
+
+    def test_save_log_from_tmp___with_corrupt_index___starts_a_new_one(self):
+        self.file_system.touch(FILE_update_all_logs_index)
+        self.save_log()
+        self.assertEqual(1, len(self.logs_index()))
+
+    def test_save_log_from_tmp___with_lost_index___prunes_archives_left_in_the_logs_folder(self):
+        oldest = self.save_log_in_new_run()
+        for _ in range(DEFAULT_LOG_HISTORY_SIZE - 1):
+            self.save_log_in_new_run()
+        self.file_system.unlink(FILE_update_all_logs_index)
+
+        self.save_log_in_new_run()
+
+        self.assertFalse(self.file_system.is_file(oldest))
+        self.assertEqual(DEFAULT_LOG_HISTORY_SIZE, len(self.logs_index()))
+        self.assertEqual(DEFAULT_LOG_HISTORY_SIZE + 1, len(self.file_system.list_files(FOLDER_update_all_logs)))
+
+    def test_save_log_from_tmp___keeps_latest_plain_log_at_legacy_path(self):
+        self.save_log()
+        self.assertTrue(self.file_system.is_file(FILE_update_all_log))
+
+    def test_save_log_from_tmp___writes_archive_legacy_log_and_index_once_each(self):
+        self.file_system.touch(tmp_log)
+        previous_records = len(self.file_system.write_records)
+
+        self.repository.save_log_from_tmp(tmp_log)
+
+        writes = [record['scope'] for record in self.file_system.write_records[previous_records:] if record['scope'] not in ('make_dirs', 'unlink', 'touch')]
+        self.assertEqual(['compress_file', 'save_json'], writes)
+        self.assertTrue(self.file_system.is_file(FILE_update_all_log))
+
+    def save_log_in_new_run(self):
+        self.repository = LocalRepositoryTester(file_system=self.file_system)
+        self.save_log()
+        return self.repository.log_path()
+
+    def save_log(self, exit_code=0, size=10):
+        self.file_system.touch(tmp_log)
+        self.file_system.data['files'][tmp_log]['size'] = size
+        self.repository.record_exit_code(exit_code)
+        self.repository.save_log_from_tmp(tmp_log)
+
+    def logs_index(self):
+        return self.file_system.load_dict_from_file(FILE_update_all_logs_index)['logs']
+
+
+class TestFileSystemCompressFile(unittest.TestCase):
+    def test_compress_file___writes_gzip_readable_copy_and_returns_sizes(self):
+        with tempfile.TemporaryDirectory() as folder:
+            config_provider = GenericProvider[Config]()
+            config_provider.initialize(Config(base_path=folder, base_system_path=folder))
+            file_system = ProductionFileSystemFactory(config_provider, {}, NoLogger()).create_for_system_scope()
+            content = b'Line of log\n' * 1000
+            with open(os.path.join(folder, 'source.log'), 'wb') as f:
+                f.write(content)
+
+            sizes = file_system.compress_file('source.log', 'target.log.gz')
+
+            with gzip.open(os.path.join(folder, 'target.log.gz'), 'rb') as f:
+                self.assertEqual(content, f.read())
+            self.assertEqual((len(content), os.path.getsize(os.path.join(folder, 'target.log.gz'))), sizes)
+            self.assertEqual(['source.log', 'target.log.gz'], sorted(os.listdir(folder)))
+
+    def test_compress_file___with_plain_target___also_writes_uncompressed_copy(self):
+        with tempfile.TemporaryDirectory() as folder:
+            config_provider = GenericProvider[Config]()
+            config_provider.initialize(Config(base_path=folder, base_system_path=folder))
+            file_system = ProductionFileSystemFactory(config_provider, {}, NoLogger()).create_for_system_scope()
+            content = b'Line of log\n' * 1000
+            with open(os.path.join(folder, 'source.log'), 'wb') as f:
+                f.write(content)
+
+            file_system.compress_file('source.log', 'target.log.gz', 'plain.log')
+
+            with gzip.open(os.path.join(folder, 'target.log.gz'), 'rb') as f:
+                self.assertEqual(content, f.read())
+            with open(os.path.join(folder, 'plain.log'), 'rb') as f:
+                self.assertEqual(content, f.read())
@@ -0,0 +1,128 @@
+# Copyright (c) 2022 José Manuel Barroso Galindo <theypsilon@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# You can download the latest version of this tool from:
+# https://github.com/theypsilon-test/ua2
+import unittest
+import io
+import threading
+
+from test.logger_tester import NoLogger
+from test.unit.test_trace_recorder import LocalRepositorySpy
+from update_all.local_repository import LocalRepository
+from update_all.log_writer import AsyncLogWriter
+from update_all.logger import FileLoggerDecorator
+from update_all.other import GenericProvider
+
+
+class TestAsyncLogWriter(unittest.TestCase):
+    def test_close___after_many_records___writes_all_of_them_in_few_writes(self):
+        file = FileSpy()
+        writer = AsyncLogWriter(file, batch_size=1000, flush_interval=60)
+        for i in range(1000):
+            writer.write(f'line {i}\n')
+        writer.close()
+
+        self.assertEqual(''.join(f'line {i}\n' for i in range(1000)), file.contents)
+        self.assertEqual(1000, writer.records)
+        self.assertLess(writer.writes, 20)
+        self.assertFalse(file.closed)
+
+    def test_write___below_batch_size___is_flushed_after_the_interval(self):
+        file = FileSpy()
+        writer = AsyncLogWriter(file, batch_size=1000, flush_interval=0.01)
+        writer.write('hello\n')
+
+        self.assertTrue(file.flushed.wait(5))
+        self.assertEqual('hello\n', file.contents)
+        writer.close()
+
+    def test_write___after_close___is_written_synchronously(self):
+        file = FileSpy()
+        writer = AsyncLogWriter(file, flush_interval=60)
+        writer.write('queued\n')
+        writer.close()
+        writer.write('late\n')
+        writer.close()
+
+        self.assertEqual('queued\nlate\n', file.contents)
+
+    def test_write___from_another_thread_while_closing___keeps_every_record(self):
+        file = FileSpy()
+        writer = AsyncLogWriter(file, flush_interval=60)
+        halfway = threading.Event()
+
+        def produce():
+            for i in range(2000):
+                writer.write(f'line {i}\n')
+                if i == 1000:
+                    halfway.set()
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        halfway.wait(5)
+        writer.close()
+        producer.join()
+
+        self.assertEqual(''.join(f'line {i}\n' for i in range(2000)), file.contents)
+        self.assertEqual(2000, writer.records)
+
+    def test_write___after_file_is_closed___is_ignored(self):
+        file = FileSpy()
+        writer = AsyncLogWriter(file)
+        writer.close()
+        file.close()
+        writer.write('late\n')
+
+        self.assertEqual('', file.contents)
+
+
+class TestFileLoggerDecorator(unittest.TestCase):
+    def test_finalize___after_print_and_debug___saves_every_line_in_order(self):
+        local_repository = LogSavingLocalRepositorySpy()
+        local_repository_provider = GenericProvider[LocalRepository]()
+        local_repository_provider.initialize(local_repository)
+        logger = FileLoggerDecorator(NoLogger(), local_repository_provider)
+
+        for i in range(100):
+            logger.print('print', i, sep=' ')
+            logger.debug('debug', i, sep=' ', end='!\n')
+        logger.finalize()
+
+        self.assertEqual(''.join(f'print {i}\ndebug {i}!\n' for i in range(100)), local_repository.log)
+
+
+class FileSpy(io.StringIO):
+    def __init__(self):
+        super().__init__()
+        self.contents = ''
+        self.flushed = threading.Event()
+
+    def write(self, text):
+        self.contents += text
+        return len(text)
+
+    def flush(self):
+        self.flushed.set()
+
+
+class LogSavingLocalRepositorySpy(LocalRepositorySpy):
+    def __init__(self):
+        super().__init__()
+        self.log = None
+
+    def save_log_from_tmp(self, path):
+        with open(path) as f:
+            self.log = f.read()
@@ -15,6 +15,7 @@
 
 # You can download the latest version of this tool from:
 # https://github.com/theypsilon-test/ua2
+import copy
 import unittest
 
 from test.ui_model_test_utils import special_navigate_targets, gather_target_variables, \
@@ -125,4 +126,24 @@ class TestSettingsScreenModel(unittest.TestCase):
             for v in description['values']:
                 values.add(v)
 
-        self.assertEqual({'true', 'false'}, values)
\ No newline at end of file
+        self.assertEqual({'true', 'false'}, values)
+
+    def test_settings_screen_model___is_built_only_once(self):
+        self.assertIs(self.model, settings_screen_model())
+
+    def test_settings_screen_model___is_read_only(self):
+        with self.assertRaises(TypeError):
+            self.model['items']['main_menu']['ui'] = 'message'
+        with self.assertRaises(TypeError):
+            self.model['items']['main_menu']['entries'].append({})
+        with self.assertRaises(TypeError):
+            self.model['variables'].update({'new_variable': {}})
+
+    def test_settings_screen_model___has_all_its_types_already_expanded(self):
+        base_types = self.model.get('base_types', {})
+        self.assertEqual([], [n for n in gather_all_nodes(self.model) if 'type' in n and n['type'] in base_types])
+
+    def test_deepcopy_of_settings_screen_model___is_mutable(self):
+        model = copy.deepcopy(self.model)
+        model['items']['main_menu']['entries'].append({})
+        self.assertEqual(len(self.model['items']['main_menu']['entries']) + 1, len(model['items']['main_menu']['entries']))
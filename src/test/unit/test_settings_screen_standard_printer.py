@@ -0,0 +1,125 @@
+# Copyright (c) 2022 José Manuel Barroso Galindo <theypsilon@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# You can download the latest version of this tool from:
+# https://github.com/theypsilon-test/ua2
+import curses
+import unittest
+from typing import Any, List
+from unittest.mock import patch
+
+from update_all.settings_screen_standard_printer import _Drawer, _Layout
+from update_all.ui_engine import Interpolator
+
+
+class TestSettingsScreenStandardPrinter(unittest.TestCase):
+    def setUp(self) -> None:
+        patches: List[Any] = [
+            patch.object(curses, 'LINES', 40, create=True),
+            patch.object(curses, 'COLS', 100, create=True),
+            patch.object(curses, 'color_pair', lambda n: n << 8),
+            patch.object(curses, 'doupdate', lambda: None),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+
+        self.window = WindowSpy()
+        self.layout = LayoutSpy()
+        self.drawer = _Drawer(self.window, self.layout, IdentityInterpolator())
+
+    def test_paint___the_first_time___writes_every_line(self):
+        self.draw_menu(selected=0)
+        self.assertEqual({16, 18, 19, 20, 21, 23}, self.window.written_lines())
+        self.assertEqual(1, self.layout.paints)
+
+    def test_paint___after_moving_the_selection___only_writes_the_lines_that_changed(self):
+        self.draw_menu(selected=0)
+        self.window.calls.clear()
+
+        self.draw_menu(selected=2)
+        self.assertEqual({19, 21}, self.window.written_lines())
+
+    def test_paint___after_another_drawer_painted___writes_every_line_again(self):
+        self.draw_menu(selected=0)
+        self.layout.mark_drawn_by(object())
+        self.window.calls.clear()
+
+        self.draw_menu(selected=2)
+        self.assertEqual({16, 18, 19, 20, 21, 23}, self.window.written_lines())
+
+    def test_paint___after_terminal_resize___writes_every_line_again(self):
+        self.draw_menu(selected=0)
+        self.window.calls.clear()
+
+        with patch.object(curses, 'COLS', 80, create=True):
+            self.draw_menu(selected=0)
+
+        self.assertEqual({16, 18, 19, 20, 21, 23}, self.window.written_lines())
+        self.assertEqual(2, len(set(self.layout.boxes)))
+
+    def draw_menu(self, selected):
+        self.drawer.start({'header': 'Header'})
+        self.drawer.add_text_line('Some text')
+        for index, option in enumerate(['1 First', '2 Second', '3 Third']):
+            self.drawer.add_menu_entry(option, 'info', index == selected)
+        self.drawer.add_action('Select', True)
+        self.drawer.add_action('Back', False)
+        self.drawer.paint()
+
+
+class WindowSpy:
+    def __init__(self):
+        self.calls = []
+
+    def addstr(self, y, x, text, mode):
+        self.calls.append((y, x, text, mode))
+
+    def noutrefresh(self):
+        pass
+
+    def getch(self):
+        return 0
+
+    def written_lines(self):
+        return {y for y, _, _, _ in self.calls}
+
+
+class LayoutSpy(_Layout):
+    def __init__(self):
+        self.paints = 0
+        self.boxes = []
+        self._drawn_by = None
+
+    def set_sub_theme(self, _sub_theme):
+        pass
+
+    def paint_layout(self, *box):
+        self.paints += 1
+        self.boxes.append(box)
+
+    def reset(self):
+        self._drawn_by = None
+
+    def is_drawn_by(self, drawer):
+        return self._drawn_by is drawer
+
+    def mark_drawn_by(self, drawer):
+        self._drawn_by = drawer
+
+
+class IdentityInterpolator(Interpolator):
+    def interpolate(self, text):
+        return text
@@ -0,0 +1,72 @@
+# Copyright (c) 2022 José Manuel Barroso Galindo <theypsilon@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# You can download the latest version of this tool from:
+# https://github.com/theypsilon-test/ua2
+import unittest
+
+from test.logger_tester import NoLogger
+from test.update_all_service_tester import LocalRepositoryTester
+from update_all.logger import FileLoggerDecorator
+from update_all.local_repository import LocalRepository
+from update_all.other import GenericProvider
+from update_all.trace_recorder import TraceRecorder
+
+
+class TestTraceRecorder(unittest.TestCase):
+
+    def test_chrome_trace___with_nested_spans___contains_child_within_parent(self) -> None:
+        recorder = TraceRecorder()
+        with recorder.span('parent'):
+            with recorder.span('child'):
+                pass
+
+        events = {e['name']: e for e in recorder.chrome_trace()['traceEvents'] if e['ph'] == 'X'}
+        parent, child = events['parent'], events['child']
+        self.assertEqual(parent['tid'], child['tid'])
+        self.assertLessEqual(parent['ts'], child['ts'])
+        self.assertLessEqual(child['ts'] + child['dur'], parent['ts'] + parent['dur'])
+
+    def test_chrome_trace___when_span_raises___still_records_it(self) -> None:
+        recorder = TraceRecorder()
+        with self.assertRaises(ValueError):
+            with recorder.span('failing'):
+                raise ValueError()
+
+        self.assertEqual(['failing'], [e['name'] for e in recorder.chrome_trace()['traceEvents'] if e['ph'] == 'X'])
+
+    def test_file_logger_finalize___after_some_spans___saves_chrome_trace(self) -> None:
+        local_repository = LocalRepositorySpy()
+        local_repository_provider = GenericProvider[LocalRepository]()
+        local_repository_provider.initialize(local_repository)
+        logger = FileLoggerDecorator(NoLogger(), local_repository_provider)
+
+        with logger.span('UpdateAllService.full_run'):
+            logger.bench('Something happened')
+        logger.finalize()
+
+        self.assertEqual({'UpdateAllService.full_run', 'Something happened'}, {e['name'] for e in local_repository.trace['traceEvents'] if e['ph'] != 'M'})
+
+
+class LocalRepositorySpy(LocalRepositoryTester):
+    def __init__(self):
+        super().__init__()
+        self.trace = None
+
+    def save_log_from_tmp(self, path):
+        pass
+
+    def save_trace(self, trace):
+        self.trace = trace
@@ -15,10 +15,12 @@
 
 # You can download the latest version of this tool from:
 # https://github.com/theypsilon-test/ua2
+import copy
 import unittest
 
 from update_all.ui_model_utilities import gather_variable_declarations, \
-    dynamic_convert_string
+    dynamic_convert_string, variable_index
+from update_all.settings_screen_model import settings_screen_model
 
 
 class TestUiModelsUtilities(unittest.TestCase):
@@ -35,6 +37,27 @@ class TestUiModelsUtilities(unittest.TestCase):
         expected = {"update_all_version", "arcade_offset_downloader"}
         self.assertEqual(expected, set(gather_variable_declarations(test_model(), 'x')))
 
+    def test_gather_variable_declarations___on_mutable_copy_of_read_only_model___matches_its_index(self):
+        model = settings_screen_model()
+        for group in [None, 'ua_ini', 'db', 'unknown']:
+            with self.subTest(group=group):
+                self.assertEqual(variable_index(model).declarations(group), gather_variable_declarations(copy.deepcopy(model), group))
+
+    def test_variable_index___on_unknown_group___returns_no_declarations(self):
+        self.assertEqual({}, variable_index(test_model()).declarations('unknown'))
+
+    def test_variable_index___on_read_only_model___is_built_only_once(self):
+        model = settings_screen_model()
+        self.assertIs(variable_index(model), variable_index(model))
+
+    def test_variable_index_declarations___on_read_only_model___can_not_be_modified(self):
+        with self.assertRaises(TypeError):
+            variable_index(settings_screen_model()).declarations()['new_variable'] = {}
+
+    def test_variable_index___on_mutable_model___is_rebuilt_each_time(self):
+        model = test_model()
+        self.assertIsNot(variable_index(model), variable_index(model))
+
 
 def test_model(): return {
     "variables": {
@@ -0,0 +1,74 @@
+# Copyright (c) 2022 José Manuel Barroso Galindo <theypsilon@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# You can download the latest version of this tool from:
+# https://github.com/theypsilon-test/ua2
+import unittest
+from unittest.mock import MagicMock
+
+from update_all.ui_engine import _UiRuntime, _UiSystem, UiSectionFactory
+
+
+class TestUiRuntime(unittest.TestCase):
+    def setUp(self) -> None:
+        self.factory = UiSectionFactorySpy()
+        ui_system = _UiSystem(screen=MagicMock(), entrypoint='main_menu', model=test_model(), ui_application=MagicMock())
+        self.runtime = _UiRuntime(test_model(), 'main_menu', ui_system, self.factory)
+
+    def test_make_section_state___twice_for_the_same_temporary_dialog___compiles_it_once(self):
+        dialog = {'ui': 'message', 'text': ['Hello']}
+        self.runtime._make_section_state(dialog)
+        self.runtime._make_section_state(dialog)
+
+        first, second = self.factory.created
+        self.assertIsNot(first, second)
+        self.assertIs(first['formatters'], second['formatters'])
+        self.assertEqual(1, len(self.runtime._compiled_sections))
+
+    def test_make_section_state___after_entering_a_section_with_variables___inherits_them(self):
+        dialog = {'ui': 'message'}
+        self.runtime._make_section_state(dialog)
+        self.runtime._history.append('sub_menu')
+        self.runtime._make_section_state(dialog)
+
+        self.assertEqual({'top'}, set(self.factory.created[0]['variables']))
+        self.assertEqual({'top', 'sub'}, set(self.factory.created[1]['variables']))
+
+    def test_make_section_state___after_entering_a_section_without_variables___reuses_compiled_section(self):
+        dialog = {'ui': 'message'}
+        self.runtime._make_section_state(dialog)
+        self.runtime._history.append('main_menu')
+        self.runtime._make_section_state(dialog)
+
+        self.assertEqual(1, len(self.runtime._compiled_sections))
+
+
+def test_model():
+    return {
+        'variables': {'top': {'default': 'a'}},
+        'items': {
+            'main_menu': {'ui': 'menu'},
+            'sub_menu': {'ui': 'menu', 'variables': {'sub': {'default': 'b'}}},
+        }
+    }
+
+
+class UiSectionFactorySpy(UiSectionFactory):
+    def __init__(self):
+        self.created = []
+
+    def create_ui_section(self, ui_type, data, interpolator):
+        self.created.append(data)
+        return object()
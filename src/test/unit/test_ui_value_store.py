@@ -0,0 +1,41 @@
+# Copyright (c) 2022 José Manuel Barroso Galindo <theypsilon@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# You can download the latest version of this tool from:
+# https://github.com/theypsilon-test/ua2
+import unittest
+
+from update_all.ui_value_store import UiValueStore
+
+
+class TestUiValueStore(unittest.TestCase):
+    def setUp(self) -> None:
+        self.store = UiValueStore()
+        self.store.update({'a': '1', 'b': '2'})
+
+    def test_revision___after_setting_a_new_value___increases_only_for_that_variable(self):
+        revision_b = self.store.revision(['b'])
+        self.store.set('a', '3')
+        self.assertGreater(self.store.revision(['a']), revision_b)
+        self.assertEqual(revision_b, self.store.revision(['b']))
+        self.assertEqual(self.store.revision(['a']), self.store.revision())
+
+    def test_revision___after_setting_the_same_value___does_not_change(self):
+        revision = self.store.revision()
+        self.store.set('a', '1')
+        self.assertEqual(revision, self.store.revision())
+
+    def test_revision___of_unknown_variable___is_zero(self):
+        self.assertEqual(0, self.store.revision(['unknown']))
@@ -15,7 +15,7 @@
 
 # You can download the latest version of this tool from:
 # https://github.com/theypsilon-test/ua2
-from typing import Tuple, Any, List, Set, Dict, Callable
+from typing import Tuple, Any, List, Set, Dict, Callable, Optional, Iterable
 from unittest.mock import MagicMock
 
 from test.countdown_stub import CountdownStub
@@ -37,7 +37,8 @@ from update_all.settings_screen import SettingsScreen
 from update_all.settings_screen_printer import SettingsScreenPrinter, SettingsScreenThemeManager
 from update_all.store_migrator import StoreMigrator, make_new_local_store
 from update_all.transition_service import TransitionService
-from update_all.ui_engine import Ui
+from update_all.ui_engine import Ui, Effect
+from update_all.ui_value_store import UiValueStore
 from update_all.ui_engine_dialog_application import UiDialogDrawerFactory
 from update_all.update_all_service import UpdateAllServiceFactory, UpdateAllService
 
@@ -148,17 +149,21 @@ class SettingsScreenTester(SettingsScreen):
 
 class UiStub(Ui):
     def __init__(self):
-        self.variables = {}
+        self.store = UiValueStore()
+        self.variables = self.store.values
         self.effects = {}
         self.formatters = {}
 
     def get_value(self, key: str) -> str:
-        return self.variables[key]
+        return self.store.get(key)
 
     def set_value(self, key: str, value: Any) -> None:
-        self.variables[key] = value
+        self.store.set(key, value)
 
-    def add_custom_effects(self, effects: Dict[str, Callable[[], None]]):
+    def get_revision(self, keys: Optional[Iterable[str]] = None) -> int:
+        return self.store.revision(keys)
+
+    def add_custom_effects(self, effects: Dict[str, Callable[[Effect], None]]):
         self.effects = effects
 
     def add_custom_formatters(self, formatters: Dict[str, Callable[[str], str]]):
@@ -217,7 +222,7 @@ class UpdateAllServiceTester(UpdateAllService):
             file_system=file_system,
             os_utils=os_utils,
             countdown=countdown or CountdownStub(),
-            settings_screen=settings_screen,
+            settings_screen_factory=lambda: settings_screen,
             transition_service=transition_service,
             checker=CheckerTester(),
             store_provider=store_provider or GenericProvider[LocalStore](),
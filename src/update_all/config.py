@@ -41,6 +41,8 @@ class Config:
     not_mister: bool = False
     verbose: bool = False
     temporary_downloader_ini: bool = False
+    downloader_timeout: int = 300
+    downloader_retries: int = 3
 
     # Global Updating Toggles
     databases: Set[str] = field(default_factory=lambda: {DB_ID_DISTRIBUTION_MISTER, DB_ID_JTCORES, AllDBs.COIN_OP_COLLECTION.db_id})
@@ -17,15 +17,15 @@
 # https://github.com/theypsilon-test/ua2
 import json
 import time
-from distutils.util import strtobool
 from pathlib import Path
 
 from update_all.config import Config
-from update_all.constants import MEDIA_FAT, KENV_CURL_SSL, KENV_COMMIT, KENV_LOCATION_STR, MISTER_ENVIRONMENT, KENV_DEBUG
+from update_all.constants import MEDIA_FAT, KENV_CURL_SSL, KENV_COMMIT, KENV_LOCATION_STR, MISTER_ENVIRONMENT, KENV_DEBUG, \
+    K_DOWNLOADER_TIMEOUT, K_DOWNLOADER_RETRIES
 from update_all.databases import DB_ID_JTCORES, DB_ID_NAMES_TXT, names_locale_by_db_url, model_variables_by_db_id, \
     AllDBs, DB_ID_DISTRIBUTION_MISTER
 from update_all.ini_repository import IniRepository
-from update_all.ini_parser import IniParser
+from update_all.ini_parser import IniParser, strtobool
 from update_all.local_store import LocalStore
 from update_all.logger import Logger
 
@@ -45,6 +45,8 @@ class ConfigReader:
             config.base_system_path = mister_section.get_string('base_system_path', config.base_path)
             config.paths_from_downloader_ini = mister_section.has('base_path')
             config.verbose = mister_section.get_bool('verbose', False)
+            config.downloader_timeout = mister_section.get_int(K_DOWNLOADER_TIMEOUT, config.downloader_timeout)
+            config.downloader_retries = mister_section.get_int(K_DOWNLOADER_RETRIES, config.downloader_retries)
         else:
             config.base_path = str(calculate_base_path(self._env))
             config.base_system_path = config.base_path
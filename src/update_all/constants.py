@@ -26,10 +26,16 @@ DEFAULT_DEBUG = 'false'
 
 MISTER_ENVIRONMENT = 'mister'
 STANDARD_UI_THEME = 'Blue Installer'
+DEFAULT_LOG_HISTORY_SIZE = 10
 
 # Downloader files
 FILE_update_all_storage = 'Scripts/.config/update_all/update_all.json.zip'
 FILE_update_all_log = 'Scripts/.config/update_all/update_all.log'
+FOLDER_update_all_logs = 'Scripts/.config/update_all/logs'
+FILE_update_all_logs_index = 'Scripts/.config/update_all/logs/index.json'
+FILE_update_all_trace = 'Scripts/.config/update_all/update_all.trace.json'
+FILE_update_all_file_hashes = 'Scripts/.config/update_all/file_hashes.json'
+FOLDER_update_all_http_cache = 'Scripts/.config/update_all/http_cache'
 FILE_update_all_ini = 'Scripts/update_all.ini'
 FILE_update_jtcores_ini = 'Scripts/update_jtcores.ini'
 FILE_update_jtcores_sh = 'Scripts/update_jtcores.sh'
@@ -21,7 +21,7 @@ import sys
 import time
 from abc import ABC, abstractmethod
 from enum import unique, IntEnum, auto
-from multiprocessing import Process, Value
+from typing import Optional
 
 from update_all.cli_output_formatting import bold
 
@@ -42,12 +42,14 @@ class CountdownImpl(Countdown):
     def execute_count(self, count) -> CountdownOutcome:
         try:
             os_specifics = make_os_specifics()
-            os_specifics.initialize()
+        except Exception:
+            return CountdownOutcome.CONTINUE
 
-            char = Value('i', 0)
-            ends = Value('i', 0)
+        return self._execute_count(os_specifics, count)
 
-            child_process = Process(target=read_characters, args=(char, ends, os_specifics.context()), daemon=True)
+    def _execute_count(self, os_specifics, count) -> CountdownOutcome:
+        try:
+            os_specifics.initialize()
 
             print()
             print(f" {bold('*')}Press <{bold('UP')}>, To enter the SETTINGS screen.")
@@ -59,14 +61,14 @@ class CountdownImpl(Countdown):
         result = CountdownOutcome.CONTINUE
 
         try:
-            child_process.start()
-
-            begin = time.time()
-            end = begin + float(count)
-            now = begin
+            end = time.monotonic() + float(count)
             latest_seconds = -1
-            while now < end:
-                seconds = math.floor(end - now) + 1
+            while True:
+                remaining = end - time.monotonic()
+                if remaining <= 0:
+                    break
+
+                seconds = math.floor(remaining) + 1
                 if seconds != latest_seconds:
                     seconds_str = f'{seconds} seconds' if seconds >= 10 else f' {seconds} seconds'
                     print(f'                                        \rStarting in {seconds_str}.', end='')
@@ -75,69 +77,27 @@ class CountdownImpl(Countdown):
                     sys.stdout.flush()
                     latest_seconds = seconds
 
-                char_value = chr(char.value)
-                if char_value == 'A':
-                    result = CountdownOutcome.SETTINGS_SCREEN
-                    break
-                elif char_value == 'B':
+                # Sleeps until the shown second changes, unless a key arrives before.
+                outcome = outcome_from_keys(os_specifics.read_keys(remaining - (seconds - 1)))
+                if outcome is not None:
+                    result = outcome
                     break
 
-                time.sleep(1.0 / 120.0)
-                now = time.time()
-
         finally:
-            ends.value = 1
-            time.sleep(1.0 / 60.0)
-
-            child_process.terminate()
-            time.sleep(1.0 / 60.0)
-
-            child_process.close()
             os_specifics.finalize()
 
         return result
 
 
-def read_characters(char, ends, context):
-    with context:
-        while ends.value == 0:
-            char.value = ord(_getch())
-            time.sleep(1.0 / 120.0)
-
-
-def make_getch():
-    try:
-        return _GetchWindows()
-    except ImportError:
-        return _GetchUnix()
-
-
-class _GetchUnix:
-    def __init__(self):
-        import sys, tty, termios
-
-    def __call__(self):
-        import sys, tty, termios
-        fd = sys.stdin.fileno()
-        old_settings = termios.tcgetattr(fd)
-        try:
-            tty.setraw(sys.stdin.fileno())
-            ch = sys.stdin.read(1)
-        finally:
-            termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
-        return ch
-
-
-class _GetchWindows:
-    def __init__(self):
-        import msvcrt
-
-    def __call__(self):
-        import msvcrt
-        return msvcrt.getch()
-
+def outcome_from_keys(keys: str) -> Optional[CountdownOutcome]:
+    # UP and DOWN arrows are sent as the escape sequences "ESC [ A" and "ESC [ B".
+    for key in reversed(keys):
+        if key == 'A':
+            return CountdownOutcome.SETTINGS_SCREEN
+        elif key == 'B':
+            return CountdownOutcome.CONTINUE
 
-_getch = make_getch()
+    return None
 
 
 def make_os_specifics():
@@ -148,34 +108,34 @@ def make_os_specifics():
 
 
 class _OsSpecificsLinux:
-    def __init__(self):
-        import tty, sys, termios
-        self._oldtty = None
-        self._fdstdin = sys.stdin.fileno()
+    def __init__(self, fd: Optional[int] = None):
+        self._fd = sys.stdin.fileno() if fd is None else fd
+        self._old_settings = None
+        self._end_of_input = False
 
     def initialize(self):
-        import termios, sys
-        self._oldtty = termios.tcgetattr(sys.stdin)
+        import termios, tty
+        self._old_settings = termios.tcgetattr(self._fd)
+        tty.setcbreak(self._fd, termios.TCSANOW)  # Keeps the keys pressed while the intro was printing.
 
     def finalize(self):
-        import termios, sys
-        termios.tcsetattr(sys.stdin, termios.TCSADRAIN, self._oldtty)
-
-    def context(self):
-        return _LinuxContext(self._fdstdin)
-
+        import termios
+        termios.tcsetattr(self._fd, termios.TCSADRAIN, self._old_settings)
 
-class _LinuxContext(object):
-    def __init__(self, fdstdin):
-        self.fdstdin = fdstdin
+    def read_keys(self, timeout: float) -> str:
+        import select
+        if self._end_of_input:
+            time.sleep(timeout)
+            return ''
 
-    def __enter__(self):
-        self.fin = os.fdopen(self.fdstdin)
-        sys.stdin = self.fin
-        return self
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if len(readable) == 0:
+            return ''
 
-    def __exit__(self, type, value, traceback):
-        self.fin.close()
+        data = os.read(self._fd, 64)
+        if len(data) == 0:
+            self._end_of_input = True
+        return data.decode('latin-1')
 
 
 class _OsSpecificsWindows:
@@ -188,16 +148,20 @@ class _OsSpecificsWindows:
     def finalize(self):
         pass
 
-    def context(self):
-        return _WindowsContext()
-
-
-class _WindowsContext(object):
-    def __init__(self):
-        pass
+    def read_keys(self, timeout: float) -> str:
+        # Only used on Windows, the check lets type checkers on other platforms skip the msvcrt calls.
+        if sys.platform != 'win32':
+            return ''
 
-    def __enter__(self):
-        return self
+        # msvcrt can't wait on the console with a timeout, so it has to check it periodically.
+        import msvcrt
+        end = time.monotonic() + timeout
+        while not msvcrt.kbhit():
+            if time.monotonic() >= end:
+                return ''
+            time.sleep(1.0 / 60.0)
 
-    def __exit__(self, type, value, traceback):
-        pass
+        keys = ''
+        while msvcrt.kbhit():
+            keys += msvcrt.getwch()
+        return keys
@@ -16,6 +16,7 @@
 # You can download the latest version of this tool from:
 # https://github.com/theypsilon-test/ua2
 
+import contextlib
 import os
 import hashlib
 import shutil
@@ -23,10 +24,13 @@ import json
 import tempfile
 import re
 import zipfile
+import gzip
+import threading
 from abc import ABC, abstractmethod
 from pathlib import Path
+from typing import Dict
 from update_all.config import AllowDelete
-from update_all.constants import K_ALLOW_DELETE, FOLDER_scripts_config_lc
+from update_all.constants import K_ALLOW_DELETE, FOLDER_scripts_config_lc, FILE_update_all_file_hashes
 from update_all.other import ClosableValue
 
 
@@ -37,12 +41,13 @@ class FileSystemFactory:
         self._logger = logger
         self._unique_temp_filenames = set()
         self._unique_temp_filenames.add(None)
+        self._file_hashes = _FileHashes()
 
     def create_for_system_scope(self):
         return self.create_for_config(self._config)
 
     def create_for_config(self, config):
-        return _FileSystem(config, self._path_dictionary, self._logger, self._unique_temp_filenames)
+        return _FileSystem(config, self._path_dictionary, self._logger, self._unique_temp_filenames, self._file_hashes)
 
 
 class FileSystem(ABC):
@@ -75,6 +80,10 @@ class FileSystem(ABC):
     def is_folder(self, path):
         """interface"""
 
+    @abstractmethod
+    def fingerprint(self, path):
+        """interface"""
+
     @abstractmethod
     def read_file_contents(self, path):
         """interface"""
@@ -110,6 +119,10 @@ class FileSystem(ABC):
     def hash(self, path):
         """interface"""
 
+    @abstractmethod
+    def compress_file(self, source, target, plain_target=None):
+        """interface"""
+
     @abstractmethod
     def make_dirs(self, path):
         """interface"""
@@ -122,6 +135,10 @@ class FileSystem(ABC):
     def folder_has_items(self, path):
         """interface"""
 
+    @abstractmethod
+    def list_files(self, path):
+        """interface"""
+
     @abstractmethod
     def folders(self):
         """interface"""
@@ -143,7 +160,7 @@ class FileSystem(ABC):
         """interface"""
 
     @abstractmethod
-    def delete_previous(self, file):
+    def delete_previous_many(self, files):
         """interface"""
 
     @abstractmethod
@@ -162,13 +179,17 @@ class FileSystem(ABC):
     def unzip_contents(self, file, path, contained_files):
         """interface"""
 
+    def invalidate_caches(self):
+        """forgets anything cached about the files, to be called after other processes might have modified them"""
+
 
 class _FileSystem(FileSystem):
-    def __init__(self, config, path_dictionary, logger, unique_temp_filenames):
+    def __init__(self, config, path_dictionary, logger, unique_temp_filenames, file_hashes):
         self._config = config
         self._path_dictionary = path_dictionary
         self._logger = logger
         self._unique_temp_filenames = unique_temp_filenames
+        self._file_hashes = file_hashes
         self._temp_files_with_ids = {}
 
     def temp_file(self):
@@ -198,6 +219,13 @@ class _FileSystem(FileSystem):
     def is_file(self, path):
         return os.path.isfile(self._path(path))
 
+    def fingerprint(self, path):
+        try:
+            stat = os.stat(self._path(path))
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        return stat.st_size, stat.st_mtime_ns, stat.st_ino
+
     def is_folder(self, path):
         return os.path.isdir(self._path(path))
 
@@ -233,7 +261,63 @@ class _FileSystem(FileSystem):
                 shutil.copyfileobj(fsource, ftarget, length=1024 * 1024 * 4)
 
     def hash(self, path):
-        return hash_file(self._path(path))
+        absolute_path = self._path(path)
+        with self._file_hashes.lock:
+            self._load_file_hashes()
+            fingerprint = self.fingerprint(absolute_path)
+            md5 = None if fingerprint is None else self._file_hashes.get(absolute_path, fingerprint)
+
+        if md5 is not None:
+            return md5
+
+        md5 = hash_file(absolute_path)
+        if fingerprint is not None:
+            with self._file_hashes.lock:
+                self._file_hashes.put(absolute_path, fingerprint, md5)
+                self._save_file_hashes()
+
+        return md5
+
+    def _load_file_hashes(self):
+        if self._file_hashes.entries is not None:
+            return
+
+        entries = {}
+        try:
+            entries = _load_json(self._path(FILE_update_all_file_hashes))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self._logger.debug(e)
+
+        self._file_hashes.entries = entries if isinstance(entries, dict) else {}
+
+    def _save_file_hashes(self):
+        path = self._path(FILE_update_all_file_hashes)
+        try:
+            self._makedirs(self._parent_folder(path))
+            with open(path + '.part', 'w') as f:
+                json.dump(self._file_hashes.seen_entries(), f)
+            os.replace(path + '.part', path)
+        except Exception as e:
+            self._logger.debug(e)
+
+    def compress_file(self, source, target, plain_target=None):
+        target_path = self._path(target)
+        partial_path = target_path + '.part'
+        with open(self._path(source), 'rb') as fsource:
+            with open(partial_path, 'wb') as ftarget, \
+                    (open(self._path(plain_target), 'wb') if plain_target is not None else contextlib.nullcontext()) as fplain:
+                with gzip.GzipFile(filename=Path(target_path).stem, mode='wb', fileobj=ftarget, compresslevel=6) as gztarget:
+                    # The plain copy is written from the same chunks, so the source is only read once.
+                    for chunk in iter(lambda: fsource.read(1024 * 1024), b''):
+                        gztarget.write(chunk)
+                        if fplain is not None:
+                            fplain.write(chunk)
+                compressed_size = ftarget.tell()
+            original_size = fsource.tell()
+        os.replace(partial_path, target_path)
+        return original_size, compressed_size
 
     def make_dirs(self, path):
         return self._makedirs(self._path(path))
@@ -264,6 +348,13 @@ class _FileSystem(FileSystem):
 
         return False
 
+    def list_files(self, path):
+        try:
+            with os.scandir(self._path(path)) as entries:
+                return [entry.name for entry in entries if entry.is_file()]
+        except (FileNotFoundError, NotADirectoryError):
+            return []
+
     def folders(self):
         raise Exception('folders Not implemented')
 
@@ -306,36 +397,36 @@ class _FileSystem(FileSystem):
 
         return self._unlink(path, verbose)
 
-    def delete_previous(self, file):
-        if self._config.get()[K_ALLOW_DELETE] != AllowDelete.ALL:
-            return True
-
-        path = Path(self._path(file))
-        if not self.is_folder(str(path.parent)):
-            return
-
-        regex = re.compile("^(.+_)[0-9]{8}([.][a-zA-Z0-9]+)$", )
-        m = regex.match(path.name)
-        if m is None:
-            return
-
-        g = m.groups()
-        if g is None:
-            return
-
-        start = g[0].lower()
-        ext = g[1].lower()
-
-        deleted = False
-        for child in path.parent.iterdir():
-            name = child.name.lower()
-            if name.startswith(start) and name.endswith(ext) and regex.match(name):
-                child.unlink()
-                deleted = True
-
-        if deleted:
+    def delete_previous_many(self, files):
+#        if self._config.get()[K_ALLOW_DELETE] != AllowDelete.ALL:
+#            return {}
+
+        deleted = {}
+        deleted_starts = set()
+        for folder, previous_files in previous_files_by_folder({file: self._path(file) for file in files}).items():
+            regex = previous_files_regex(previous_files.values())
+            try:
+                entries = os.scandir(folder)
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+
+            with entries:
+                for entry in entries:
+                    name = entry.name.lower()
+                    if regex.fullmatch(name) is None or not entry.is_file():
+                        continue
+
+                    os.unlink(entry.path)
+                    for file, (start, ext) in previous_files.items():
+                        if name.startswith(start) and name.endswith(ext):
+                            deleted.setdefault(file, []).append(entry.path)
+                            deleted_starts.add(start)
+
+        for start in sorted(deleted_starts):
             self._logger.print('Deleted previous "%s"* files.' % start)
 
+        return deleted
+
     def load_dict_from_file(self, path, suffix=None):
         path = self._path(path)
         if suffix is None:
@@ -386,18 +477,240 @@ class _FileSystem(FileSystem):
         return '%s/%s' % (first_part, path)
 
 
+class CachingFileSystemDecorator(FileSystem):
+    """Remembers resolved paths, and whether paths are files or folders, until this file system modifies them.
+
+    Changes made by other processes go unnoticed until invalidate_caches is called.
+    Hits and misses count the is_file and is_folder lookups.
+    """
+
+    def __init__(self, decorated_file_system: FileSystem):
+        self._decorated = decorated_file_system
+        self._resolved_paths: Dict[str, str] = {}
+        self._is_file: Dict[str, bool] = {}
+        self._is_folder: Dict[str, bool] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate_caches(self):
+        self._is_file.clear()
+        self._is_folder.clear()
+        self._decorated.invalidate_caches()
+
+    def temp_file(self):
+        return self._decorated.temp_file()
+
+    def temp_file_by_id(self, file_id):
+        temp_file = self._decorated.temp_file_by_id(file_id)
+        self._forget_file(temp_file.name)
+        return temp_file
+
+    def clean_temp_files_with_ids(self):
+        self._is_file.clear()
+        self._decorated.clean_temp_files_with_ids()
+
+    def unique_temp_filename(self):
+        return self._decorated.unique_temp_filename()
+
+    def resolve(self, path):
+        return self._decorated.resolve(path)
+
+    def is_file(self, path):
+        return self._cached_lookup(self._is_file, self._decorated.is_file, path)
+
+    def is_folder(self, path):
+        return self._cached_lookup(self._is_folder, self._decorated.is_folder, path)
+
+    def fingerprint(self, path):
+        return self._decorated.fingerprint(self._path(path))
+
+    def read_file_contents(self, path):
+        return self._decorated.read_file_contents(self._path(path))
+
+    def read_file_binary(self, path):
+        return self._decorated.read_file_binary(self._path(path))
+
+    def write_file_contents(self, path, content):
+        self._forget_file(path)
+        return self._decorated.write_file_contents(self._path(path), content)
+
+    def write_file_bytes(self, path, content_bytes):
+        self._forget_file(path)
+        return self._decorated.write_file_bytes(self._path(path), content_bytes)
+
+    def touch(self, path):
+        self._forget_file(path)
+        return self._decorated.touch(self._path(path))
+
+    def move(self, source, target):
+        self._forget_file(source)
+        self._forget_file(target)
+        self._is_folder.clear()
+        return self._decorated.move(self._path(source), self._path(target))
+
+    def copy(self, source, target):
+        self._forget_file(target)
+        return self._decorated.copy(self._path(source), self._path(target))
+
+    def copy_fast(self, source, target):
+        self._forget_file(target)
+        return self._decorated.copy_fast(self._path(source), self._path(target))
+
+    def hash(self, path):
+        return self._decorated.hash(self._path(path))
+
+    def compress_file(self, source, target, plain_target=None):
+        self._forget_file(target)
+        if plain_target is not None:
+            self._forget_file(plain_target)
+            plain_target = self._path(plain_target)
+        return self._decorated.compress_file(self._path(source), self._path(target), plain_target)
+
+    def make_dirs(self, path):
+        self._is_folder.clear()
+        return self._decorated.make_dirs(self._path(path))
+
+    def make_dirs_parent(self, path):
+        self._is_folder.clear()
+        return self._decorated.make_dirs_parent(self._path(path))
+
+    def folder_has_items(self, path):
+        return self._decorated.folder_has_items(self._path(path))
+
+    def list_files(self, path):
+        return self._decorated.list_files(self._path(path))
+
+    def folders(self):
+        return self._decorated.folders()
+
+    def remove_folder(self, path):
+        self._is_folder.clear()
+        return self._decorated.remove_folder(self._path(path))
+
+    def remove_non_empty_folder(self, path):
+        self.invalidate_caches()
+        return self._decorated.remove_non_empty_folder(self._path(path))
+
+    def download_target_path(self, path):
+        return self._path(path)
+
+    def unlink(self, path, verbose=True):
+        self._forget_file(path)
+        return self._decorated.unlink(self._path(path), verbose)
+
+    def delete_previous_many(self, files):
+        self._is_file.clear()
+        deleted = self._decorated.delete_previous_many([self._path(file) for file in files])
+        return {file: deleted[self._path(file)] for file in files if self._path(file) in deleted}
+
+    def load_dict_from_file(self, path, suffix=None):
+        return self._decorated.load_dict_from_file(self._path(path), suffix)
+
+    def save_json_on_zip(self, db, path):
+        self._forget_file(path)
+        return self._decorated.save_json_on_zip(db, self._path(path))
+
+    def save_json(self, db, path):
+        self._forget_file(path)
+        return self._decorated.save_json(db, self._path(path))
+
+    def unzip_contents(self, file, path, contained_files):
+        self.invalidate_caches()
+        return self._decorated.unzip_contents(self._path(file), self._path(path), contained_files)
+
+    def _cached_lookup(self, cache, lookup, path):
+        path = self._path(path)
+        if path in cache:
+            self.hits += 1
+            return cache[path]
+
+        self.misses += 1
+        result = lookup(path)
+        cache[path] = result
+        return result
+
+    def _forget_file(self, path):
+        path = self._path(path)
+        self._is_file.pop(path, None)
+        self._is_folder.pop(path, None)
+
+    def _path(self, path):
+        if path not in self._resolved_paths:
+            self._resolved_paths[path] = self._decorated.download_target_path(path)
+        return self._resolved_paths[path]
+
+
+class _FileHashes:
+    """MD5 of files by absolute path, valid while the file keeps the size and mtime it was hashed with.
+
+    Inodes aren't part of the key because they aren't stable on exFAT or FUSE mounts. Only the entries of files
+    looked up during this run are saved, so files that are gone don't linger in the cache.
+    """
+
+    def __init__(self):
+        self.entries = None
+        self.seen = set()
+        self.lock = threading.Lock()
+
+    def get(self, path, fingerprint):
+        self.seen.add(path)
+        entry = self.entries.get(path)
+        if entry is None or entry['fingerprint'] != _hash_key(fingerprint):
+            return None
+        return entry['md5']
+
+    def put(self, path, fingerprint, md5):
+        self.seen.add(path)
+        self.entries[path] = {'fingerprint': _hash_key(fingerprint), 'md5': md5}
+
+    def seen_entries(self):
+        return {path: entry for path, entry in self.entries.items() if path in self.seen}
+
+
+def _hash_key(fingerprint):
+    size, mtime_ns, _ = fingerprint
+    return [size, mtime_ns]
+
+
 class InvalidFileResolution(Exception):
     pass
 
 
+_HASH_BUFFER_SIZE = 1024 * 1024
+
+
 def hash_file(path):
-    with open(path, "rb") as f:
-        file_hash = hashlib.md5()
-        chunk = f.read(8192)
-        while chunk:
-            file_hash.update(chunk)
-            chunk = f.read(8192)
-        return file_hash.hexdigest()
+    file_hash = hashlib.md5()
+    buffer = bytearray(_HASH_BUFFER_SIZE)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        size = f.readinto(buffer)
+        while size:
+            file_hash.update(view[:size])
+            size = f.readinto(buffer)
+    return file_hash.hexdigest()
+
+
+_DATED_FILE_REGEX = re.compile('^(.+_)[0-9]{8}([.][a-zA-Z0-9]+)$')
+
+
+def previous_files_by_folder(absolute_paths):
+    """Groups dated files like "name_20230101.ext" by folder, as {folder: {file: ("name_", ".ext")}} in lowercase"""
+    result = {}
+    for file, absolute_path in absolute_paths.items():
+        folder, name = os.path.split(absolute_path)
+        match = _DATED_FILE_REGEX.match(name)
+        if match is None:
+            continue
+
+        result.setdefault(folder, {})[file] = (match.group(1).lower(), match.group(2).lower())
+    return result
+
+
+def previous_files_regex(starts_and_exts):
+    """Regex that fully matches the lowercase names of any version of the given dated files"""
+    alternatives = sorted({f'{re.escape(start)}(?:.*_)?[0-9]{{8}}{re.escape(ext)}' for start, ext in starts_and_exts})
+    return re.compile('|'.join(alternatives))
 
 
 def absolute_parent_folder(absolute_path):
@@ -0,0 +1,163 @@
+# Copyright (c) 2022 José Manuel Barroso Galindo <theypsilon@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# You can download the latest version of this tool from:
+# https://github.com/theypsilon-test/ua2
+
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional, Any, Tuple, Protocol
+
+from update_all.logger import Logger
+
+
+class HttpCache:
+    """On-disk cache of downloaded bodies, validated with ETag / Last-Modified conditional requests."""
+
+    def __init__(self, cache_folder: str, logger: Logger):
+        self._cache_folder = cache_folder
+        self._logger = logger
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        entry = self._read_entry(url)
+        if entry is None or not os.path.isfile(self._body_path(url)):
+            return {}
+
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def copy_cached_body(self, url: str, target_path: str) -> Optional[Tuple[str, int]]:
+        entry = self._read_entry(url)
+        if entry is None:
+            return None
+
+        try:
+            with open(self._body_path(url), 'rb') as f:
+                md5, size = write_stream_to_file(f, target_path)
+        except OSError as e:
+            self._logger.debug(e)
+            return None
+
+        if md5 != entry.get('md5'):
+            self._logger.debug(f'Cached body for {url} does not match its hash, discarding it.')
+            self.invalidate(url)
+            os.unlink(target_path)
+            return None
+
+        return md5, size
+
+    def store_file(self, url: str, source_path: str, md5: str, size: int, headers: Any) -> None:
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if etag is None and last_modified is None:
+            return
+
+        entry = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'md5': md5,
+            'size': size
+        }
+
+        try:
+            os.makedirs(self._cache_folder, exist_ok=True)
+            with open(source_path, 'rb') as f:
+                _write_atomically(self._body_path(url), f)
+            _write_atomically(self._entry_path(url), json.dumps(entry).encode())
+        except OSError as e:
+            self._logger.debug(e)
+            self._logger.debug(f'Could not store {url} in the HTTP cache.')
+
+    def invalidate(self, url: str) -> None:
+        for path in [self._entry_path(url), self._body_path(url)]:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                self._logger.debug(e)
+
+    def _read_entry(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._entry_path(url), 'r') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self._logger.debug(e)
+            return None
+
+        if entry.get('url') != url:
+            return None
+
+        return entry
+
+    def _entry_path(self, url: str) -> str:
+        return os.path.join(self._cache_folder, f'{_url_key(url)}.json')
+
+    def _body_path(self, url: str) -> str:
+        return os.path.join(self._cache_folder, f'{_url_key(url)}.body')
+
+
+def _url_key(url: str) -> str:
+    return hashlib.sha1(url.encode()).hexdigest()
+
+
+_CHUNK_SIZE = 64 * 1024
+
+
+class ReadableStream(Protocol):
+    """Binary files and HttpResponse bodies, which is all write_stream_to_file needs from them."""
+
+    def read(self, size: int = -1) -> bytes: ...
+
+
+def write_stream_to_file(stream: ReadableStream, path: str, append: bool = False) -> Tuple[str, int]:
+    """Writes the stream into path in chunks, returning the md5 and size of the resulting file."""
+    file_hash = hashlib.md5()
+    size = 0
+    if append:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+                file_hash.update(chunk)
+                size += len(chunk)
+
+    with open(path, 'ab' if append else 'wb') as f:
+        while True:
+            chunk = stream.read(_CHUNK_SIZE)
+            if not chunk:
+                break
+            file_hash.update(chunk)
+            f.write(chunk)
+            size += len(chunk)
+    return file_hash.hexdigest(), size
+
+
+def _write_atomically(path: str, content: Any) -> None:
+    # Per thread, so the launcher prefetch and the settings screen can store the same URL at the same time.
+    temp_path = f'{path}.{threading.get_ident()}.tmp'
+    if isinstance(content, bytes):
+        with open(temp_path, 'wb') as f:
+            f.write(content)
+    else:
+        write_stream_to_file(content, temp_path)
+    os.replace(temp_path, path)
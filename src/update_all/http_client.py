@@ -0,0 +1,315 @@
+# Copyright (c) 2022 José Manuel Barroso Galindo <theypsilon@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# You can download the latest version of this tool from:
+# https://github.com/theypsilon-test/ua2
+
+import base64
+import http.client
+import socket
+import ssl
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import Dict, List, Tuple, Optional, Iterator
+from urllib.error import HTTPError
+from urllib.parse import urlsplit, urljoin, unquote
+from urllib.request import getproxies, proxy_bypass_environment  # type: ignore[attr-defined]
+
+from update_all.logger import Logger
+
+
+_REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+_MAX_REDIRECTS = 10
+_MAX_IDLE_CONNECTIONS_PER_HOST = 4
+_CONNECTION_RESET_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class HttpClient:
+    """Keep-alive HTTP client that pools connections per host and caches DNS resolutions for the whole run.
+
+    Like urlopen, it goes through the proxies of the http_proxy, https_proxy and no_proxy environment variables.
+    """
+
+    def __init__(self, logger: Logger, proxies: Optional[Dict[str, str]] = None):
+        self._logger = logger
+        self._proxies = getproxies() if proxies is None else proxies
+        self._lock = threading.Lock()
+        self._idle_connections: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._addresses: Dict[Tuple[str, int], List[str]] = {}
+        self._ssl_context: Optional[ssl.SSLContext] = None
+        self.connections_opened = 0
+        self.requests_sent = 0
+
+    @contextmanager
+    def open(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None) -> Iterator['HttpResponse']:
+        """GETs an http or https url following redirects. Unlike urlopen, other schemes like file:// raise ValueError."""
+        headers = dict(headers or {})
+        if 'Range' not in headers:
+            headers['Accept-Encoding'] = 'gzip'
+
+        for _ in range(_MAX_REDIRECTS + 1):
+            key, target = _connection_key(url)
+            request_headers = headers
+            proxy = self._proxy(key)
+            if proxy is not None and key[0] == 'http':
+                # Plain http goes straight to the proxy with the full url, https is tunneled by the connection.
+                target = url.split('#')[0]
+                request_headers = {**headers, **proxy.headers}
+
+            connection, response = self._send(key, target, request_headers, timeout)
+            if response.status in _REDIRECT_STATUSES and response.getheader('Location') is not None:
+                response.read()
+                self._release(key, connection, response)
+                url = urljoin(url, response.getheader('Location'))
+                continue
+
+            if response.status >= 300:
+                response.read()
+                self._release(key, connection, response)
+                raise HTTPError(url, response.status, response.reason, response.headers, None)
+
+            wrapped = HttpResponse(response)
+            try:
+                yield wrapped
+            except BaseException:
+                connection.close()
+                raise
+
+            if wrapped.fully_read:
+                self._release(key, connection, response)
+            else:
+                connection.close()
+            return
+
+        raise HTTPError(url, 310, 'Too many redirects', http.client.HTTPMessage(), None)
+
+    def close(self) -> None:
+        with self._lock:
+            for connections in self._idle_connections.values():
+                for connection in connections:
+                    connection.close()
+            self._idle_connections.clear()
+
+    def _send(self, key: Tuple[str, str, int], target: str, headers: Dict[str, str], timeout: Optional[float]) -> Tuple[http.client.HTTPConnection, http.client.HTTPResponse]:
+        connection = self._acquire(key)
+        if connection is not None:
+            try:
+                return connection, self._request(connection, target, headers, timeout)
+            except _CONNECTION_RESET_ERRORS as e:
+                self._logger.debug(f'Pooled connection to {key[1]} was closed by the server, reconnecting. ({e})')
+                connection.close()
+            except BaseException:
+                connection.close()
+                raise
+
+        connection = self._connect(key, timeout)
+        try:
+            return connection, self._request(connection, target, headers, timeout)
+        except BaseException:
+            connection.close()
+            raise
+
+    def _request(self, connection: http.client.HTTPConnection, target: str, headers: Dict[str, str], timeout: Optional[float]) -> http.client.HTTPResponse:
+        if connection.sock is not None:
+            connection.sock.settimeout(timeout)
+        connection.timeout = timeout
+        connection.request('GET', target, headers=headers)
+        with self._lock:
+            self.requests_sent += 1
+        return connection.getresponse()
+
+    def _acquire(self, key: Tuple[str, str, int]) -> Optional[http.client.HTTPConnection]:
+        with self._lock:
+            connections = self._idle_connections.get(key)
+            if connections:
+                return connections.pop()
+        return None
+
+    def _release(self, key: Tuple[str, str, int], connection: http.client.HTTPConnection, response: http.client.HTTPResponse) -> None:
+        if response.will_close:
+            connection.close()
+            return
+
+        with self._lock:
+            connections = self._idle_connections.setdefault(key, [])
+            if len(connections) < _MAX_IDLE_CONNECTIONS_PER_HOST:
+                connections.append(connection)
+                return
+
+        connection.close()
+
+    def _connect(self, key: Tuple[str, str, int], timeout: Optional[float]) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        proxy = self._proxy(key)
+        connect_host, connect_port = (host, port) if proxy is None else (proxy.host, proxy.port)
+        addresses = self._resolve(connect_host, connect_port)
+        with self._lock:
+            self.connections_opened += 1
+        if scheme == 'https':
+            connection = _ResolvedHTTPSConnection(addresses, connect_host, connect_port, timeout=timeout, context=self._context())
+            if proxy is not None:
+                connection.set_tunnel(host, port, proxy.headers)
+            return connection
+        return _ResolvedHTTPConnection(addresses, connect_host, connect_port, timeout=timeout)
+
+    def _proxy(self, key: Tuple[str, str, int]) -> Optional['_Proxy']:
+        scheme, host, _port = key
+        if scheme not in self._proxies or proxy_bypass_environment(host, self._proxies):
+            return None
+        return _Proxy(self._proxies[scheme])
+
+    def _resolve(self, host: str, port: int) -> List[str]:
+        with self._lock:
+            if (host, port) in self._addresses:
+                return self._addresses[(host, port)]
+
+        addresses = list(dict.fromkeys(str(info[4][0]) for info in socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)))
+        with self._lock:
+            self._addresses[(host, port)] = addresses
+        return addresses
+
+    def _context(self) -> ssl.SSLContext:
+        with self._lock:
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            return self._ssl_context
+
+
+class HttpResponse:
+    """Response body stream that transparently decodes gzip and detects truncated bodies."""
+
+    def __init__(self, response: http.client.HTTPResponse):
+        self._response = response
+        self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if response.getheader('Content-Encoding', '').lower() == 'gzip' else None
+        self._expected_length = _int_or_none(response.getheader('Content-Length'))
+        self._received = 0
+        self.fully_read = False
+
+    @property
+    def status(self) -> int:
+        return self._response.status
+
+    @property
+    def headers(self) -> http.client.HTTPMessage:
+        return self._response.headers
+
+    @property
+    def is_encoded(self) -> bool:
+        return self._decompressor is not None
+
+    def read(self, size: int = -1) -> bytes:
+        if size < 0:
+            raw = self._response.read()
+            self._received += len(raw)
+            decoded = raw if self._decompressor is None else self._decompressor.decompress(raw)
+            return decoded + self._finish()
+
+        while True:
+            raw = self._response.read(size)
+            self._received += len(raw)
+            if not raw:
+                return self._finish()
+
+            if self._decompressor is None:
+                return raw
+
+            decoded = self._decompressor.decompress(raw)
+            if decoded:
+                return decoded
+
+    def _finish(self) -> bytes:
+        if self._expected_length is not None and self._received < self._expected_length:
+            raise http.client.IncompleteRead(b'', self._expected_length - self._received)
+
+        self.fully_read = True
+        if self._decompressor is not None:
+            return self._decompressor.flush()
+        return b''
+
+
+class _Proxy:
+    def __init__(self, url: str):
+        parts = urlsplit(url if '://' in url else f'http://{url}')
+        if parts.hostname is None:
+            raise ValueError(f'Missing host in proxy URL: {url}')
+
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.headers: Dict[str, str] = {}
+        if parts.username is not None:
+            credentials = f'{unquote(parts.username)}:{unquote(parts.password or "")}'
+            self.headers['Proxy-Authorization'] = 'Basic ' + base64.b64encode(credentials.encode()).decode()
+
+
+class _ResolvedHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, addresses: List[str], host: str, port: int, timeout: Optional[float]):
+        super().__init__(host, port, timeout=timeout)
+        self._addresses = addresses
+
+    def connect(self):
+        self.sock = _create_connection(self._addresses, self.port, self.timeout)
+
+
+class _ResolvedHTTPSConnection(http.client.HTTPSConnection):
+    def __init__(self, addresses: List[str], host: str, port: int, timeout: Optional[float], context: ssl.SSLContext):
+        super().__init__(host, port, timeout=timeout, context=context)
+        self._addresses = addresses
+
+    def connect(self):
+        self.sock = _create_connection(self._addresses, self.port, self.timeout)
+        if self._tunnel_host:
+            self._tunnel()
+        self.sock = self._context.wrap_socket(self.sock, server_hostname=self._tunnel_host or self.host)
+
+
+def _create_connection(addresses: List[str], port: int, timeout: Optional[float]) -> socket.socket:
+    for index, address in enumerate(addresses):
+        try:
+            sock = socket.create_connection((address, port), timeout)
+        except OSError:
+            if index == len(addresses) - 1:
+                raise
+            continue
+
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        return sock
+
+    raise OSError(f'No addresses to connect to on port {port}.')
+
+
+def _connection_key(url: str) -> Tuple[Tuple[str, str, int], str]:
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in ('http', 'https'):
+        raise ValueError(f'Unsupported URL scheme: {url}')
+    if parts.hostname is None:
+        raise ValueError(f'Missing host in URL: {url}')
+
+    port = parts.port or (443 if scheme == 'https' else 80)
+    target = parts.path or '/'
+    if parts.query:
+        target += '?' + parts.query
+    return (scheme, parts.hostname, port), target
+
+
+def _int_or_none(value: Optional[str]) -> Optional[int]:
+    if value is None:
+        return None
+
+    try:
+        return int(value)
+    except ValueError:
+        return None
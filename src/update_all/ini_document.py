@@ -0,0 +1,145 @@
+# Copyright (c) 2022 José Manuel Barroso Galindo <theypsilon@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# You can download the latest version of this tool from:
+# https://github.com/theypsilon-test/ua2
+import io
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Tuple, Union
+
+_DEFAULT_SECTION = 'DEFAULT'
+_HEADER_REGEX = re.compile(r'\[(?P<header>.+)\]')
+_OPTION_REGEX = re.compile(r'(?P<option>.*?)\s*[=:]\s*(?P<value>.*)$')
+_INLINE_COMMENT_REGEX = re.compile(r'(?:^|(?<=\s))[;#]')
+
+
+@dataclass
+class IniSection:
+    header: str
+    text: str = ''
+    values: Dict[str, str] = field(default_factory=dict)
+    name: str = field(init=False)
+
+    def __post_init__(self):
+        self.name = self.header.lower()
+
+
+@dataclass
+class IniDocument:
+    """INI file read in a single pass, keeping the raw text of every section next to its values.
+
+    Values are read with the same rules as configparser.ConfigParser(inline_comment_prefixes=(";", "#")) without interpolation,
+    so that a document that configparser would reject carries errors instead of values.
+    """
+
+    preamble: str = ''
+    sections: List[IniSection] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def valid(self) -> bool:
+        return len(self.errors) == 0
+
+    def values(self) -> Dict[str, Dict[str, str]]:
+        """New dictionary of lowercase section names to their values, excluding the default section. Empty if not valid."""
+        if not self.valid:
+            return {}
+
+        defaults = {}
+        for section in self.sections:
+            if section.header == _DEFAULT_SECTION:
+                defaults.update(section.values)
+
+        result = {}
+        for section in self.sections:
+            if section.name == 'default':
+                continue
+
+            values = dict(section.values)
+            for key, value in defaults.items():
+                values.setdefault(key, value)
+            result[section.name] = values
+
+        return result
+
+    def text(self) -> str:
+        return self.preamble + ''.join(section.text for section in self.sections)
+
+
+def read_ini_document(contents: str) -> IniDocument:
+    document = IniDocument()
+    lines: List[List[str]] = [[]]
+    multiline_values: List[Dict[str, List[str]]] = []
+    seen: Set[Union[str, Tuple[str, str]]] = set()
+    section = None
+    option = None
+    indent_level = 0
+
+    for number, line in enumerate(io.StringIO(contents), start=1):
+        is_comment = line.strip().startswith(('#', ';'))
+        if is_comment:
+            value = ''
+        else:
+            comment = _INLINE_COMMENT_REGEX.search(line)
+            value = (line if comment is None else line[:comment.start()]).strip()
+
+        if value == '':
+            lines[-1].append(line)
+            if not is_comment and option is not None:
+                multiline_values[-1][option].append('')
+            continue
+
+        indent = len(line) - len(line.lstrip())
+        if option is not None and indent > indent_level:
+            lines[-1].append(line)
+            multiline_values[-1][option].append(value)
+            continue
+
+        header_match = _HEADER_REGEX.match(value)
+        if header_match is not None:
+            section = IniSection(header_match.group('header'))
+            if section.header in seen and section.header != _DEFAULT_SECTION:
+                document.errors.append(f'line {number}: section "{section.header}" already exists')
+            seen.add(section.header)
+            document.sections.append(section)
+            lines.append([line])
+            multiline_values.append({})
+            option = None
+            continue
+
+        lines[-1].append(line)
+        if section is None:
+            document.errors.append(f'line {number}: missing section header')
+            continue
+
+        option_match = _OPTION_REGEX.match(value)
+        if option_match is None or option_match.group('option').rstrip() == '':
+            document.errors.append(f'line {number}: could not parse "{value}"')
+            continue
+
+        option = option_match.group('option').rstrip().lower()
+        if (section.header, option) in seen:
+            document.errors.append(f'line {number}: option "{option}" already exists in section "{section.header}"')
+        seen.add((section.header, option))
+        multiline_values[-1][option] = [option_match.group('value').strip()]
+        indent_level = indent
+
+    document.preamble = ''.join(lines[0])
+    for section, section_lines, section_values in zip(document.sections, lines[1:], multiline_values):
+        section.text = ''.join(section_lines)
+        section.values = {key: '\n'.join(value_lines).rstrip() for key, value_lines in section_values.items()}
+
+    return document
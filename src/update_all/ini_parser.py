@@ -16,9 +16,6 @@
 # You can download the latest version of this tool from:
 # https://github.com/theypsilon-test/ua2
 
-import distutils
-import distutils.util
-
 
 class IniParser:
     def __init__(self, ini_args):
@@ -31,7 +28,7 @@ class IniParser:
         return self._ini_args.get(key, default).strip('"\' ')
 
     def get_bool(self, key, default):
-        return bool(distutils.util.strtobool(self.get_string(key, 'true' if default else 'false')))
+        return bool(strtobool(self.get_string(key, 'true' if default else 'false')))
 
     def get_int(self, key, default):
         result = self.get_string(key, None)
@@ -44,6 +41,17 @@ class IniParser:
         return self._ini_args.get(key) is not None
 
 
+def strtobool(value):
+    """Same as the deprecated distutils.util.strtobool, without the slow import of distutils."""
+    value = value.lower()
+    if value in ('y', 'yes', 't', 'true', 'on', '1'):
+        return 1
+    elif value in ('n', 'no', 'f', 'false', 'off', '0'):
+        return 0
+    else:
+        raise ValueError(f'invalid truth value {value!r}')
+
+
 def to_int(n, default):
     try:
         return int(n)
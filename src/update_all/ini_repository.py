@@ -16,16 +16,14 @@
 # You can download the latest version of this tool from:
 # https://github.com/theypsilon-test/ua2
 import configparser
-import io
-import json
-import re
-from typing import Optional, Dict, List, Tuple
+from typing import Optional, Dict, List, Tuple, Any, Callable
 
 from update_all.config import Config
 from update_all.constants import DOWNLOADER_INI_STANDARD_PATH, ARCADE_ORGANIZER_INI, FILE_downloader_temp_ini
 from update_all.databases import AllDBs, Database, db_distribution_mister_by_encc_forks, \
     db_jtcores_by_download_beta_cores, db_names_txt_by_locale, dbs_to_model_variables_pairs
 from update_all.file_system import FileSystem
+from update_all.ini_document import IniDocument, read_ini_document
 from update_all.ini_parser import IniParser
 from update_all.logger import Logger
 from update_all.os_utils import OsUtils
@@ -38,43 +36,56 @@ class IniRepository:
         self._file_system = file_system
         self._os_utils = os_utils
         self._base_path = None
-        self._downloader_ini = None
-        self._arcade_organizer_ini = None
+        self._parsed_files: Dict[str, Tuple[Any, Any]] = {}
+        self._new_downloader_ini_contents: Optional[Tuple[IniDocument, Tuple, Optional[str]]] = None
 
     def initialize_downloader_ini_base_path(self, base_path: str) -> None:
         self._base_path = base_path
 
     def get_downloader_ini(self, cached: bool = True) -> Dict[str, Dict[str, str]]:
-        if cached and self._downloader_ini is not None:
-            return self._downloader_ini
-
-        result = self._read_downloader_ini()
-        if cached:
-            self._downloader_ini = result
-        return result
+        return self._read_downloader_ini_document(cached).values()
 
     def get_arcade_organizer_ini(self, cached: bool = True) -> IniParser:
-        if cached and self._arcade_organizer_ini is not None:
-            return self._arcade_organizer_ini
+        if not cached:
+            return self.read_old_ini_file(ARCADE_ORGANIZER_INI)
 
-        result = self.read_old_ini_file(ARCADE_ORGANIZER_INI)
-        if cached:
-            self._arcade_organizer_ini = result
-        return result
+        return self._read_unless_unchanged(ARCADE_ORGANIZER_INI, self.read_old_ini_file)
 
-    def _read_downloader_ini(self) -> Dict[str, Dict[str, str]]:
+    def _read_downloader_ini_document(self, cached: bool = True) -> IniDocument:
         path = self.downloader_ini_standard_path()
-        contents = ''
-        try:
-            contents = self._file_system.read_file_contents(path)
-            parser = read_ini_contents(contents)
-        except Exception as e:
+        if not cached:
+            return self._parse_downloader_ini(path)
+
+        return self._read_unless_unchanged(path, self._parse_downloader_ini)
+
+    def _read_unless_unchanged(self, path: str, read: Callable[[str], Any]) -> Any:
+        fingerprint = self._file_system.fingerprint(path)
+        if path in self._parsed_files:
+            previous_fingerprint, result = self._parsed_files[path]
+            if previous_fingerprint == fingerprint:
+                return result
+
+        result = read(path)
+        self._parsed_files[path] = (fingerprint, result)
+        return result
+
+    def _parse_downloader_ini(self, path: str) -> IniDocument:
+        with self._logger.span('IniRepository.read_downloader_ini'):
+            try:
+                contents = self._file_system.read_file_contents(path)
+            except Exception as e:
+                self._logger.debug(f'Could not read Downloader INI file at: {path}')
+                self._logger.debug(e)
+                return IniDocument()
+
+            document = read_ini_document(contents)
+
+        if not document.valid:
             self._logger.debug(f'Could not read Downloader INI file at: {path}')
             self._logger.debug(f'contents: {contents}')
-            self._logger.debug(e)
-            return {}
+            self._logger.debug('\n'.join(document.errors))
 
-        return {header.lower(): {k.lower(): v for k, v in section.items()} for header, section in parser.items() if header.lower() != 'default'}
+        return document
 
     def read_old_ini_file(self, path: str) -> IniParser:
         if not self._file_system.is_file(path):
@@ -98,23 +109,24 @@ class IniRepository:
 
         return f'{self._base_path}/{DOWNLOADER_INI_STANDARD_PATH}'
 
+    def ini_files_fingerprint(self) -> Tuple:
+        return self._file_system.fingerprint(self.downloader_ini_standard_path()), self._file_system.fingerprint(ARCADE_ORGANIZER_INI)
+
     def downloader_ini_path_tweaked_by_config(self, config: Config) -> str:
         return FILE_downloader_temp_ini if config.temporary_downloader_ini else self.downloader_ini_standard_path()
 
     def write_downloader_ini(self, config: Config, target_path: str = None) -> None:
-        new_ini_contents = self._build_new_downloader_ini_contents(config)
+        with self._logger.span('IniRepository.build_new_downloader_ini_contents'):
+            new_ini_contents = self._build_new_downloader_ini_contents(config)
         if new_ini_contents is None:
             return
 
-        downloader_ini_path = self.downloader_ini_standard_path()
         if target_path is None:
-            target_path = downloader_ini_path
+            target_path = self.downloader_ini_standard_path()
 
         self._file_system.make_dirs_parent(target_path)
         self._file_system.write_file_contents(target_path, new_ini_contents)
-
-        if target_path == downloader_ini_path:
-            self._downloader_ini = None
+        self._parsed_files.pop(target_path, None)
 
     def write_arcade_organizer_active_at_arcade_organizer_ini(self, config: Config) -> None:
         contents = ''
@@ -136,7 +148,7 @@ class IniRepository:
     def _save_arcade_organizer_contents(self, contents):
         self._file_system.make_dirs_parent(ARCADE_ORGANIZER_INI)
         self._file_system.write_file_contents(ARCADE_ORGANIZER_INI, contents)
-        self._arcade_organizer_ini = None
+        self._parsed_files.pop(ARCADE_ORGANIZER_INI, None)
 
     def does_downloader_ini_need_save(self, config: Config) -> bool:
         if not self._file_system.is_file(self.downloader_ini_standard_path()):
@@ -144,13 +156,13 @@ class IniRepository:
             self._add_new_downloader_ini_changes(ini, config)
             return len(ini) > 0
 
-        new_ini_contents = self._build_new_downloader_ini_contents(config)
+        document = self._read_downloader_ini_document()
+        with self._logger.span('IniRepository.build_new_downloader_ini_contents'):
+            new_ini_contents = self._build_new_downloader_ini_contents(config, document)
         if new_ini_contents is None:
             return False
-        new_ini_contents = new_ini_contents.strip().lower()
 
-        current_ini_contents = self._file_system.read_file_contents(self.downloader_ini_standard_path()).strip().lower()
-        return new_ini_contents != current_ini_contents
+        return new_ini_contents.strip().lower() != document.text().strip().lower()
 
     def _add_new_downloader_ini_changes(self, ini, config: Config) -> None:
         for _, db in candidate_databases(config):
@@ -186,73 +198,61 @@ class IniRepository:
                 if len(ini[db_id]['filter']) == 0:
                     del ini[db_id]['filter']
 
-    def _build_new_downloader_ini_contents(self, config: Config) -> Optional[str]:
-        ini: dict[str, Dict[str, str]] = self.get_downloader_ini(cached=False)
-        before = json.dumps(ini)
-        self._add_new_downloader_ini_changes(ini, config)
-        after = json.dumps(ini)
+    def _build_new_downloader_ini_contents(self, config: Config, document: Optional[IniDocument] = None) -> Optional[str]:
+        if document is None:
+            document = self._read_downloader_ini_document()
 
-        if before == after:
+        config_key = _downloader_ini_config_key(config)
+        if self._new_downloader_ini_contents is not None:
+            previous_document, previous_config_key, contents = self._new_downloader_ini_contents
+            if previous_document is document and previous_config_key == config_key:
+                return contents
+
+        contents = self._render_new_downloader_ini_contents(document, config)
+        self._new_downloader_ini_contents = (document, config_key, contents)
+        return contents
+
+    def _render_new_downloader_ini_contents(self, document: IniDocument, config: Config) -> Optional[str]:
+        ini = document.values()
+        self._add_new_downloader_ini_changes(ini, config)
+        if ini == document.values():
             return None
 
         db_ids = {db.db_id.lower(): db.db_id for _, db in candidate_databases(config)}
 
         mister_section = ''
         nomister_section = ''
-        pre_section = ''
-
-        if self._file_system.is_file(self.downloader_ini_standard_path()):
-            header_regex = re.compile('\s*\[([-_/a-zA-Z0-9]+)\].*', re.I)
-            ini_contents = io.StringIO(self._file_system.read_file_contents(self.downloader_ini_standard_path()))
-
-            no_section = 0
-            other_section = 1
-            common_section = 2
-
-            state = no_section
-
-            for line in ini_contents.readlines():
-                match = header_regex.match(line)
-
-                section: str
-                if match is not None:
-                    section = match.group(1).lower()
-                    if section in db_ids:
-                        state = common_section
-                    else:
-                        state = other_section
-
-                if state == no_section:
-                    pre_section += line
-                elif state == common_section:
-                    pass
-                elif state == other_section:
-                    if section in ini:
-                        ini.pop(section)
-
-                    if section.lower() == 'mister':
-                        mister_section += line
-                    else:
-                        nomister_section += line
-                else:
-                    raise Exception("Wrong state: " + str(state))
-
-        parser = configparser.ConfigParser(inline_comment_prefixes=(';', '#'))
-        for header, section_id in ini.items():
-            if header in db_ids:
-                header = db_ids[header]
-            parser[header] = section_id
-
-        with io.StringIO() as ss:
-            if pre_section != '':
-                ss.write(pre_section.strip() + '\n\n')
-            if mister_section != '':
-                ss.write(mister_section.strip() + '\n\n')
-            parser.write(ss)
-            if nomister_section != '':
-                ss.write(nomister_section.strip() + '\n\n')
-            ss.seek(0)
-            return ss.read()
+        for section in document.sections:
+            if section.name in db_ids:
+                continue
+
+            ini.pop(section.name, None)
+            if section.name == 'mister':
+                mister_section += section.text
+            else:
+                nomister_section += section.text
+
+        contents = []
+        if document.preamble != '':
+            contents.append(document.preamble.strip() + '\n\n')
+        if mister_section != '':
+            contents.append(mister_section.strip() + '\n\n')
+        for header, values in ini.items():
+            contents.append(f'[{db_ids.get(header, header)}]\n')
+            for key, value in values.items():
+                value = value.replace('\n', '\n\t')
+                contents.append(f'{key} = {value}\n')
+            contents.append('\n')
+        if nomister_section != '':
+            contents.append(nomister_section.strip() + '\n\n')
+
+        return ''.join(contents)
+
+
+def _downloader_ini_config_key(config: Config) -> Tuple:
+    """Every Config field that _build_new_downloader_ini_contents depends on"""
+    return frozenset(config.databases), config.encc_forks, config.download_beta_cores, config.names_region, \
+        config.names_char_code, config.names_sort_code, config.hbmame_filter
 
 
 def candidate_databases(config: Config) -> List[Tuple[str, Database]]:
@@ -16,9 +16,13 @@
 
 # You can download the latest version of this tool from:
 # https://github.com/theypsilon-test/ua2
+import time
+from typing import Optional, Dict, Any
+
 from update_all.config import Config
 from update_all.other import GenericProvider
-from update_all.constants import FILE_update_all_storage, FILE_update_all_log
+from update_all.constants import FILE_update_all_storage, FILE_update_all_log, FILE_update_all_trace, \
+    FOLDER_update_all_logs, FILE_update_all_logs_index, DEFAULT_LOG_HISTORY_SIZE
 from update_all.local_store import LocalStore
 from update_all.store_migrator import make_new_local_store
 
@@ -30,8 +34,15 @@ class LocalRepository:
         self._logger = logger
         self._file_system = file_system
         self._store_migrator = store_migrator
+        self._log_history_size = DEFAULT_LOG_HISTORY_SIZE
+        self._log_path: Optional[str] = None
+        self._exit_code: Optional[int] = None
 
     def load_store(self) -> LocalStore:
+        with self._logger.span('LocalRepository.load_store'):
+            return self._load_store()
+
+    def _load_store(self) -> LocalStore:
         self._logger.bench('Loading store...')
 
         if self._file_system.is_file(FILE_update_all_storage):
@@ -60,7 +71,59 @@ class LocalRepository:
 
         local_store_wrapper.mark_as_cleaned()
 
+    def log_path(self) -> str:
+        if self._log_path is None:
+            name = time.strftime('update_all_%Y%m%d_%H%M%S', time.localtime())
+            log_path = f'{FOLDER_update_all_logs}/{name}.log.gz'
+            collisions = 0
+            while self._file_system.is_file(log_path):
+                collisions += 1
+                log_path = f'{FOLDER_update_all_logs}/{name}_{collisions}.log.gz'
+            self._log_path = log_path
+
+        return self._log_path
+
+    def record_exit_code(self, exit_code: int):
+        self._exit_code = exit_code
+
     def save_log_from_tmp(self, path):
-        self._file_system.make_dirs_parent(FILE_update_all_log)
-        self._file_system.copy(path, FILE_update_all_log)
+        log_path = self.log_path()
+        logs = self._load_logs()
+
+        self._file_system.make_dirs(FOLDER_update_all_logs)
+        size, compressed_size = self._file_system.compress_file(path, log_path, FILE_update_all_log)
+        self._file_system.unlink(path, verbose=False)
+
+        logs.append(_log_entry(log_path[len(FOLDER_update_all_logs) + 1:], time.time(), self._exit_code, size, compressed_size))
+
+        while len(logs) > self._log_history_size:
+            self._file_system.unlink(f'{FOLDER_update_all_logs}/{logs.pop(0)["file"]}', verbose=False)
+
+        self._file_system.save_json({'logs': logs}, FILE_update_all_logs_index)
+
+    def _load_logs(self):
+        logs = self._load_logs_index()
+
+        # Archives missing from the index, like after it got lost or corrupted, are pruned as the oldest ones.
+        indexed = {log['file'] for log in logs}
+        unindexed = sorted(name for name in self._file_system.list_files(FOLDER_update_all_logs) if name.endswith('.log.gz') and name not in indexed)
+        return [_log_entry(name) for name in unindexed] + logs
+
+    def _load_logs_index(self):
+        if not self._file_system.is_file(FILE_update_all_logs_index):
+            return []
+
+        try:
+            logs = self._file_system.load_dict_from_file(FILE_update_all_logs_index)['logs']
+            return [log for log in logs if isinstance(log, dict) and 'file' in log]
+        except Exception as e:
+            self._logger.debug(e)
+            return []
+
+    def save_trace(self, trace):
+        self._file_system.make_dirs_parent(FILE_update_all_trace)
+        self._file_system.save_json(trace, FILE_update_all_trace)
+
 
+def _log_entry(file: str, timestamp: Optional[float] = None, exit_code: Optional[int] = None, size: Optional[int] = None, compressed_size: Optional[int] = None) -> Dict[str, Any]:
+    return {'file': file, 'timestamp': timestamp, 'exit_code': exit_code, 'size': size, 'compressed_size': compressed_size}
@@ -0,0 +1,116 @@
+# Copyright (c) 2022 José Manuel Barroso Galindo <theypsilon@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# You can download the latest version of this tool from:
+# https://github.com/theypsilon-test/ua2
+
+import queue
+import threading
+import time
+from typing import TextIO, List, Any
+
+_CLOSE = object()
+
+
+class AsyncLogWriter:
+    """Writes log records to a file from a background thread.
+
+    Records are batched, and the batch is written once it reaches a size threshold, or once its oldest record
+    has waited for the flush interval. The queue is bounded, so producers wait if the disk can't keep up.
+    After close, records are written synchronously until the owner of the file closes it.
+    """
+
+    def __init__(self, file: TextIO, batch_size: int = 64 * 1024, flush_interval: float = 0.5, max_queued_records: int = 10_000):
+        self._file = file
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._queue: queue.Queue[Any] = queue.Queue(maxsize=max_queued_records)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.records = 0
+        self.writes = 0
+        self._thread = threading.Thread(target=self._run, name='log_writer', daemon=True)
+        self._thread.start()
+
+    def write(self, text: str) -> None:
+        # Checking and queueing under the lock means no record can be queued behind _CLOSE.
+        with self._lock:
+            if not self._closed:
+                self._queue.put(text)
+                return
+
+        # The background thread may still be writing its last batch.
+        self._thread.join()
+        with self._lock:
+            if not self._file.closed:
+                self.records += 1
+                self._write_batch([text])
+
+    def close(self) -> None:
+        """Writes everything still queued and stops the background thread, without closing the file. Safe to call more than once."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_CLOSE)
+
+        self._thread.join()
+
+    def _run(self) -> None:
+        batch: List[str] = []
+        batch_size = 0
+        deadline = 0.0
+        while True:
+            try:
+                record = self._queue.get(timeout=None if len(batch) == 0 else max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                record = None
+
+            if record is _CLOSE:
+                batch.extend(self._drain())
+                self._write_batch(batch)
+                return
+
+            if record is not None:
+                if len(batch) == 0:
+                    deadline = time.monotonic() + self._flush_interval
+                batch.append(record)
+                batch_size += len(record)
+                self.records += 1
+
+            if record is None or batch_size >= self._batch_size:
+                self._write_batch(batch)
+                batch = []
+                batch_size = 0
+
+    def _drain(self) -> List[str]:
+        records: List[str] = []
+        while True:
+            try:
+                record = self._queue.get_nowait()
+            except queue.Empty:
+                return records
+
+            if record is not _CLOSE:
+                records.append(record)
+                self.records += 1
+
+    def _write_batch(self, batch: List[str]) -> None:
+        if len(batch) == 0:
+            return
+
+        self._file.write(''.join(batch))
+        self._file.flush()
+        self.writes += 1
@@ -20,8 +20,11 @@ import tempfile
 import sys
 import time
 from abc import ABC, abstractmethod
+from contextlib import nullcontext
 
 from update_all.constants import K_VERBOSE, K_START_TIME
+from update_all.log_writer import AsyncLogWriter
+from update_all.trace_recorder import TraceRecorder
 
 
 class Logger(ABC):
@@ -41,6 +44,10 @@ class Logger(ABC):
     def bench(self, label):
         """print only to debug target"""
 
+    def span(self, label):
+        """context manager that times the enclosed block as a nested span of the run trace"""
+        return nullcontext()
+
     def finalize(self):
         """to be called at the very end, should not call any method after this one"""
 
@@ -88,19 +95,24 @@ class FileLoggerDecorator(Logger):
     def __init__(self, decorated_logger, local_repository_provider):
         self._decorated_logger = decorated_logger
         self._logfile = tempfile.NamedTemporaryFile('w', delete=False)
+        self._log_writer = AsyncLogWriter(self._logfile)
         self._local_repository_provider = local_repository_provider
+        self._trace_recorder = TraceRecorder()
 
     def configure(self, config):
         self._decorated_logger.configure(config)
 
     def finalize(self):
-        self._decorated_logger.finalize()
-        if self._logfile is None:
-            return
+        if self._logfile is not None:
+            self._log_writer.close()
+            self._logfile.close()
+            self._decorated_logger.bench(f'Log file: {self._log_writer.records} records written in {self._log_writer.writes} writes ({self._log_writer.records - self._log_writer.writes} writes saved).')
+            local_repository = self._local_repository_provider.get()
+            local_repository.save_log_from_tmp(self._logfile.name)
+            local_repository.save_trace(self._trace_recorder.chrome_trace())
+            self._logfile = None
 
-        self._logfile.close()
-        self._local_repository_provider.get().save_log_from_tmp(self._logfile.name)
-        self._logfile = None
+        self._decorated_logger.finalize()
 
     def print(self, *args, sep='', end='\n', file=sys.stdout, flush=True):
         self._decorated_logger.print(*args, sep=sep, end=end, file=file, flush=flush)
@@ -112,10 +124,14 @@ class FileLoggerDecorator(Logger):
 
     def bench(self, label):
         self._decorated_logger.bench(label)
+        self._trace_recorder.instant(label)
+
+    def span(self, label):
+        return self._trace_recorder.span(label)
 
     def _do_print_in_file(self, *args, sep, end, flush):
         if self._logfile is not None:
-            print(*args, sep=sep, end=end, file=self._logfile, flush=flush)
+            self._log_writer.write(sep.join(str(arg) for arg in args) + end)
 
 
 class DebugOnlyLoggerDecorator(Logger):
@@ -135,5 +151,8 @@ class DebugOnlyLoggerDecorator(Logger):
     def bench(self, label):
         self._decorated_logger.bench(label)
 
+    def span(self, label):
+        return self._decorated_logger.span(label)
+
     def finalize(self):
         self._decorated_logger.finalize()
@@ -27,6 +27,7 @@ from update_all.update_all_service import UpdateAllServiceFactory
 def main(env):
     local_repository_provider = GenericProvider[LocalRepository]()
     logger = FileLoggerDecorator(PrintLogger(), local_repository_provider)
+    exit_code = 1
     # noinspection PyBroadException
     try:
         exit_code = execute_update_all(
@@ -35,12 +36,13 @@ def main(env):
         )
     except KeyboardInterrupt as _:
         logger.print('\nExecution aborted by the user.')
-        return 1
     except Exception as _:
         logger.print(traceback.format_exc())
-        exit_code = 1
+    finally:
+        # Also on SystemExit and other BaseExceptions, so that the queued log records reach the log file.
+        local_repository_provider.get().record_exit_code(exit_code)
+        logger.finalize()
 
-    logger.finalize()
     return exit_code
 
 
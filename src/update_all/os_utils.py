@@ -17,16 +17,31 @@
 # You can download the latest version of this tool from:
 # https://github.com/theypsilon-test/ua2
 
+import errno
+import http.client
+import os
+import random
+import selectors
+import socket
 import subprocess
 import time
 from abc import ABC
-from urllib.request import urlopen
+from typing import Dict, Optional, Tuple
+from urllib.error import HTTPError, URLError
 
 from update_all.config import Config
+from update_all.constants import FOLDER_update_all_http_cache
+from update_all.http_cache import HttpCache, write_stream_to_file
+from update_all.http_client import HttpClient
 from update_all.other import GenericProvider
 from update_all.logger import Logger
 
 
+_PROCESS_READ_SIZE = 64 * 1024
+_BACKOFF_BASE_SECONDS = 1.0
+_BACKOFF_MAX_SECONDS = 30.0
+
+
 class OsUtils(ABC):
     def sync(self) -> None:
         """send sync signal to the OS"""
@@ -43,14 +58,18 @@ class OsUtils(ABC):
     def sleep(self, seconds) -> None:
         """waits given seconds"""
 
-    def download(self, url) -> bytes:
-        """downloads given url and returns content as string"""
+    def download_to_file(self, url, path, use_cache=False) -> str:
+        """downloads given url into path, replacing it atomically, and returns the md5 of the content. With use_cache, keeps a copy to revalidate it with conditional requests"""
+
+    def close(self) -> None:
+        """closes pooled network connections, they are opened again if needed"""
 
 
 class LinuxOsUtils(OsUtils):
     def __init__(self, config_provider: GenericProvider[Config], logger: Logger):
         self._config_provider = config_provider
         self._logger = logger
+        self._http_client = HttpClient(logger)
 
     def sync(self) -> None:
         subprocess.run(['sync'], shell=False, stderr=subprocess.STDOUT)
@@ -60,26 +79,33 @@ class LinuxOsUtils(OsUtils):
 
     def execute_process(self, launcher, env) -> int:
         proc = subprocess.Popen(['python3', launcher], env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-
-        return_code = proc.poll()
-        while return_code is None:
-            if proc.stdout is not None:
-                outline = proc.stdout.readline().decode()
-                if len(outline):
-                    self._logger.print(f'{outline}', end='')
-
-            time.sleep(1.0 / 120.0)
-            return_code = proc.poll()
-
-        if proc.stdout is not None:
+        stdout = proc.stdout
+        assert stdout is not None
+
+        wakeups, total_bytes = 0, 0
+        pending = b''
+        fd = stdout.fileno()
+        with selectors.DefaultSelector() as selector:
+            selector.register(fd, selectors.EVENT_READ)
             while True:
-                line = proc.stdout.readline()
-                if not line:
+                selector.select()
+                wakeups += 1
+                chunk = os.read(fd, _PROCESS_READ_SIZE)
+                if not chunk:
                     break
-                outline = line.decode()
-                if len(outline):
-                    self._logger.print(f'{outline}', end='')
 
+                total_bytes += len(chunk)
+                lines = (pending + chunk).split(b'\n')
+                pending = lines.pop()
+                for line in lines:
+                    self._logger.print(f'{line.decode()}\n', end='')
+
+        if len(pending):
+            self._logger.print(pending.decode(), end='')
+
+        stdout.close()
+        return_code = proc.wait()
+        self._logger.bench(f'Process {launcher} output: {total_bytes} bytes in {wakeups} wakeups.')
         return return_code
 
     def read_command_output(self, cmd, env) -> [int, str]:
@@ -89,6 +115,119 @@ class LinuxOsUtils(OsUtils):
     def sleep(self, seconds) -> None:
         time.sleep(seconds)
 
-    def download(self, url) -> bytes:
-        with urlopen(url) as webpage:
-            return webpage.read()
+    def download_to_file(self, url, path, use_cache=False) -> str:
+        config = self._config_provider.get()
+        http_cache = self._http_cache() if use_cache else None
+        partial = _PartialDownload(f'{path}.part')
+        start = time.time()
+
+        attempt = 0
+        while True:
+            try:
+                md5, size = self._fetch_to_file(url, partial, http_cache, config.downloader_timeout, use_cache=use_cache)
+                break
+            except Exception as e:
+                attempt += 1
+                if not _is_retryable(e) or attempt > config.downloader_retries:
+                    partial.discard()
+                    raise e
+
+                delay = _backoff_delay(attempt)
+                self._logger.debug(e)
+                self._logger.debug(f'Download of {url} failed, retrying in {delay:.1f}s ({attempt}/{config.downloader_retries}).')
+                self.sleep(delay)
+
+        os.replace(partial.path, path)
+
+        elapsed = max(time.time() - start, 0.000001)
+        self._logger.bench(f'Downloaded {url}: {size} bytes in {elapsed:.2f}s ({size / elapsed / (1024 * 1024):.2f} MB/s).')
+        return md5
+
+    def _fetch_to_file(self, url: str, partial: '_PartialDownload', http_cache: Optional[HttpCache], timeout: int, use_cache: bool) -> Tuple[str, int]:
+        offset = partial.resumable_size()
+        headers: Dict[str, str]
+        if offset > 0 and partial.validator is not None:
+            headers = {'Range': f'bytes={offset}-', 'If-Range': partial.validator}
+        elif use_cache and http_cache is not None:
+            headers = http_cache.conditional_headers(url)
+        else:
+            headers = {}
+
+        try:
+            with self._http_client.open(url, headers=headers, timeout=timeout) as response:
+                resumed = offset > 0 and response.status == 206
+                if resumed:
+                    if _content_range_start(response.headers) != offset:
+                        raise IncompleteDownloadError(f'Server resumed {url} from an unexpected position.')
+                    self._logger.debug(f'Resuming {url} from byte {offset}.')
+
+                # Byte offsets of a gzip-encoded body can't be used to resume the decoded file.
+                partial.validator = None if response.is_encoded else response.headers.get('ETag') or response.headers.get('Last-Modified')
+                md5, size = write_stream_to_file(response, partial.path, append=resumed)
+                if http_cache is not None:
+                    http_cache.store_file(url, partial.path, md5, size, response.headers)
+                return md5, size
+        except HTTPError as e:
+            if e.code != 304:
+                raise e
+
+        result = http_cache.copy_cached_body(url, partial.path) if http_cache is not None else None
+        if result is not None:
+            self._logger.debug(f'Not modified, using cached content for: {url}')
+            return result
+
+        return self._fetch_to_file(url, partial, http_cache, timeout, use_cache=False)
+
+    def close(self) -> None:
+        self._http_client.close()
+
+    def _http_cache(self) -> HttpCache:
+        return HttpCache(f'{self._config_provider.get().base_system_path}/{FOLDER_update_all_http_cache}', self._logger)
+
+
+class IncompleteDownloadError(Exception):
+    pass
+
+
+class _PartialDownload:
+    def __init__(self, path: str):
+        self.path = path
+        self.validator: Optional[str] = None
+
+    def resumable_size(self) -> int:
+        if self.validator is None:
+            return 0
+
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def discard(self) -> None:
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def _is_retryable(e: Exception) -> bool:
+    if isinstance(e, HTTPError):
+        return e.code >= 500 or e.code in (408, 429)
+
+    if isinstance(e, OSError) and e.errno in (errno.ENETUNREACH, errno.EHOSTUNREACH):
+        return True
+
+    # Other OSErrors come from the local file system, like a full or read-only SD card, and retrying won't help.
+    return isinstance(e, (URLError, socket.timeout, socket.gaierror, ConnectionError, http.client.HTTPException, IncompleteDownloadError))
+
+
+def _backoff_delay(attempt: int) -> float:
+    delay = min(_BACKOFF_MAX_SECONDS, _BACKOFF_BASE_SECONDS * (2 ** (attempt - 1)))
+    return random.uniform(delay / 2, delay)
+
+
+def _content_range_start(headers) -> Optional[int]:
+    try:
+        return int(headers.get('Content-Range').split(' ')[1].split('-')[0])
+    except (AttributeError, IndexError, ValueError):
+        return None
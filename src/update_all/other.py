@@ -16,8 +16,6 @@
 
 # You can download the latest version of this tool from:
 # https://github.com/theypsilon-test/ua2
-import hashlib
-import os
 import sys
 from functools import cached_property
 from typing import Generic, TypeVar
@@ -94,12 +92,11 @@ class Checker:
         if not self._file_system.is_file(path):
             return -1
 
-        file_size = os.path.getsize(self._file_system.download_target_path(path))
+        file_size, _, _ = self._file_system.fingerprint(path)
         if file_size != _parameters[1]:
             return 0
 
-        file_md5 = hashlib.md5(self._file_system.read_file_binary(path)).hexdigest()
-        if file_md5 != _parameters[2]:
+        if self._file_system.hash(path) != _parameters[2]:
             return 1
 
         return 2
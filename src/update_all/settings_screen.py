@@ -16,13 +16,13 @@
 # You can download the latest version of this tool from:
 # https://github.com/theypsilon-test/ua2
 import curses
-import hashlib
 from functools import cached_property
+from typing import Any, Callable, List, Optional, Tuple
 
 from update_all.config import Config
 from update_all.constants import ARCADE_ORGANIZER_INI, FILE_MiSTer, \
     TEST_UNSTABLE_SPINNER_FIRMWARE_MD5, DOWNLOADER_URL, FILE_MiSTer_ini, ARCADE_ORGANIZER_URL, \
-    ARCADE_ORGANIZER_INSTALLED_NAMES_TXT, STANDARD_UI_THEME, FILE_downloader_temp_ini, FILE_MiSTer_delme
+    ARCADE_ORGANIZER_INSTALLED_NAMES_TXT, STANDARD_UI_THEME, FILE_downloader_temp_ini
 from update_all.databases import db_ids_by_model_variables, DB_ID_JTCORES, DB_ID_NAMES_TXT
 from update_all.ini_repository import IniRepository
 from update_all.file_system import FileSystem
@@ -33,9 +33,9 @@ from update_all.logger import Logger
 from update_all.os_utils import OsUtils
 from update_all.settings_screen_model import settings_screen_model
 from update_all.settings_screen_printer import SettingsScreenPrinter
-from update_all.ui_engine import run_ui_engine, Ui, UiApplication, UiSectionFactory
+from update_all.ui_engine import run_ui_engine, Ui, UiApplication, UiSectionFactory, Effect
 from update_all.ui_engine_dialog_application import DialogSectionFactory
-from update_all.ui_model_utilities import gather_variable_declarations, dynamic_convert_string
+from update_all.ui_model_utilities import variable_index, dynamic_convert_string
 
 
 class SettingsScreen(UiApplication):
@@ -52,6 +52,7 @@ class SettingsScreen(UiApplication):
         self._store_provider = store_provider
         self._original_firmware = None
         self._theme_manager = None
+        self._needs_save_key: Optional[Tuple[int, Tuple[Any, ...]]] = None
 
     def load_main_menu(self) -> None:
         run_ui_engine('main_menu', settings_screen_model(), self)
@@ -68,12 +69,12 @@ class SettingsScreen(UiApplication):
                     value = str(value).lower()
                 ui.set_value(variable, value)
 
-        for variable in gather_variable_declarations(settings_screen_model(), "db"):
+        for variable in variable_index(settings_screen_model()).declarations("db"):
             ui.set_value(variable, 'true' if db_ids[variable] in config.databases else 'false')
 
         arcade_organizer_ini = self._ini_repository.get_arcade_organizer_ini()
 
-        ao_variables = gather_variable_declarations(settings_screen_model(), "ao_ini")
+        ao_variables = variable_index(settings_screen_model()).declarations("ao_ini")
 
         for variable, description in ao_variables.items():
             rename = variable.replace('arcade_organizer_', '')
@@ -102,7 +103,7 @@ class SettingsScreen(UiApplication):
         drawer_factory, theme_manager = self._settings_screen_printer.initialize_screen(screen)
         theme_manager.set_theme(ui_theme)
 
-        ui.add_custom_effects({
+        ui.add_custom_effects({name: self._traced_effect(name, effect) for name, effect in {
             'calculate_needs_save': lambda effect: self.calculate_needs_save(ui),
             'calculate_has_right_available_code': lambda effect: self.calculate_has_right_available_code(ui),
             'calculate_is_test_spinner_firmware_applied': lambda effect: self.calculate_is_test_spinner_firmware_applied(ui),
@@ -116,11 +117,18 @@ class SettingsScreen(UiApplication):
             'calculate_names_char_code_warning': lambda effect: self.calculate_names_char_code_warning(ui),
             'calculate_names_txt_file_warning': lambda effect: self.calculate_names_txt_file_warning(ui),
             'apply_theme': lambda effect: self.apply_theme(ui),
-        })
+        }.items()})
 
         self._theme_manager = theme_manager
+        self._needs_save_key = None
         return DialogSectionFactory(drawer_factory)
 
+    def _traced_effect(self, name: str, effect_fn: Callable[[Effect], None]) -> Callable[[Effect], None]:
+        def run(effect: Effect) -> None:
+            with self._logger.span(f'SettingsScreen.{name}'):
+                effect_fn(effect)
+        return run
+
     def calculate_file_exists(self, ui, effect) -> None:
         ui.set_value('file_exists', 'true' if self._file_system.is_file(effect['target']) else 'false')
 
@@ -139,7 +147,7 @@ class SettingsScreen(UiApplication):
     def _is_test_firmware(self):
         is_test_firmware, firmware_md5 = False, None
         if self._file_system.is_file(FILE_MiSTer):
-            firmware_md5 = hashlib.md5(self._file_system.read_file_binary(FILE_MiSTer)).hexdigest()
+            firmware_md5 = self._file_system.hash(FILE_MiSTer)
             is_test_firmware = firmware_md5 == TEST_UNSTABLE_SPINNER_FIRMWARE_MD5
 
         return is_test_firmware, firmware_md5
@@ -155,9 +163,8 @@ class SettingsScreen(UiApplication):
         else:
             url = "https://raw.githubusercontent.com/theypsilon/Main_MiSTer/test-unstable-taito-spinner-firmware/bin"
 
-        content = self._os_utils.download(url)
-        self._file_system.write_file_bytes(FILE_MiSTer_delme, content)
-        self._file_system.move(FILE_MiSTer_delme, FILE_MiSTer)
+        self._os_utils.download_to_file(url, self._file_system.download_target_path(FILE_MiSTer))
+        self._file_system.invalidate_caches()
         self._set_spinner_options(ui)
 
     def _set_spinner_options(self, ui: Ui):
@@ -167,9 +174,9 @@ class SettingsScreen(UiApplication):
         ui.set_value('firmware_needs_reboot', 'true' if self._original_firmware != firmware_md5 else 'false')
 
     def play_bad_apple(self, _ui) -> None:
-        content = self._os_utils.download(DOWNLOADER_URL)
-        temp_file = self._file_system.temp_file_by_id('downloader.sh')
-        self._file_system.write_file_bytes(temp_file.name, content)
+        # Not the 'downloader.sh' temp file: Update All may still be prefetching its launcher into that one.
+        temp_file = self._file_system.temp_file_by_id('settings_screen_downloader.sh')
+        self._os_utils.download_to_file(DOWNLOADER_URL, temp_file.name, use_cache=True)
 
         mister_ini = self._read_mister_ini()
 
@@ -190,10 +197,15 @@ class SettingsScreen(UiApplication):
         curses.endwin()
 
         self._os_utils.execute_process(temp_file.name, env)
+        self._file_system.invalidate_caches()
 
         curses.initscr()
 
     def calculate_needs_save(self, ui: Ui) -> None:
+        needs_save_key = (ui.get_revision(self._needs_save_inputs), self._ini_repository.ini_files_fingerprint())
+        if needs_save_key == self._needs_save_key:
+            return
+
         needs_save_file_set = set()
 
         temp_config = Config()
@@ -220,15 +232,21 @@ class SettingsScreen(UiApplication):
 
         ui.set_value('needs_save', str(len(needs_save_file_set) > 0).lower())
         ui.set_value('needs_save_file_list', needs_save_file_list)
+        self._needs_save_key = needs_save_key
+
+    @cached_property
+    def _needs_save_inputs(self) -> List[str]:
+        return [variable for variable in variable_index(settings_screen_model()).declarations() if variable not in ('needs_save', 'needs_save_file_list')]
 
     def save(self, ui: Ui) -> None:
+        self._needs_save_key = None
         self._copy_ui_options_to_current_config(ui)
 
         config = self._config_provider.get()
 
         if self._does_arcade_oganizer_need_save(ui):
             new_ao_ini = {}
-            for variable, description in gather_variable_declarations(settings_screen_model()).items():
+            for variable, description in variable_index(settings_screen_model()).declarations().items():
                 if not variable.startswith('arcade_organizer'):
                     continue
                 rename = variable.replace('arcade_organizer_', '')
@@ -258,7 +276,7 @@ class SettingsScreen(UiApplication):
     def _does_arcade_oganizer_need_save(self, ui: Ui):
         arcade_organizer_ini = self._ini_repository.get_arcade_organizer_ini()
 
-        for variable, description in gather_variable_declarations(settings_screen_model()).items():
+        for variable, description in variable_index(settings_screen_model()).declarations().items():
             if not variable.startswith('arcade_organizer'):
                 continue
             rename = variable.replace('arcade_organizer_', '')
@@ -284,7 +302,7 @@ class SettingsScreen(UiApplication):
                     raise TypeError(f'{variable} can not have value {value}! (wrong type)')
                 setattr(config, variable, value)
 
-        for variable in gather_variable_declarations(settings_screen_model(), "db"):
+        for variable in variable_index(settings_screen_model()).declarations("db"):
             if ui.get_value(variable) == 'false':
                 continue
 
@@ -293,10 +311,10 @@ class SettingsScreen(UiApplication):
     @cached_property
     def _all_config_variables(self):
         return [
-            *gather_variable_declarations(settings_screen_model(), "ua_ini"),
-            *gather_variable_declarations(settings_screen_model(), "jt_ini"),
-            *gather_variable_declarations(settings_screen_model(), "names_ini"),
-            *gather_variable_declarations(settings_screen_model(), "arcade_roms"),
+            *variable_index(settings_screen_model()).declarations("ua_ini"),
+            *variable_index(settings_screen_model()).declarations("jt_ini"),
+            *variable_index(settings_screen_model()).declarations("names_ini"),
+            *variable_index(settings_screen_model()).declarations("arcade_roms"),
         ]
 
     def calculate_names_char_code_warning(self, ui: Ui) -> None:
@@ -326,9 +344,8 @@ class SettingsScreen(UiApplication):
             return ''
 
     def calculate_arcade_organizer_folders(self, ui: Ui) -> None:
-        content = self._os_utils.download(ARCADE_ORGANIZER_URL)
-        temp_file = self._file_system.temp_file_by_id('arcade_organizer.sh')
-        self._file_system.write_file_bytes(temp_file.name, content)
+        temp_file = self._file_system.temp_file_by_id('settings_screen_arcade_organizer.sh')
+        self._os_utils.download_to_file(ARCADE_ORGANIZER_URL, temp_file.name, use_cache=True)
 
         return_code, output = self._os_utils.read_command_output(['python3', temp_file.name, '--print-orgdir-folders'],
                                                                  {
@@ -15,8 +15,21 @@
 
 # You can download the latest version of this tool from:
 # https://github.com/theypsilon-test/ua2
+from functools import cache
+from typing import Any, Dict
 
-def settings_screen_model(): return {
+from update_all.ui_model_utilities import search_in_model, freeze_model
+
+
+@cache
+def settings_screen_model() -> Dict[str, Any]:
+    """Built once per process: types are already expanded and the result is read-only."""
+    model = _settings_screen_model_literal()
+    search_in_model(None, model.get('base_types', {}), model, lambda _result, _item: None)
+    return freeze_model(model)
+
+
+def _settings_screen_model_literal(): return {
     "formatters": {
         "yesno": {"false": "No", "true": "Yes"},
         "yesno_reverse": {"false": "Yes", "true": "No"},
@@ -17,7 +17,8 @@
 # https://github.com/theypsilon-test/ua2
 import abc
 import curses
-from typing import Tuple
+from dataclasses import dataclass
+from typing import Tuple, Dict, List, Any, Optional
 
 from update_all.settings_screen_printer import SettingsScreenPrinter, SettingsScreenThemeManager
 from update_all.ui_engine import Interpolator
@@ -243,6 +244,7 @@ class _Layout(SettingsScreenThemeManager):
         self._box_id = None
         self._current_theme = None
         self._current_sub_theme = None
+        self._drawn_by = None
 
     def set_theme(self, new_theme) -> None:
         if new_theme == self._current_theme:
@@ -281,6 +283,7 @@ class _Layout(SettingsScreenThemeManager):
 
         self._painted = True
         self._box_id = box_id
+        self._drawn_by = None
         self._window.clear()
         self._window.bkgd(' ', curses.color_pair(colors.WINDOW_BACKGROUND_COLOR))
         if box_id == self._box_id:
@@ -307,6 +310,13 @@ class _Layout(SettingsScreenThemeManager):
 
     def reset(self) -> None:
         self._painted = False
+        self._drawn_by = None
+
+    def is_drawn_by(self, drawer: Any) -> bool:
+        return self._drawn_by is drawer
+
+    def mark_drawn_by(self, drawer: Any) -> None:
+        self._drawn_by = drawer
 
 
 class _DrawerFactory(UiDialogDrawerFactory):
@@ -318,6 +328,19 @@ class _DrawerFactory(UiDialogDrawerFactory):
         return _Drawer(self._window, self._layout, interpolator)
 
 
+@dataclass(frozen=True)
+class _Geometry:
+    box: Tuple[int, int, int, int, bool]
+    offset_vertical: int
+    offset_header: int
+    offset_text_line: int
+    offset_menu: int
+    max_length_option: int
+    actions_line: int
+    offset_actions: int
+    action_width: int
+
+
 class _Drawer(UiDialogDrawer):
     def __init__(self, window, layout: _Layout, interpolator: Interpolator):
         self._window = window
@@ -328,6 +351,11 @@ class _Drawer(UiDialogDrawer):
         self._actions = []
         self._effects = {}
         self._header = ''
+        self._chunks_cache: Dict[Tuple[Any, ...], List[Tuple[str, Optional[list]]]] = {}
+        self._geometry_key: Optional[Tuple[Any, ...]] = None
+        self._geometry: Optional[_Geometry] = None
+        self._drawn_geometry: Optional[_Geometry] = None
+        self._drawn_selection: Tuple[bool, ...] = ()
 
     def start(self, data):
         self._text_lines = []
@@ -342,17 +370,32 @@ class _Drawer(UiDialogDrawer):
         self._layout.set_sub_theme(data.get('alert_level', None))
 
     def add_text_line(self, text):
-        interpolated_text = self._interpolator.interpolate(text)
+        for chunk, effects in self._text_chunks(self._interpolator.interpolate(text)):
+            if effects is not None:
+                self._effects[chunk] = effects
+
+            self._text_lines.append(chunk)
+
+    def _text_chunks(self, interpolated_text: str) -> List[Tuple[str, Optional[list]]]:
+        # Effects carry the color pairs of the current theme, so they are part of the key as well.
+        key = (interpolated_text, curses.COLS, colors.COMMON_TEXT_COLOR, colors.SYMBOL_TILDE_COLOR, colors.SYMBOL_AT_COLOR)
+        if key in self._chunks_cache:
+            return self._chunks_cache[key]
+
+        result = []
         for line in interpolated_text.split('\n'):
             n = curses.COLS - 2
             for chunk in [line[i:i + n] for i in range(0, len(line), n)]:
+                effects = None
                 find_tilda = chunk.find('~')
                 find_at = chunk.find('@')
                 if find_tilda != -1 or find_at != -1:
                     chunk, effects = parse_effects(chunk)
-                    self._effects[chunk] = effects
 
-                self._text_lines.append(chunk)
+                result.append((chunk, effects))
+
+        self._chunks_cache[key] = result
+        return result
 
     def add_menu_entry(self, option, info, is_selected=False):
         self._menu_entries.append((self._interpolator.interpolate(option), self._interpolator.interpolate(info), is_selected))
@@ -364,6 +407,31 @@ class _Drawer(UiDialogDrawer):
         self._actions.append((' ' * (length + 2), is_selected))
 
     def paint(self) -> int:
+        geometry = self._calculate_geometry()
+        self._layout.paint_layout(*geometry.box)
+
+        selection = tuple(is_selected for _, _, is_selected in self._menu_entries) + tuple(is_selected for _, is_selected in self._actions)
+        if self._layout.is_drawn_by(self) and geometry is self._drawn_geometry:
+            self._paint_selection_changes(geometry, selection)
+        else:
+            self._paint_all(geometry)
+            self._layout.mark_drawn_by(self)
+
+        self._drawn_geometry = geometry
+        self._drawn_selection = selection
+        self._window.noutrefresh()
+        curses.doupdate()
+        return self._window.getch()
+
+    def _calculate_geometry(self) -> _Geometry:
+        key = (
+            curses.LINES, curses.COLS, self._header, tuple(self._text_lines),
+            tuple((option, info) for option, info, _ in self._menu_entries),
+            tuple(action for action, _ in self._actions)
+        )
+        if key == self._geometry_key and self._geometry is not None:
+            return self._geometry
+
         total_lines = len(self._text_lines) + len(self._menu_entries) + 1
         max_length_header = len(self._header)
         if max_length_header > 0:
@@ -392,58 +460,94 @@ class _Drawer(UiDialogDrawer):
         total_width = max(max(max_menu_entry, max_length_text_line), max(max_length_header, max_length_actions))
         offset_horizontal = min(min(offset_menu, offset_text_line), min(offset_actions, offset_header))
 
-        self._layout.paint_layout(total_lines + 2, total_width + 2, offset_vertical - 1, offset_horizontal - 1, max_length_header> 0)
-
-        line_index = offset_vertical
-
+        actions_line = offset_vertical + len(self._text_lines) + len(self._menu_entries)
         if max_length_header > 0:
-            self._write_line(line_index, offset_header, self._header, curses.A_NORMAL | curses.color_pair(colors.HEADER_COLOR))
+            actions_line += 2
+        if len(self._actions) > 0 and total_lines < curses.COLS:
+            actions_line += 1
+
+        self._geometry_key = key
+        self._geometry = _Geometry(
+            box=(total_lines + 2, total_width + 2, offset_vertical - 1, offset_horizontal - 1, max_length_header > 0),
+            offset_vertical=offset_vertical,
+            offset_header=offset_header,
+            offset_text_line=offset_text_line,
+            offset_menu=offset_menu,
+            max_length_option=max_length_option,
+            actions_line=actions_line,
+            offset_actions=offset_actions,
+            action_width=action_width
+        )
+        return self._geometry
+
+    def _paint_all(self, geometry: _Geometry) -> None:
+        line_index = geometry.offset_vertical
+
+        if len(self._header) > 0:
+            self._write_line(line_index, geometry.offset_header, self._header, curses.A_NORMAL | curses.color_pair(colors.HEADER_COLOR))
             line_index += 2
 
         for line in self._text_lines:
             if line in self._effects:
                 for mode, start, end in self._effects[line]:
-                    self._write_line(line_index, offset_text_line + start, line[start:end], mode)
+                    self._write_line(line_index, geometry.offset_text_line + start, line[start:end], mode)
 
             else:
-                self._write_line(line_index, offset_text_line, line, curses.A_NORMAL | curses.color_pair(colors.COMMON_TEXT_COLOR))
+                self._write_line(line_index, geometry.offset_text_line, line, curses.A_NORMAL | curses.color_pair(colors.COMMON_TEXT_COLOR))
             line_index += 1
 
-        for option, info, is_selected in self._menu_entries:
-            if is_selected:
-                mode = curses.A_NORMAL | curses.color_pair(colors.FIRST_OPTION_KEY_SELECTED_COLOR)
-            else:
-                mode = curses.A_NORMAL | curses.color_pair(colors.FIRST_OPTION_KEY_UNSELECTED_COLOR)
+        for index in range(len(self._menu_entries)):
+            self._paint_menu_entry(geometry, index)
 
-            self._write_line(line_index, offset_menu, option[0:1], mode)
+        for index in range(len(self._actions)):
+            self._paint_action(geometry, index)
 
-            if is_selected:
-                mode = curses.A_NORMAL | curses.color_pair(colors.SELECTED_OPTION_TEXT_COLOR)
-            else:
-                mode = curses.A_NORMAL | curses.color_pair(colors.OPTION_UNSELECTED_COLOR)
+    def _paint_selection_changes(self, geometry: _Geometry, selection: Tuple[bool, ...]) -> None:
+        for index in range(len(self._menu_entries)):
+            if selection[index] != self._drawn_selection[index]:
+                self._paint_menu_entry(geometry, index)
 
-            self._write_line(line_index, offset_menu + 1, option[1:], mode)
+        for index in range(len(self._actions)):
+            position = len(self._menu_entries) + index
+            if selection[position] != self._drawn_selection[position]:
+                self._paint_action(geometry, index)
 
-            if is_selected:
-                mode = curses.A_NORMAL | curses.color_pair(colors.SELECTED_OPTION_INFO_COLOR)
-            else:
-                mode = curses.A_NORMAL | curses.color_pair(colors.COMMON_TEXT_COLOR)
-            self._write_line(line_index, offset_menu + max_length_option + 2, info, mode)
-            line_index += 1
+    def _paint_menu_entry(self, geometry: _Geometry, index: int) -> None:
+        option, info, is_selected = self._menu_entries[index]
+        line_index = geometry.offset_vertical + len(self._text_lines) + index
+        if len(self._header) > 0:
+            line_index += 2
 
-        if len(self._actions) > 0 and total_lines < curses.COLS:
-            line_index += 1
+        if is_selected:
+            mode = curses.A_NORMAL | curses.color_pair(colors.FIRST_OPTION_KEY_SELECTED_COLOR)
+        else:
+            mode = curses.A_NORMAL | curses.color_pair(colors.FIRST_OPTION_KEY_UNSELECTED_COLOR)
 
-        for action, is_selected in self._actions:
-            if is_selected:
-                self._write_line(line_index, offset_actions, action[0:1], curses.A_BLINK | curses.color_pair(colors.SELECTED_ACTION_BORDER_COLOR))
-                self._write_line(line_index, offset_actions + 1, action[1:-1], curses.A_BLINK | curses.color_pair(colors.SELECTED_ACTION_INTERIOR_COLOR))
-                self._write_line(line_index, offset_actions + len(action) - 1, action[-1:], curses.A_BLINK | curses.color_pair(colors.SELECTED_ACTION_BORDER_COLOR))
-            else:
-                self._write_line(line_index, offset_actions, action, curses.A_NORMAL | curses.color_pair(colors.UNSELECTED_ACTION_COLOR))
-            offset_actions += action_width
+        self._write_line(line_index, geometry.offset_menu, option[0:1], mode)
 
-        return self._window.getch()
+        if is_selected:
+            mode = curses.A_NORMAL | curses.color_pair(colors.SELECTED_OPTION_TEXT_COLOR)
+        else:
+            mode = curses.A_NORMAL | curses.color_pair(colors.OPTION_UNSELECTED_COLOR)
+
+        self._write_line(line_index, geometry.offset_menu + 1, option[1:], mode)
+
+        if is_selected:
+            mode = curses.A_NORMAL | curses.color_pair(colors.SELECTED_OPTION_INFO_COLOR)
+        else:
+            mode = curses.A_NORMAL | curses.color_pair(colors.COMMON_TEXT_COLOR)
+        self._write_line(line_index, geometry.offset_menu + geometry.max_length_option + 2, info, mode)
+
+    def _paint_action(self, geometry: _Geometry, index: int) -> None:
+        action, is_selected = self._actions[index]
+        line_index = geometry.actions_line
+        offset_actions = geometry.offset_actions + geometry.action_width * index
+        if is_selected:
+            self._write_line(line_index, offset_actions, action[0:1], curses.A_BLINK | curses.color_pair(colors.SELECTED_ACTION_BORDER_COLOR))
+            self._write_line(line_index, offset_actions + 1, action[1:-1], curses.A_BLINK | curses.color_pair(colors.SELECTED_ACTION_INTERIOR_COLOR))
+            self._write_line(line_index, offset_actions + len(action) - 1, action[-1:], curses.A_BLINK | curses.color_pair(colors.SELECTED_ACTION_BORDER_COLOR))
+        else:
+            self._write_line(line_index, offset_actions, action, curses.A_NORMAL | curses.color_pair(colors.UNSELECTED_ACTION_COLOR))
 
     def clear(self) -> None:
         self._layout.reset()
@@ -39,6 +39,10 @@ class StoreMigrator:
         self._logger = logger
 
     def migrate(self, local_store):
+        with self._logger.span('StoreMigrator.migrate'):
+            self._migrate(local_store)
+
+    def _migrate(self, local_store):
         self._logger.bench('Migration start.')
 
         current_version = local_store.get('migration_version', 0)
@@ -0,0 +1,62 @@
+# Copyright (c) 2022 José Manuel Barroso Galindo <theypsilon@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# You can download the latest version of this tool from:
+# https://github.com/theypsilon-test/ua2
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, List, Iterator
+
+
+class TraceRecorder:
+    """Records nested timing spans, and exports them in the Chrome trace-event format."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._events: List[Dict[str, Any]] = []
+        self._thread_names: Dict[int, str] = {}
+
+    @contextmanager
+    def span(self, label: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._add_event({'name': label, 'ph': 'X', 'ts': self._micros(start), 'dur': self._micros(end) - self._micros(start)})
+
+    def instant(self, label: str) -> None:
+        self._add_event({'name': label, 'ph': 'i', 's': 't', 'ts': self._micros(time.perf_counter())})
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        with self._lock:
+            metadata = [{'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid, 'args': {'name': name}} for tid, name in self._thread_names.items()]
+            return {'traceEvents': metadata + sorted(self._events, key=lambda e: e['ts']), 'displayTimeUnit': 'ms'}
+
+    def _add_event(self, event: Dict[str, Any]) -> None:
+        tid = threading.get_ident()
+        event['pid'] = os.getpid()
+        event['tid'] = tid
+        event['cat'] = 'update_all'
+        with self._lock:
+            self._thread_names.setdefault(tid, threading.current_thread().name)
+            self._events.append(event)
+
+    def _micros(self, perf_counter_value: float) -> int:
+        return int((perf_counter_value - self._origin) * 1_000_000)
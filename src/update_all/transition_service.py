@@ -15,6 +15,8 @@
 
 # You can download the latest version of this tool from:
 # https://github.com/theypsilon-test/ua2
+from typing import Dict, Any
+
 from update_all.config import Config
 from update_all.constants import FILE_update_all_ini, FILE_update_jtcores_ini, \
     FILE_update_names_txt_ini, ARCADE_ORGANIZER_INI, FILE_update_names_txt_sh, FILE_update_jtcores_sh
@@ -24,8 +26,7 @@ from update_all.file_system import FileSystem
 from update_all.local_store import LocalStore
 from update_all.logger import Logger
 from update_all.os_utils import OsUtils
-from update_all.settings_screen_model import settings_screen_model
-from update_all.ui_model_utilities import gather_variable_declarations, dynamic_convert_string
+from update_all.ui_model_utilities import variable_index, dynamic_convert_string
 
 
 default_arcade_organizer_enabled = Config().arcade_organizer
@@ -93,7 +94,7 @@ class TransitionService:
             config.hbmame_filter = True
             self._logger.debug('hbmame_filter=true')
 
-        for variable in gather_variable_declarations(settings_screen_model(), 'store'):
+        for variable in _settings_screen_declarations('store'):
             if hasattr(config, variable):
                 value = getattr(config, variable)
                 store.generic_set(variable, value)
@@ -105,7 +106,7 @@ class TransitionService:
         ini_content = self._ini_repository.read_old_ini_file(ini_file)
         db_ids = db_ids_by_model_variables()
 
-        for variable, description in gather_variable_declarations(settings_screen_model(), ini_group).items():
+        for variable, description in _settings_screen_declarations(ini_group).items():
             string_value = ini_content.get_string(variable, None)
             if string_value is None:
                 string_value = description['default']
@@ -132,3 +133,9 @@ class TransitionService:
                 return pb
 
         raise ValueError(f'Value {string_value} is not among the possible values: {", ".join(possible_values)}')
+
+
+def _settings_screen_declarations(group: str) -> Dict[str, Dict[str, Any]]:
+    # Importing the settings screen model is slow, and most runs don't need to transition from an old setup.
+    from update_all.settings_screen_model import settings_screen_model
+    return variable_index(settings_screen_model()).declarations(group)
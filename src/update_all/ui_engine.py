@@ -17,9 +17,14 @@
 # https://github.com/theypsilon-test/ua2
 import abc
 import curses
-from typing import Dict, Callable, Any, Union, Optional, List
+from functools import lru_cache
+from typing import Dict, Callable, Any, Union, Optional, List, Tuple, NamedTuple, Iterable
 
-from update_all.ui_model_utilities import gather_variable_declarations, expand_type
+from update_all.ui_model_utilities import variable_index, expand_type
+from update_all.ui_value_store import UiValueStore
+
+
+Effect = Dict[str, Any]
 
 
 class Ui(abc.ABC):
@@ -29,7 +34,11 @@ class Ui(abc.ABC):
     def set_value(self, key: str, value: Any) -> None:
         """Sets value as string for variable on the given key"""
 
-    def add_custom_effects(self, effects: Dict[str, Callable[[], None]]):
+    @abc.abstractmethod
+    def get_revision(self, keys: Optional[Iterable[str]] = None) -> int:
+        """Gets the revision of the latest change among the given variables, or among all of them if no keys are given"""
+
+    def add_custom_effects(self, effects: Dict[str, Callable[[Effect], None]]):
         """Add effects during initialization"""
 
     def add_custom_formatters(self, formatters: Dict[str, Callable[[str], str]]):
@@ -41,7 +50,6 @@ class Interpolator(abc.ABC):
         """Interpolates any value inside a string into another string according to the formatters"""
 
 
-Effect = Dict[str, Any]
 class EffectChain:
     def __init__(self, chain: List[Effect]):
         self.chain = chain
@@ -82,19 +90,22 @@ class _UiSystem(Ui):
         self._entrypoint = entrypoint
         self._model = model
         self._ui_application = ui_application
-        self._values = {}
+        self._values = UiValueStore()
         self._custom_effects = {}
         self._custom_formatters = {}
         self._is_initializing = False
 
     def get_value(self, key: str) -> str:
-        return self._values[key]
+        return self._values.get(key)
 
     def set_value(self, key: str, value: Any) -> None:
-        self._values[key] = value
+        self._values.set(key, value)
+
+    def get_revision(self, keys: Optional[Iterable[str]] = None) -> int:
+        return self._values.revision(keys)
 
     def execute(self):
-        self._values.update({k: v['default'] for k, v in gather_variable_declarations(self._model).items()})
+        self._values.update({k: v['default'] for k, v in variable_index(self._model).declarations().items()})
 
         self._is_initializing = True
 
@@ -105,7 +116,7 @@ class _UiSystem(Ui):
         runtime = _UiRuntime(self._model, self._entrypoint, self, ui_section_factory)
         runtime.run()
 
-    def add_custom_effects(self, effects: Dict[str, Callable[[], None]]):
+    def add_custom_effects(self, effects: Dict[str, Callable[[Effect], None]]):
         self._ensure_is_initializing('add_custom_effects')
 
         self._custom_effects = effects
@@ -115,7 +126,7 @@ class _UiSystem(Ui):
 
         self._custom_formatters = formatters
 
-    def custom_effects(self) -> Dict[str, Callable[[], None]]:
+    def custom_effects(self) -> Dict[str, Callable[[Effect], None]]:
         return self._custom_effects
 
     def custom_formatters(self) ->  Dict[str, Callable[[str], str]]:
@@ -134,6 +145,7 @@ class _UiRuntime:
         self._section = entrypoint
         self._items = self._model['items']
         self._section_states = {}
+        self._compiled_sections: Dict[Tuple[int, Tuple[str, ...]], _CompiledSection] = {}
         self._history = []
         self._ui_system = ui_system
         self._ui_section_factory = ui_section_factory
@@ -182,30 +194,50 @@ class _UiRuntime:
         return self._section_states[self._section]
 
     def _make_section_state(self, data):
+        compiled = self._compile_section(data)
+        section_data = dict(compiled.data)  # Each UI section gets its own top-level fields, as it may rewrite them.
+        effect_resolver = _EffectResolver(self._ui_system, section_data, self._ui_system.custom_effects())
+        ui_section = self._ui_section_factory.create_ui_section(section_data['ui'], section_data, compiled.interpolator)
+        return _UiSectionProcessor(ui_section, effect_resolver, compiled.hotkeys)
+
+    def _compile_section(self, data) -> '_CompiledSection':
+        inherited = tuple(section for section in self._history if 'formatters' in self._items[section] or 'variables' in self._items[section])
+        key = (id(data), inherited)
+        if key in self._compiled_sections:
+            return self._compiled_sections[key]
+
+        source = data
+        data = dict(data)  # The model is shared and read-only.
         expand_type(data, self._model.get('base_types', {}))
 
         for field in ['formatters', 'variables']:
-            data[field] = data.get(field, {})
+            data[field] = dict(data.get(field, {}))
             data[field].update(self._model.get(field, {}))
-            for section in self._history:
+            for section in inherited:
                 data[field].update(self._items[section].get(field, {}))
 
         data['formatters'].update(self._ui_system.custom_formatters())
 
         hotkeys = {}
         for hk in data.get('hotkeys', []):
-            for key in hk['keys']:
-                hotkeys[key] = hk['action']
-
-        interpolator = _Interpolator(data['formatters'], self._ui_system)
-        effect_resolver = _EffectResolver(self._ui_system, data, self._ui_system.custom_effects())
+            for key_code in hk['keys']:
+                hotkeys[key_code] = hk['action']
 
         ui_type = data['ui'] if 'ui' in data else None
         if ui_type is None:
             raise ValueError(f'Wrong ui_type: "{data["ui"] if "ui" in data else "`ui` field not found"}"')
 
-        ui_section = self._ui_section_factory.create_ui_section(ui_type, data, interpolator)
-        return _UiSectionProcessor(ui_section, effect_resolver, hotkeys)
+        # The source is kept alive with the compiled section, so that its id can not be reused by another node.
+        compiled = _CompiledSection(source=source, data=data, hotkeys=hotkeys, interpolator=_Interpolator(data['formatters'], self._ui_system))
+        self._compiled_sections[key] = compiled
+        return compiled
+
+
+class _CompiledSection(NamedTuple):
+    source: Dict[str, Any]
+    data: Dict[str, Any]
+    hotkeys: Dict[Any, List[Effect]]
+    interpolator: '_Interpolator'
 
 
 class _UiSectionProcessor:
@@ -239,62 +271,43 @@ class _Interpolator(Interpolator):
     def __init__(self, formatters: Dict[str, Union[Dict[str, str], Callable[[str], str]]], ui: Ui):
         self._formatters = formatters
         self._ui = ui
+        self._rendered: Dict[str, Tuple[int, str]] = {}
 
     def interpolate(self, text):
-        reading_state = 0
-        reading_value = ''
-        reading_modifier = ''
-        reading_arguments = []
-        reading_current_argument = ''
+        template = _compile_template(text)
+        if len(template.variables) == 0:
+            return text
+
+        # Formatters only see the value of their variable, so the output can be reused while those variables don't change.
+        revision = self._ui.get_revision(template.variables)
+        rendered = self._rendered.get(text)
+        if rendered is not None and rendered[0] == revision:
+            return rendered[1]
+
         values = dict()
+        parts = []
+        for segment in template.segments:
+            if isinstance(segment, str):
+                parts.append(segment)
+                continue
 
-        for character in text:
-            if reading_state == 0:
-                if character == '{':
-                    reading_state = 1
-                    reading_value = ''
-
-            elif reading_state == 1:
-                if character == '}':
-                    reading_state = 0
-                    values[reading_value] = self._call_formatter(reading_value, reading_value) if reading_value in self._formatters else self._ui.get_value(reading_value)
-                elif character == ':':
-                    reading_state = 2
-                    reading_modifier = ''
-                else:
-                    reading_value += character
-
-            elif reading_state == 2:
-                if character == '=':
-                    reading_arguments = []
-                    reading_current_argument = ''
-                    reading_state = 3
-                elif character == '}':
-                    reading_state = 0
-                    values[reading_value + ':' + reading_modifier] = self._call_formatter(reading_modifier, reading_value)
-                else:
-                    reading_modifier += character
-
-            elif reading_state == 3:
-                if character == '}':
-                    reading_arguments.append(reading_current_argument)
-                    reading_state = 0
-                    values[reading_value + ':' + reading_modifier + '=' + ','.join(reading_arguments)] = self._call_formatter(reading_modifier, reading_value, reading_arguments)
-                elif character == ',':
-                    reading_arguments.append(reading_current_argument)
-                    reading_current_argument = ''
-                else:
-                    reading_current_argument += character
+            if segment.raw not in values:
+                values[segment.raw] = str(self._resolve_placeholder(segment))
+            parts.append(values[segment.raw])
 
-            else:
-                raise NotImplementedError(reading_state)
+        result = ''.join(parts)
+        self._rendered[text] = (revision, result)
+        return result
 
-        for var_name, var_value in values.items():
-            text = text.replace("{" + var_name + "}", str(var_value))
+    def _resolve_placeholder(self, placeholder: '_Placeholder') -> Any:
+        if placeholder.modifier is None:
+            if placeholder.variable in self._formatters:
+                return self._call_formatter(placeholder.variable, placeholder.variable)
+            return self._ui.get_value(placeholder.variable)
 
-        return text
+        return self._call_formatter(placeholder.modifier, placeholder.variable, placeholder.arguments)
 
-    def _call_formatter(self, reading_modifier: str, reading_value: str, reading_arguments: List[str] = None) -> str:
+    def _call_formatter(self, reading_modifier: str, reading_value: str, reading_arguments: Optional[List[str]] = None) -> str:
         if reading_modifier not in self._formatters:
             raise ValueError(f'Formatter "{reading_modifier}" called for value "{reading_value}" does not exit.')
 
@@ -315,6 +328,57 @@ class _Interpolator(Interpolator):
             raise ValueError(reading_value, reading_modifier, formatter, e)
 
 
+class _Placeholder(NamedTuple):
+    raw: str
+    variable: str
+    modifier: Optional[str]
+    arguments: Optional[List[str]]
+
+
+class _Template(NamedTuple):
+    segments: Tuple[Union[str, _Placeholder], ...]
+    variables: Tuple[str, ...]
+
+
+@lru_cache(maxsize=4096)
+def _compile_template(text: str) -> _Template:
+    """Splits text into literal and placeholder segments, with the syntax {variable}, {variable:formatter} or {variable:formatter=arg1,arg2}"""
+    segments: List[Union[str, _Placeholder]] = []
+    variables: List[str] = []
+    literal_start = 0
+    position = 0
+    while True:
+        opening = text.find('{', position)
+        if opening == -1:
+            break
+
+        closing = text.find('}', opening + 1)
+        if closing == -1:
+            break
+
+        content = text[opening + 1:closing]
+        variable, separator, modifier_text = content.partition(':')
+        modifier: Optional[str] = None
+        arguments: Optional[List[str]] = None
+        if separator != '':
+            modifier, has_arguments, arguments_text = modifier_text.partition('=')
+            if has_arguments != '':
+                arguments = arguments_text.split(',')
+
+        if opening > literal_start:
+            segments.append(text[literal_start:opening])
+        segments.append(_Placeholder(raw=text[opening:closing + 1], variable=variable, modifier=modifier, arguments=arguments))
+        if variable not in variables:
+            variables.append(variable)
+
+        literal_start = position = closing + 1
+
+    if literal_start < len(text):
+        segments.append(text[literal_start:])
+
+    return _Template(segments=tuple(segments), variables=tuple(variables))
+
+
 class _EffectResolver:
     def __init__(self, ui, data, additional_effects: Dict[str, Callable[[Effect], None]]):
         self._ui = ui
@@ -15,7 +15,8 @@
 
 # You can download the latest version of this tool from:
 # https://github.com/theypsilon-test/ua2
-from typing import Callable, Any, TypeVar, Dict
+import copy
+from typing import Callable, Any, TypeVar, Dict, Optional
 
 
 def expand_type(data, base_types):
@@ -40,27 +41,67 @@ def expand_type(data, base_types):
 
 
 def gather_variable_declarations(model, group = None):
-    group = {} if group is None else {group}
+    if isinstance(model, _ReadOnlyDict):
+        return dict(variable_index(model).declarations(group))
+
+    # Mutable models aren't memoized, so indexing every group would be thrown away right after this call.
     result = {}
-    search_in_model(result, model.get('base_types', {}), model, lambda r, v: _add_variables_descriptions(r, v, group))
+    search_in_model(result, model.get('base_types', {}), model, lambda r, item: _add_group_declarations(r, item, group))
     return result
 
 
-def _add_variables_descriptions(result, item, group):
+def _add_group_declarations(result, item, group):
     if 'variables' not in item:
         return
 
-    for variable, description in  item['variables'].items():
-        if len(group) > 0:
+    for variable, description in item['variables'].items():
+        if group is not None:
             if 'group' not in description:
                 continue
             description_group = description['group'] if isinstance(description['group'], list) else [description['group']]
-            if group.isdisjoint(description_group):
+            if group not in description_group:
                 continue
 
         result[variable] = description
 
 
+def variable_index(model) -> 'VariableIndex':
+    return derived_from_model(model, 'variable_index', VariableIndex)
+
+
+class VariableIndex:
+    """Variable declarations of a model, all of them and by group, gathered in one pass."""
+
+    def __init__(self, model):
+        base_types = model.get('base_types', {})
+
+        declarations = {}
+        declarations_by_group = {}
+        search_in_model((declarations, declarations_by_group), base_types, model, _add_indexed_declarations)
+
+        self._declarations = _ReadOnlyDict(declarations)
+        self._declarations_by_group = {group: _ReadOnlyDict(variables) for group, variables in declarations_by_group.items()}
+
+    def declarations(self, group: Optional[str] = None) -> Dict[str, Any]:
+        if group is None:
+            return self._declarations
+        return self._declarations_by_group.get(group, _empty_declarations)
+
+
+def _add_indexed_declarations(result, item):
+    if 'variables' not in item:
+        return
+
+    declarations, declarations_by_group = result
+    for variable, description in item['variables'].items():
+        declarations[variable] = description
+        if 'group' not in description:
+            continue
+
+        for group in description['group'] if isinstance(description['group'], list) else [description['group']]:
+            declarations_by_group.setdefault(group, {})[variable] = description
+
+
 TResult = TypeVar('TResult')
 def search_in_model(result: TResult, base_types: Dict[str, Any], item, cb: Callable[[TResult, Any], None]) -> None:
     expand_type(item, base_types)
@@ -104,6 +145,59 @@ def search_in_model(result: TResult, base_types: Dict[str, Any], item, cb: Calla
             search_in_model(result, base_types, false, cb)
 
 
+def derived_from_model(model, key: str, build: Callable[[Any], Any]) -> Any:
+    """Memoizes structures derived from a read-only model on the model itself. Mutable models get a fresh build."""
+    if not isinstance(model, _ReadOnlyDict):
+        return build(model)
+
+    if key not in model._derived:
+        model._derived[key] = build(model)
+    return model._derived[key]
+
+
+def freeze_model(value):
+    if isinstance(value, dict):
+        return _ReadOnlyDict({k: freeze_model(v) for k, v in value.items()})
+    elif isinstance(value, list):
+        return _ReadOnlyList(freeze_model(v) for v in value)
+    return value
+
+
+def _read_only(*_args, **_kwargs):
+    raise TypeError('The model is read-only, make a copy of the node before modifying it.')
+
+
+class _ReadOnlyDict(dict):
+    __slots__ = ('_derived',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._derived = {}
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __copy__(self):
+        return dict(self)
+
+    def __deepcopy__(self, memo):
+        return {k: copy.deepcopy(v, memo) for k, v in self.items()}
+
+
+_empty_declarations = _ReadOnlyDict()
+
+
+class _ReadOnlyList(list):
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+    def __copy__(self):
+        return list(self)
+
+    def __deepcopy__(self, memo):
+        return [copy.deepcopy(v, memo) for v in self]
+
+
 def dynamic_convert_string(value):
     if type(value) == str:
         lower_value = value.lower()
@@ -0,0 +1,52 @@
+# Copyright (c) 2022 José Manuel Barroso Galindo <theypsilon@gmail.com>
+
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+# You can download the latest version of this tool from:
+# https://github.com/theypsilon-test/ua2
+
+from typing import Dict, Any, Iterable, Optional
+
+
+class UiValueStore:
+    """Values of the UI variables, with a revision per variable.
+
+    Readers detect changes by comparing revisions. Setting a variable to the value it already has is not a change.
+    """
+
+    def __init__(self) -> None:
+        self.values: Dict[str, Any] = {}
+        self._revisions: Dict[str, int] = {}
+        self._revision = 0
+
+    def get(self, key: str) -> Any:
+        return self.values[key]
+
+    def set(self, key: str, value: Any) -> None:
+        if key in self.values and self.values[key] == value:
+            return
+
+        self.values[key] = value
+        self._revision += 1
+        self._revisions[key] = self._revision
+
+    def update(self, values: Dict[str, Any]) -> None:
+        for key, value in values.items():
+            self.set(key, value)
+
+    def revision(self, keys: Optional[Iterable[str]] = None) -> int:
+        if keys is None:
+            return self._revision
+
+        return max((self._revisions.get(key, 0) for key in keys), default=0)
@@ -18,11 +18,12 @@
 import datetime
 import sys
 import time
-from typing import List
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import List, Dict, Optional, Callable, TYPE_CHECKING
 
 from update_all.cli_output_formatting import CLEAR_SCREEN
 from update_all.config import Config
-from update_all.constants import UPDATE_ALL_VERSION, DOWNLOADER_URL, ARCADE_ORGANIZER_URL, FILE_update_all_log, \
+from update_all.constants import UPDATE_ALL_VERSION, DOWNLOADER_URL, ARCADE_ORGANIZER_URL, \
     FILE_mister_downloader_needs_reboot, MEDIA_FAT, ARCADE_ORGANIZER_INI, MISTER_DOWNLOADER_VERSION
 from update_all.countdown import Countdown, CountdownImpl, CountdownOutcome
 from update_all.ini_repository import IniRepository, active_databases
@@ -30,16 +31,16 @@ from update_all.local_store import LocalStore
 from update_all.other import Checker, GenericProvider
 from update_all.logger import Logger
 from update_all.os_utils import OsUtils, LinuxOsUtils
-from update_all.settings_screen import SettingsScreen
-from update_all.settings_screen_standard_printer import SettingsScreenStandardPrinter
-from update_all.settings_screen_trivial_printer import SettingsScreenTrivialPrinter
 from update_all.store_migrator import StoreMigrator
 from update_all.migrations import migrations
 from update_all.local_repository import LocalRepository
-from update_all.file_system import FileSystemFactory, FileSystem
+from update_all.file_system import FileSystemFactory, FileSystem, CachingFileSystemDecorator
 from update_all.config_reader import ConfigReader
 from update_all.transition_service import TransitionService
 
+if TYPE_CHECKING:
+    from update_all.settings_screen import SettingsScreen
+
 
 class UpdateAllServiceFactory:
     def __init__(self, logger: Logger, local_repository_provider: GenericProvider[LocalRepository]):
@@ -49,7 +50,7 @@ class UpdateAllServiceFactory:
     def create(self, env: dict[str, str]):
         config_provider = GenericProvider[Config]()
         store_provider = GenericProvider[LocalStore]()
-        file_system = FileSystemFactory(config_provider, {}, self._logger).create_for_system_scope()
+        file_system = CachingFileSystemDecorator(FileSystemFactory(config_provider, {}, self._logger).create_for_system_scope())
         os_utils = LinuxOsUtils(config_provider=config_provider, logger=self._logger)
         ini_repository = IniRepository(self._logger, file_system=file_system, os_utils=os_utils)
         config_reader = ConfigReader(self._logger, env, ini_repository=ini_repository)
@@ -58,17 +59,23 @@ class UpdateAllServiceFactory:
         self._local_repository_provider.initialize(local_repository)
         checker = Checker(file_system=file_system)
         transition_service = TransitionService(logger=self._logger, file_system=file_system, os_utils=os_utils, ini_repository=ini_repository)
-        settings_screen = SettingsScreen(
-            logger=self._logger,
-            config_provider=config_provider,
-            file_system=file_system,
-            ini_repository=ini_repository,
-            os_utils=os_utils,
-            settings_screen_printer=SettingsScreenStandardPrinter(),
-            checker=checker,
-            local_repository=local_repository,
-            store_provider=store_provider
-        )
+
+        def settings_screen_factory() -> 'SettingsScreen':
+            # The settings screen pulls curses, the UI engine and its big model, so it's only imported when it's opened.
+            from update_all.settings_screen import SettingsScreen
+            from update_all.settings_screen_standard_printer import SettingsScreenStandardPrinter
+            return SettingsScreen(
+                logger=self._logger,
+                config_provider=config_provider,
+                file_system=file_system,
+                ini_repository=ini_repository,
+                os_utils=os_utils,
+                settings_screen_printer=SettingsScreenStandardPrinter(),
+                checker=checker,
+                local_repository=local_repository,
+                store_provider=store_provider
+            )
+
         return UpdateAllService(
             config_reader,
             config_provider,
@@ -79,7 +86,7 @@ class UpdateAllServiceFactory:
             file_system,
             os_utils,
             CountdownImpl(),
-            settings_screen,
+            settings_screen_factory,
             checker=checker,
             store_provider=store_provider,
             ini_repository=ini_repository
@@ -96,7 +103,7 @@ class UpdateAllService:
                  file_system: FileSystem,
                  os_utils: OsUtils,
                  countdown: Countdown,
-                 settings_screen: SettingsScreen,
+                 settings_screen_factory: Callable[[], 'SettingsScreen'],
                  checker: Checker,
                  store_provider: GenericProvider[LocalStore],
                  ini_repository: IniRepository):
@@ -109,27 +116,37 @@ class UpdateAllService:
         self._file_system = file_system
         self._os_utils = os_utils
         self._countdown = countdown
-        self._settings_screen = settings_screen
+        self._settings_screen_factory = settings_screen_factory
         self._checker = checker
         self._store_provider = store_provider
         self._ini_repository = ini_repository
         self._exit_code = 0
         self._error_reports: List[str] = []
+        self._prefetch_executor: Optional[ThreadPoolExecutor] = None
+        self._prefetched_downloads: Dict[str, Future] = {}
 
     def full_run(self) -> int:
-        self._read_config()
-        self._show_intro()
-        self._countdown_for_settings_screen()
-        self._pre_run_tweaks()
-        self._run_downloader()
-        self._run_arcade_organizer()
-        self._run_linux_update()
-        self._cleanup()
-        self._show_outro()
+        with self._logger.span('UpdateAllService.full_run'):
+            self._read_config()
+            self._prefetch_launchers()
+            self._show_intro()
+            self._countdown_for_settings_screen()
+            self._pre_run_tweaks()
+            self._run_downloader()
+            self._run_arcade_organizer()
+            self._run_linux_update()
+            self._file_system.invalidate_caches()
+            self._cleanup()
+            self._show_outro()
+        self._local_repository.record_exit_code(self._exit_code)
         self._reboot_if_needed()
         return self._exit_code
 
     def _read_config(self) -> None:
+        with self._logger.span('UpdateAllService.read_config'):
+            self._do_read_config()
+
+    def _do_read_config(self) -> None:
         config = Config()
         self._config_reader.fill_config_with_environment_and_mister_section(config)
         self._config_provider.initialize(config)
@@ -139,6 +156,39 @@ class UpdateAllService:
         self._config_reader.fill_config_with_ini_files(config)
         self._config_reader.fill_config_with_local_store(config, local_store)
 
+    def _prefetch_launchers(self) -> None:
+        config = self._config_provider.get()
+        urls = []
+        if len(active_databases(config)) > 0:
+            urls.append(DOWNLOADER_URL)
+        if config.arcade_organizer and not config.not_mister:
+            urls.append(ARCADE_ORGANIZER_URL)
+
+        if len(urls) == 0:
+            return
+
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=len(urls), thread_name_prefix='prefetch')
+        for url in urls:
+            path = self._launcher_temp_file(url).name
+            self._prefetched_downloads[url] = self._prefetch_executor.submit(self._os_utils.download_to_file, url, path, use_cache=True)
+
+    def _download_launcher(self, url: str) -> str:
+        path = self._launcher_temp_file(url).name
+        if url in self._prefetched_downloads:
+            future = self._prefetched_downloads.pop(url)
+            try:
+                future.result()
+                return path
+            except Exception as e:
+                self._logger.debug(e)
+                self._logger.debug(f'Prefetch failed for {url}, downloading it again.')
+
+        self._os_utils.download_to_file(url, path, use_cache=True)
+        return path
+
+    def _launcher_temp_file(self, url: str):
+        return self._file_system.temp_file_by_id(_launcher_file_ids[url])
+
     def _show_intro(self) -> None:
         self._logger.print()
         self._logger.print(f"                        -------- Update All {UPDATE_ALL_VERSION} ---------                        ")
@@ -167,7 +217,8 @@ class UpdateAllService:
         self._print_sequence()
         outcome = self._countdown.execute_count(self._store_provider.get().get_countdown_time())
         if outcome == CountdownOutcome.SETTINGS_SCREEN:
-            self._settings_screen.load_main_menu()
+            with self._logger.span('SettingsScreen.load_main_menu'):
+                self._settings_screen_factory().load_main_menu()
             self._logger.print(CLEAR_SCREEN, end='')
             self._print_sequence()
         elif outcome == CountdownOutcome.CONTINUE:
@@ -195,9 +246,7 @@ class UpdateAllService:
         self._draw_separator()
         self._logger.print('Running MiSTer Downloader')
 
-        content = self._os_utils.download(DOWNLOADER_URL)
-        temp_file = self._file_system.temp_file_by_id('downloader.sh')
-        self._file_system.write_file_bytes(temp_file.name, content)
+        launcher = self._download_launcher(DOWNLOADER_URL)
 
         self._logger.print()
 
@@ -222,7 +271,7 @@ class UpdateAllService:
         if config.not_mister:
             env['DEBUG'] = 'true'
 
-        return_code = self._os_utils.execute_process(temp_file.name, env)
+        return_code = self._os_utils.execute_process(launcher, env)
 
         if return_code != 0:
             self._exit_code = 1
@@ -236,11 +285,9 @@ class UpdateAllService:
         self._logger.print("Running Arcade Organizer")
         self._logger.print()
 
-        content = self._os_utils.download(ARCADE_ORGANIZER_URL)
-        temp_file = self._file_system.temp_file_by_id('arcade_organizer.sh')
-        self._file_system.write_file_bytes(temp_file.name, content)
+        launcher = self._download_launcher(ARCADE_ORGANIZER_URL)
 
-        return_code = self._os_utils.execute_process(temp_file.name, {
+        return_code = self._os_utils.execute_process(launcher, {
             'SSL_SECURITY_OPTION': self._config_provider.get().curl_ssl,
             'INI_FILE': f'{self._config_provider.get().base_path}/{ARCADE_ORGANIZER_INI}'
         })
@@ -275,14 +322,20 @@ class UpdateAllService:
         if config.not_mister:
             env['DEBUG'] = 'true'
 
-        temp_file = self._file_system.temp_file_by_id('downloader.sh')
-        return_code = self._os_utils.execute_process(temp_file.name, env)
+        launcher = self._launcher_temp_file(DOWNLOADER_URL).name
+        return_code = self._os_utils.execute_process(launcher, env)
 
         if return_code != 0:
             self._exit_code = 1
             self._error_reports.append('Scripts/.config/downloader/downloader2.log')
 
     def _cleanup(self) -> None:
+        if self._prefetch_executor is not None:
+            self._prefetch_executor.shutdown(wait=True, cancel_futures=True)
+            self._prefetch_executor = None
+            self._prefetched_downloads.clear()
+
+        self._os_utils.close()
         self._file_system.clean_temp_files_with_ids()
 
     def _show_outro(self) -> None:
@@ -309,7 +362,7 @@ class UpdateAllService:
             self._logger.print('Your MiSTer has been updated successfully!')
 
         self._logger.print()
-        self._logger.print(f"Full log for more details: {FILE_update_all_log}")
+        self._logger.print(f"Full log for more details: {self._local_repository.log_path()}")
         self._logger.print()
 
     def _reboot_if_needed(self) -> None:
@@ -354,3 +407,9 @@ class UpdateAllService:
         self._logger.print("################################################################################")
         self._logger.print()
         self._os_utils.sleep(self._store_provider.get().get_wait_time_for_reading())
+
+
+_launcher_file_ids = {
+    DOWNLOADER_URL: 'downloader.sh',
+    ARCADE_ORGANIZER_URL: 'arcade_organizer.sh',
+}